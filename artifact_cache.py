@@ -0,0 +1,208 @@
+"""On-disk cache of search preprocessing, saved as <map hash>-<kind>-v<version>.bin.
+
+Writes go through a temporary file and os.replace; off until configure() is called.
+"""
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+import weakref
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+SUFFIX = ".bin"
+ORPHAN_SECONDS = 3600  # Temporary files older than this were left by a writer that died
+
+
+def default_directory():
+    return os.environ.get("DUNGEONWALKER_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "dungeonwalker")
+
+
+# grid -> (version, digest): Auto asks whether artifacts exist on every query,
+# and hashing a large map each time would cost more than the search
+_hashes = weakref.WeakKeyDictionary()
+
+
+def add_arguments(parser, purpose="across runs"):
+    """Add --cache-dir and --no-cache to a command-line parser"""
+    parser.add_argument("--cache-dir", default=default_directory(),
+                        help=f"where preprocessing is saved for reuse {purpose}")
+    parser.add_argument("--no-cache", action="store_true", help="always rebuild preprocessing")
+
+
+def directory_from(args):
+    """The cache directory chosen by add_arguments' options, or None for no cache"""
+    return None if args.no_cache else args.cache_dir
+
+
+def map_hash(grid_model):
+    """Hex digest of a grid's size and terrain codes, computed once per grid version"""
+    version = getattr(grid_model, 'version', None)
+    cached = _hashes.get(grid_model) if version is not None else None
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    digest = _hash_codes(grid_model)
+    if version is not None:
+        _hashes[grid_model] = (version, digest)
+    return digest
+
+
+def _hash_codes(grid_model):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{grid_model.rows}x{grid_model.cols}".encode())
+    if hasattr(grid_model, 'to_codes'):
+        digest.update(grid_model.to_codes())
+    else:
+        for row in grid_model.grid:  # GridModel, snapshot and SharedGrid rows are code buffers
+            digest.update(row)
+    return digest.hexdigest()
+
+
+class MappedFile:
+    """Read-only memory map of a whole file and the typed views handed out over it.
+
+    The mapping outlives the file being replaced on disk. close() releases the
+    views and unmaps the file; artifacts loaded from the cache call it from
+    their own close(), and the cache closes them when it evicts the file.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        _open_files.add(self)
+
+    def __len__(self):
+        return len(self._map)
+
+    @property
+    def closed(self):
+        return self._map.closed
+
+    def unpack(self, header):
+        """header (a struct.Struct) read from the start of the file"""
+        return header.unpack_from(self._map)
+
+    def view(self, start, stop, typecode):
+        """Bytes start:stop as a memoryview of typecode items, valid until close()"""
+        view = memoryview(self._map)[start:stop].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = []
+        _open_files.discard(self)
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Someone still holds a slice of a view; the map goes when that does
+
+
+_open_files = weakref.WeakSet()  # MappedFiles not closed yet, so eviction can unmap them
+
+
+class ArtifactCache:
+    """Directory of preprocessing artifacts with size-bounded LRU eviction"""
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, grid_model, kind, version):
+        return os.path.join(self.directory, f"{map_hash(grid_model)}-{kind}-v{version}{SUFFIX}")
+
+    def get_or_build(self, grid_model, kind, version, load, build, save):
+        """Load the artifact for this map from disk, or build it and store it.
+
+        load(path) reads a saved artifact (raising ValueError if it is unusable),
+        build() makes a new one and save(artifact, path) writes it.
+        """
+        path = self.path_for(grid_model, kind, version)
+        try:
+            artifact = load(path)
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as error:
+            print(f"Discarding cached {kind}: {error}")
+            self._remove(path)
+        else:
+            self._touch(path)
+            return artifact
+        artifact = build()
+        self.store(path, lambda temp_path: save(artifact, temp_path))
+        return artifact
+
+    def store(self, path, write):
+        """Have write(temp_path) fill a temporary file, then move it to path in one step"""
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        os.close(handle)
+        try:
+            write(temp_path)
+            os.replace(temp_path, path)
+        except OSError as error:
+            # A full disk or a reader holding the file (on Windows) only costs us the cache entry
+            print(f"Could not cache {os.path.basename(path)}: {error}")
+            self._remove(temp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used artifacts until the directory fits in max_bytes"""
+        entries = []
+        total = 0
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # Another process evicted it first
+            if entry.name.endswith(".tmp"):
+                if now - stat.st_mtime > ORPHAN_SECONDS:
+                    self._remove(entry.path)
+                continue
+            if entry.name.endswith(SUFFIX):
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            for mapped in [mapped for mapped in _open_files if mapped.path == path]:
+                mapped.close()  # Its artifact notices and is loaded or built again on next use
+
+    def size(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(SUFFIX))
+
+    @staticmethod
+    def _touch(path):
+        # Modification time doubles as "last used", so eviction order is LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Already gone, or still mapped somewhere on Windows
+
+
+_active = None
+
+
+def configure(directory, max_bytes=DEFAULT_MAX_BYTES):
+    """Turn the cache on for this process (None turns it off)"""
+    global _active
+    _active = None if directory is None else ArtifactCache(directory, max_bytes)
+    return _active
+
+
+def active():
+    """The configured cache, or None"""
+    return _active
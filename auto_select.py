@@ -0,0 +1,123 @@
+import random
+import weakref
+
+
+class MapStats:
+    """Cheap statistics about one grid, used to pick a search engine.
+
+    Terrain shares come from a fixed random sample of cells, so gathering them
+    costs the same on a 10x10 grid as on a million-cell one. Timings of every
+    search run on the grid are kept as running means per algorithm.
+    """
+    SAMPLE_SIZE = 4096
+
+    def __init__(self, grid_model):
+        self.version = None
+        self.queries_since_edit = 0
+        self.timings = {}  # algorithm -> (runs, mean ms)
+        self.cells = grid_model.rows * grid_model.cols
+        # Snapshots and other read-only grids can never change
+        self.read_only = not hasattr(grid_model, 'set_cell_color')
+        self.refresh(grid_model)
+
+    def refresh(self, grid_model):
+        """Resample the terrain if the grid has been edited since the last query"""
+        version = getattr(grid_model, 'version', None)
+        if version == self.version and self.version is not None:
+            return
+        self.version = version
+        self.queries_since_edit = 0
+        rows, cols = grid_model.rows, grid_model.cols
+        sampler = random.Random(rows * 7919 + cols)  # Same cells every time for a given size
+        count = min(self.SAMPLE_SIZE, self.cells)
+        cells = range(self.cells) if count == self.cells else sampler.sample(range(self.cells), count)
+        walls = maroon = 0
+        for index in cells:
+            cost = grid_model.get_cell_cost(*divmod(index, cols))
+            if cost is None:
+                walls += 1
+            elif cost > 1:
+                maroon += 1
+        self.exact = count == self.cells  # Every cell was looked at
+        self.obstacle_density = walls / count
+        self.maroon_share = maroon / count
+
+    def record(self, algorithm, elapsed_ms):
+        runs, mean = self.timings.get(algorithm, (0, 0.0))
+        self.timings[algorithm] = (runs + 1, mean + (elapsed_ms - mean) / (runs + 1))
+
+    def mean_ms(self, algorithm):
+        runs, mean = self.timings.get(algorithm, (0, None))
+        return mean if runs >= AutoSelector.MIN_RUNS else None
+
+
+class AutoSelector:
+    """Picks the engine for "Auto" from map statistics and past timings on the same grid"""
+    SMALL_MAP = 2_500  # Cells; below this every engine answers instantly
+    MAZE_DENSITY = 0.25  # Obstacle share above which the map behaves like a maze
+    OPEN_MAROON_SHARE = 0.05  # Below this, rooms are mostly uniform and symmetry reduction pays off
+    STATIC_QUERIES = 3  # Queries without an edit before preprocessing is considered worthwhile
+    MIN_RUNS = 2  # Timings needed before they can override the rules
+    _stats = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def stats_for(cls, grid_model):
+        stats = cls._stats.get(grid_model)
+        if stats is None:
+            stats = cls._stats[grid_model] = MapStats(grid_model)
+        else:
+            stats.refresh(grid_model)
+        return stats
+
+    @classmethod
+    def record(cls, grid_model, algorithm, elapsed_ms):
+        """Remember how long a search took on this grid"""
+        cls.stats_for(grid_model).record(algorithm, elapsed_ms)
+
+    @classmethod
+    def choose(cls, grid_model, algorithms, is_prepared):
+        """Name of the fastest engine that is still exact on this grid.
+
+        algorithms is the registry (name -> AlgorithmInfo); is_prepared(info, grid)
+        reports whether an engine's preprocessing is already built for the grid.
+        """
+        stats = cls.stats_for(grid_model)
+        stats.queries_since_edit += 1
+        # A sample can miss the odd maroon cell, so only trust "unweighted" when every cell was seen
+        weighted = stats.maroon_share > 0 or not stats.exact
+        candidates = [name for name, info in algorithms.items()
+                      if info.optimal and (info.weighted or not weighted)]
+        static = stats.read_only or stats.queries_since_edit >= cls.STATIC_QUERIES
+
+        def usable(name):
+            info = algorithms[name]
+            if name not in candidates:
+                return False
+            if info.preprocessing is None or is_prepared(info, grid_model):
+                return True
+            # Building is only worth it on a map that stays put; a hierarchy takes minutes, so it is
+            # only used once built (e.g. loaded with the map)
+            return static and info.preprocessing != "hierarchy"
+
+        if stats.cells <= cls.SMALL_MAP:
+            preferred = ["A*"]
+        else:
+            preferred = [name for name in candidates
+                         if algorithms[name].preprocessing is not None and is_prepared(algorithms[name], grid_model)]
+            preferred.sort(key=lambda name: algorithms[name].preprocessing != "hierarchy")
+            if stats.obstacle_density >= cls.MAZE_DENSITY:
+                # Manhattan distance misleads in mazes: landmarks fix that, two frontiers halve the radius
+                preferred += ["A* (ALT)", "Bidirectional Dijkstra"]
+            elif stats.maroon_share < cls.OPEN_MAROON_SHARE:
+                preferred += ["A* (RSR)"]
+            preferred += ["A*"]
+        choice = next((name for name in preferred if usable(name)), candidates[0])
+
+        # Measured times on this grid beat the rules once there are enough of them
+        chosen_ms = stats.mean_ms(choice)
+        if chosen_ms is not None:
+            for name in candidates:
+                measured = stats.mean_ms(name)
+                if measured is not None and measured < chosen_ms and usable(name):
+                    choice, chosen_ms = name, measured
+        return choice
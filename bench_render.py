@@ -0,0 +1,217 @@
+"""Rendering benchmark.
+
+Builds the main window offscreen (no display needed) at several grid sizes and
+times the drawing paths the GUI depends on:
+
+  - full_redraw_ms: DungeonView.draw_grid plus a synchronous repaint
+  - cell_update_ms: one model edit through the change signal to a repaint
+  - overlay_ms: PathOverlay repaints with N visited cells (cold cache, warm
+    cache, and adding a batch of cells)
+  - player_ms: Player.animate_move and Player.follow_path setup
+  - replay_latency_ms: how late a 5 ms probe timer fires while a replay runs
+
+Results are printed (or written with --output) as JSON so runs can be diffed
+alongside the search benchmarks.
+
+Run with: python bench_render.py --sizes 10 100 500 2000 --output render.json
+Sizes of 1000 and above build millions of table items and take a while.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtCore, QtWidgets
+
+DEFAULT_SIZES = [10, 50, 100, 250]
+VISITED_COUNTS = [100, 10_000, 100_000]
+PROBE_INTERVAL_MS = 5
+
+
+def measure(action, repeat):
+    """Median wall time of action() in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        action()
+        samples.append((time.perf_counter() - began) * 1000)
+    return statistics.median(samples)
+
+
+def bench_full_redraw(window, repeat):
+    view = window.dungeonView
+
+    def redraw():
+        view.draw_grid()
+        view.viewport().repaint()
+
+    return measure(redraw, repeat)
+
+
+def bench_cell_update(window, repeat):
+    grid_model = window.grid_model
+    cells = [(row, 1 + row % (grid_model.cols - 2)) for row in range(min(repeat, grid_model.rows - 1))]
+    colors = iter(["maroon", "brown"] * len(cells))
+    position = iter(cells * 2)
+
+    def update():
+        row, col = next(position)
+        grid_model.set_cell_color(row, col, next(colors))
+        window.dungeonView.viewport().repaint()
+
+    result = measure(update, 2 * len(cells))
+    grid_model.reset_grid()
+    return result
+
+
+def bench_overlay(window, repeat):
+    overlay = window.path_overlay
+    rows, cols = window.grid_model.rows, window.grid_model.cols
+    results = {}
+    for count in VISITED_COUNTS:
+        count = min(count, rows * cols)
+        cells = [divmod(index, cols) for index in range(count)]
+
+        def cold():
+            overlay.set_visited_cells(cells)
+            overlay.repaint()
+
+        batch = [divmod(index, cols) for index in range(count, min(count + 100, rows * cols))]
+
+        def add_batch():
+            overlay.set_visited_cells(cells)
+            overlay.repaint()
+            began = time.perf_counter()
+            overlay.add_visited_cells(batch)
+            overlay.repaint()
+            return (time.perf_counter() - began) * 1000
+
+        results[str(count)] = {
+            "cold": measure(cold, repeat),
+            "warm": measure(overlay.repaint, repeat),
+            "add_100": statistics.median(add_batch() for _ in range(repeat)),
+        }
+    overlay.clear()
+    return results
+
+
+def bench_player(window, repeat):
+    player = window.player_widget
+    rows, cols = window.grid_model.rows, window.grid_model.cols
+    # An L-shaped path along the top row and down the right edge
+    path = [(0, col) for col in range(cols)] + [(row, cols - 1) for row in range(1, rows)]
+    costs = [1] * (len(path) - 1)
+    results = {
+        "animate_move": measure(lambda: player.animate_move(1, 1), repeat),
+        "follow_path": measure(lambda: player.follow_path(path, costs), repeat),
+    }
+    player.path_animation.stop()
+    player.animation.stop()
+    return results
+
+
+def bench_replay_latency(window, duration_ms=1000):
+    """Lateness of a probe timer while the replay engine pushes cells every frame"""
+    rows, cols = window.grid_model.rows, window.grid_model.cols
+    history = [divmod(index, cols) for index in range(rows * cols)]
+    replay = window.controller.replay
+    frames = max(1, duration_ms // replay.frame_interval())
+    replay.load(history)
+    replay.set_cells_per_frame(max(1, len(history) // frames))
+
+    lateness = []
+    clock = QtCore.QElapsedTimer()
+    probe = QtCore.QTimer()
+    probe.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+    probe.setInterval(PROBE_INTERVAL_MS)
+
+    def tick():
+        lateness.append(max(0, clock.restart() - PROBE_INTERVAL_MS))
+
+    probe.timeout.connect(tick)
+    loop = QtCore.QEventLoop()
+    replay.finished.connect(loop.quit)
+    QtCore.QTimer.singleShot(duration_ms * 5, loop.quit)  # Safety net
+    clock.start()
+    probe.start()
+    replay.start()
+    loop.exec()
+    probe.stop()
+    replay.finished.disconnect(loop.quit)
+    replay.set_cells_per_frame(0)
+
+    lateness.sort()
+    if not lateness:
+        return {"samples": 0}
+    return {
+        "samples": len(lateness),
+        "p50": lateness[len(lateness) // 2],
+        "p95": lateness[min(len(lateness) - 1, int(0.95 * len(lateness)))],
+        "max": lateness[-1],
+    }
+
+
+def bench_size(app, size, repeat):
+    from main import MainApp
+
+    began = time.perf_counter()
+    window = MainApp(size, size)
+    window.show()
+    app.processEvents()
+    build_ms = (time.perf_counter() - began) * 1000
+    try:
+        return {
+            "size": size,
+            "cells": size * size,
+            "build_ms": build_ms,
+            "full_redraw_ms": bench_full_redraw(window, repeat),
+            "cell_update_ms": bench_cell_update(window, repeat),
+            "overlay_ms": bench_overlay(window, repeat),
+            "player_ms": bench_player(window, repeat),
+            "replay_latency_ms": bench_replay_latency(window),
+        }
+    finally:
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+
+
+def main(sizes, repeat, output):
+    # main.py loads style.qss relative to the working directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    from pathfinder import Pathfinder
+    Pathfinder.verbose = False
+
+    results = {
+        "qt_platform": app.platformName(),
+        "qt_version": QtCore.QT_VERSION_STR,
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "sizes": [],
+    }
+    for size in sizes:
+        print(f"Benchmarking {size}x{size}...", file=sys.stderr)
+        results["sizes"].append(bench_size(app, size, repeat))
+
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offscreen rendering benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+    main(args.sizes, args.repeat, args.output)
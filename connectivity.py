@@ -0,0 +1,165 @@
+from array import array
+from collections import deque
+
+
+class ComponentIndex:
+    """Connected-component labelling of the passable cells of a grid.
+
+    Every passable cell carries a label; labels are merged with a small
+    union-find when painting joins two regions, and the affected region is
+    re-labelled locally when a new obstacle splits it. This lets callers
+    answer "is the goal reachable?" in O(1) instead of flooding the map.
+    """
+    BLOCKED = -1
+
+    def __init__(self, grid_model):
+        self.grid_model = grid_model
+        self.rebuild()
+
+    def rebuild(self):
+        """Label every passable cell from scratch.
+
+        Works on runs of passable cells rather than single cells: each run gets a
+        label, runs overlapping a run in the row above are merged through the
+        union-find, and finally every run is filled with its root label. The
+        Python-level work is per run, so large open maps label quickly.
+        """
+        rows, cols = self.grid_model.rows, self.grid_model.cols
+        self.rows, self.cols = rows, cols
+        self.labels = labels = array('i', [self.BLOCKED]) * (rows * cols)
+        self.parent = []  # union-find over labels
+        passable_row = getattr(self.grid_model, 'passable_row', None)
+        get_cell_cost = self.grid_model.get_cell_cost
+
+        runs = []  # (flat start, flat end, label) for every run
+        above = []  # (start col, end col, label) of the previous row's runs
+        for row in range(rows):
+            if passable_row is not None:
+                mask = passable_row(row)
+            else:
+                mask = bytes(get_cell_cost(row, col) is not None for col in range(cols))
+            current = []
+            start = mask.find(1)
+            other = 0  # First run above that may still overlap
+            while start != -1:
+                end = mask.find(0, start)
+                if end == -1:
+                    end = cols
+                label = self._new_label()
+                # Runs in the row above that share a column with start..end
+                while other < len(above) and above[other][1] <= start:
+                    other += 1
+                index = other
+                while index < len(above) and above[index][0] < end:
+                    self._union(label, above[index][2])
+                    index += 1
+                current.append((start, end, label))
+                runs.append((row * cols + start, row * cols + end, label))
+                start = mask.find(1, end)
+            above = current
+
+        for start, end, label in runs:
+            labels[start:end] = array('i', [self._find(label)]) * (end - start)
+
+    def connected(self, a, b):
+        """True if cells a and b are both passable and in the same component"""
+        label_a = self.labels[a[0] * self.cols + a[1]]
+        label_b = self.labels[b[0] * self.cols + b[1]]
+        if label_a == self.BLOCKED or label_b == self.BLOCKED:
+            return False
+        return self._find(label_a) == self._find(label_b)
+
+    def update_cell(self, row, col):
+        """Bring the index up to date after a single cell has been repainted"""
+        index = row * self.cols + col
+        was_passable = self.labels[index] != self.BLOCKED
+        is_passable = self._passable(row, col)
+        if was_passable == is_passable:
+            return  # Only the cost changed (e.g. brown -> maroon)
+
+        neighbors = [(r, c) for r, c in self._neighbors(row, col)
+                     if self.labels[r * self.cols + c] != self.BLOCKED]
+
+        if is_passable:
+            # Opening a cell can only merge the regions around it
+            if not neighbors:
+                self.labels[index] = self._new_label()
+                return
+            roots = {self._find(self.labels[r * self.cols + c]) for r, c in neighbors}
+            root = roots.pop()
+            for other in roots:
+                self.parent[other] = root
+            self.labels[index] = root
+        else:
+            self.labels[index] = self.BLOCKED
+            if len(neighbors) > 1:
+                self._split_if_disconnected(neighbors)
+
+    def _split_if_disconnected(self, neighbors):
+        """After blocking a cell, check whether its former neighbours still reach each other"""
+        targets = set(neighbors[1:])
+        seen = {neighbors[0]}
+        queue = deque([neighbors[0]])
+        while queue and targets:
+            row, col = queue.popleft()
+            targets.discard((row, col))
+            for cell in self._neighbors(row, col):
+                if cell not in seen and self.labels[cell[0] * self.cols + cell[1]] != self.BLOCKED:
+                    seen.add(cell)
+                    queue.append(cell)
+
+        if not targets:
+            return  # Still one component, nothing to re-label
+
+        # The region split: give every piece its own fresh label
+        first = self._new_label()
+        fresh = {first}
+        for row, col in seen:
+            self.labels[row * self.cols + col] = first
+        for row, col in neighbors[1:]:
+            if self.labels[row * self.cols + col] not in fresh:
+                label = self._new_label()
+                fresh.add(label)
+                self._flood(row, col, label)
+
+    def _flood(self, start_row, start_col, label):
+        """Assign label to every passable cell connected to the start cell"""
+        labels, cols = self.labels, self.cols
+        labels[start_row * cols + start_col] = label
+        queue = deque([(start_row, start_col)])
+        while queue:
+            row, col = queue.popleft()
+            for r, c in self._neighbors(row, col):
+                index = r * cols + c
+                if labels[index] != label and self._passable(r, c):
+                    labels[index] = label
+                    queue.append((r, c))
+
+    def _neighbors(self, row, col):
+        if row > 0:
+            yield row - 1, col
+        if row < self.rows - 1:
+            yield row + 1, col
+        if col > 0:
+            yield row, col - 1
+        if col < self.cols - 1:
+            yield row, col + 1
+
+    def _passable(self, row, col):
+        return self.grid_model.get_cell_cost(row, col) is not None
+
+    def _new_label(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def _union(self, label, other):
+        root, other_root = self._find(label), self._find(other)
+        if root != other_root:
+            self.parent[root] = other_root
+
+    def _find(self, label):
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]  # Path halving
+            label = parent[label]
+        return label
@@ -0,0 +1,344 @@
+"""Contraction hierarchy for static maps: slow to build, so it can be saved with
+ContractionHierarchy.for_grid(grid, path=...) and reloaded while the terrain is unchanged."""
+from array import array
+import hashlib
+import heapq
+import os
+import struct
+import weakref
+
+import artifact_cache
+from models import TERRAIN_COSTS
+from search_history import SearchHistory
+
+MAGIC = b"DWCH"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHxxIIIII20s")  # magic, version, rows, cols, nodes, up-out edges, up-in edges, fingerprint
+NO_MIDDLE = -1  # Middle node of an original (non-shortcut) edge
+# bytes.translate table from terrain codes to movement costs (0 for walls)
+COST_BYTES = bytes([cost or 0 for cost in TERRAIN_COSTS] + [0] * (256 - len(TERRAIN_COSTS)))
+
+
+def terrain_fingerprint(grid_model):
+    """SHA-1 of the per-cell movement costs; identifies the map a hierarchy belongs to"""
+    digest = hashlib.sha1()
+    if hasattr(grid_model, 'grid') and not hasattr(grid_model, 'to_codes'):
+        for row in grid_model.grid:  # Rows of terrain codes: translate a row at a time
+            digest.update(bytes(row).translate(COST_BYTES))
+        return digest.digest()
+    for row in range(grid_model.rows):
+        digest.update(bytes((grid_model.get_cell_cost(row, col) or 0) for col in range(grid_model.cols)))
+    return digest.digest()
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy over a grid's passable cells (moves cost the entered cell's terrain)"""
+    # Witness searches give up after settling this many nodes and keep the shortcut
+    WITNESS_SETTLE_LIMIT = 30
+    _cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, grid_model):
+        self.rows, self.cols = grid_model.rows, grid_model.cols
+        self.fingerprint = terrain_fingerprint(grid_model)
+        self.mapped = None  # artifact_cache.MappedFile the tables are views into, if loaded mapped
+        self._number_nodes(grid_model)
+        self._contract(grid_model)
+
+    @classmethod
+    def for_grid(cls, grid_model, path=None):
+        """Hierarchy for a grid: cached per grid version, loaded from path if it matches, else built (and saved).
+
+        Without a path the artifact cache is used, if one is configured.
+        """
+        hierarchy = cls._cache.get(grid_model)
+        version = getattr(grid_model, 'version', None)
+        if hierarchy is not None and hierarchy.version == version and not hierarchy.closed:
+            return hierarchy
+        if hierarchy is not None:
+            hierarchy.close()
+        hierarchy = None
+        cache = artifact_cache.active()
+        if path is None and cache is not None:
+            hierarchy = cache.get_or_build(grid_model, "hierarchy", FORMAT_VERSION,
+                                           lambda path: cls.load(path, grid_model, mapped=True),
+                                           lambda: cls(grid_model), cls.save)
+        elif path is not None and os.path.exists(path):
+            try:
+                hierarchy = cls.load(path, grid_model)
+            except ValueError:
+                hierarchy = None  # Stale or foreign file: rebuild it
+        if hierarchy is None:
+            hierarchy = cls(grid_model)
+            if path is not None:
+                hierarchy.save(path)
+        hierarchy.version = version
+        cls._cache[grid_model] = hierarchy
+        return hierarchy
+
+    @property
+    def closed(self):
+        return self.mapped is not None and self.mapped.closed
+
+    def close(self):
+        """Unmap the tables of a hierarchy loaded with mapped=True (others hold nothing to release)"""
+        if self.mapped is not None:
+            self.mapped.close()
+
+    @staticmethod
+    def is_cached(grid_model):
+        """Whether the artifact cache holds a hierarchy for this terrain"""
+        cache = artifact_cache.active()
+        return cache is not None and os.path.exists(cache.path_for(grid_model, "hierarchy", FORMAT_VERSION))
+
+    # --- Preprocessing ---
+
+    def _number_nodes(self, grid_model):
+        self.node_of_cell = array('i', [-1]) * (self.rows * self.cols)
+        self.cell_of_node = array('I')
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if grid_model.get_cell_cost(row, col) is not None:
+                    self.node_of_cell[row * self.cols + col] = len(self.cell_of_node)
+                    self.cell_of_node.append(row * self.cols + col)
+
+    def _contract(self, grid_model):
+        rows, cols = self.rows, self.cols
+        node_count = len(self.cell_of_node)
+        # Edges between uncontracted nodes: out_edges[u][v] = in_edges[v][u] = (cost, middle)
+        out_edges = [dict() for _ in range(node_count)]
+        in_edges = [dict() for _ in range(node_count)]
+        for node, cell in enumerate(self.cell_of_node):
+            row, col = divmod(cell, cols)
+            for new_row, new_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if 0 <= new_row < rows and 0 <= new_col < cols:
+                    neighbour = self.node_of_cell[new_row * cols + new_col]
+                    if neighbour != -1:
+                        edge = (grid_model.get_cell_cost(new_row, new_col), NO_MIDDLE)
+                        out_edges[node][neighbour] = edge
+                        in_edges[neighbour][node] = edge
+
+        def witness_distances(source, skip, targets, limit):
+            """Distances from source avoiding skip, until every target is settled or limit is passed"""
+            distances = {source: 0}
+            queue = [(0, source)]
+            pending = set(targets)
+            settled = 0
+            while queue and pending and settled < self.WITNESS_SETTLE_LIMIT:
+                distance, node = heapq.heappop(queue)
+                if distance > distances[node]:
+                    continue
+                if distance > limit:
+                    break
+                pending.discard(node)
+                settled += 1
+                for neighbour, (cost, _) in out_edges[node].items():
+                    if neighbour == skip:
+                        continue
+                    new_distance = distance + cost
+                    if new_distance < distances.get(neighbour, new_distance + 1):
+                        distances[neighbour] = new_distance
+                        heapq.heappush(queue, (new_distance, neighbour))
+            return distances
+
+        def shortcuts_for(node):
+            """Shortcuts needed to contract node: (source, target, cost)"""
+            shortcuts = []
+            outgoing = out_edges[node].items()
+            for source, (in_cost, _) in in_edges[node].items():
+                targets = [(target, in_cost + out_cost) for target, (out_cost, _) in outgoing if target != source]
+                if not targets:
+                    continue
+                distances = witness_distances(source, node, [target for target, _ in targets],
+                                              max(cost for _, cost in targets))
+                for target, cost in targets:
+                    if distances.get(target, cost + 1) > cost:
+                        shortcuts.append((source, target, cost))
+            return shortcuts
+
+        deleted_neighbours = [0] * node_count
+
+        def priority(node, shortcuts):
+            # Edge difference plus a term that spreads contraction evenly over the map
+            return len(shortcuts) - len(in_edges[node]) - len(out_edges[node]) + deleted_neighbours[node]
+
+        queue = [(priority(node, shortcuts_for(node)), node) for node in range(node_count)]
+        heapq.heapify(queue)
+        self.rank = array('I', [0]) * node_count
+        up_out = [None] * node_count  # Edges to more important nodes, frozen at contraction time
+        up_in = [None] * node_count
+        next_rank = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            # Lazy update: re-evaluate and only contract if the node is still the least important
+            shortcuts = shortcuts_for(node)
+            current = priority(node, shortcuts)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+            self.rank[node] = next_rank
+            next_rank += 1
+            up_out[node] = [(target, cost, middle) for target, (cost, middle) in out_edges[node].items()]
+            up_in[node] = [(source, cost, middle) for source, (cost, middle) in in_edges[node].items()]
+            for source in in_edges[node]:
+                del out_edges[source][node]
+                deleted_neighbours[source] += 1
+            for target in out_edges[node]:
+                del in_edges[target][node]
+                deleted_neighbours[target] += 1
+            for source, target, cost in shortcuts:
+                existing = out_edges[source].get(target)
+                if existing is None or cost < existing[0]:
+                    out_edges[source][target] = (cost, node)
+                    in_edges[target][source] = (cost, node)
+            out_edges[node] = in_edges[node] = None
+
+        self.up_out = self._pack(up_out)
+        self.up_in = self._pack(up_in)
+
+    @staticmethod
+    def _pack(adjacency):
+        """Compressed rows: (first edge per node, other end, cost, middle node)"""
+        first, other, costs, middles = array('I', [0]), array('I'), array('I'), array('i')
+        for edges in adjacency:
+            for node, cost, middle in edges:
+                other.append(node)
+                costs.append(cost)
+                middles.append(middle)
+            first.append(len(other))
+        return first, other, costs, middles
+
+    # --- Queries ---
+
+    def find_path(self, start_row, start_col, goal_row, goal_col, record_history=True):
+        """Shortest path in the usual Pathfinder result shape; the history lists settled cells"""
+        search_history = SearchHistory(self.cols, record_history)
+        source = self.node_of_cell[start_row * self.cols + start_col]
+        target = self.node_of_cell[goal_row * self.cols + goal_col]
+        if source == -1 or target == -1:
+            return {'search_history': search_history, 'final_path': [], 'partial': False}
+
+        searches = (
+            ({source: 0}, [(0, source)], {}, self.up_out),  # distances, queue, parent links, edges
+            ({target: 0}, [(0, target)], {}, self.up_in),
+        )
+        best, meeting = float('inf'), -1
+        while True:
+            # Advance whichever side has the smaller key; a side is done once its key reaches best
+            open_sides = [side for side in searches if side[1] and side[1][0][0] < best]
+            if not open_sides:
+                break
+            distances, queue, parent, (first, other, costs, middles) = min(open_sides, key=lambda side: side[1][0][0])
+            opposite = searches[1] if distances is searches[0][0] else searches[0]
+            distance, node = heapq.heappop(queue)
+            if distance > distances[node]:
+                continue
+            search_history.append(divmod(self.cell_of_node[node], self.cols))
+            if node in opposite[0] and distance + opposite[0][node] < best:
+                best, meeting = distance + opposite[0][node], node
+            for edge in range(first[node], first[node + 1]):
+                neighbour = other[edge]
+                new_distance = distance + costs[edge]
+                if new_distance < distances.get(neighbour, new_distance + 1):
+                    distances[neighbour] = new_distance
+                    parent[neighbour] = (node, middles[edge])
+                    heapq.heappush(queue, (new_distance, neighbour))
+
+        if meeting == -1:
+            return {'search_history': search_history, 'final_path': [], 'partial': False}
+        # Forward links lead back from the meeting node to the start, backward ones on to the goal
+        forward = []
+        node = meeting
+        while node != source:
+            previous, middle = searches[0][2][node]
+            forward.append((previous, node, middle))
+            node = previous
+        forward.reverse()
+        node = meeting
+        while node != target:
+            following, middle = searches[1][2][node]
+            forward.append((node, following, middle))
+            node = following
+        nodes = [source]
+        for edge in forward:
+            self._unpack(edge, nodes)
+        return {
+            'search_history': search_history,
+            'final_path': [divmod(self.cell_of_node[node], self.cols) for node in nodes],
+            'partial': False,
+        }
+
+    def _unpack(self, edge, nodes):
+        """Append the original nodes after edge[0] along a (possibly shortcut) edge"""
+        stack = [edge]
+        while stack:
+            source, target, middle = stack.pop()
+            if middle == NO_MIDDLE:
+                nodes.append(target)
+                continue
+            # Both halves belong to the middle node, which was contracted before either end
+            stack.append((middle, target, self._middle_of(self.up_out, middle, target)))
+            stack.append((source, middle, self._middle_of(self.up_in, middle, source)))
+
+    @staticmethod
+    def _middle_of(adjacency, node, other_end):
+        first, other, _, middles = adjacency
+        for edge in range(first[node], first[node + 1]):
+            if other[edge] == other_end:
+                return middles[edge]
+        raise ValueError("corrupt contraction hierarchy: shortcut half is missing")
+
+    # --- Storage ---
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.rows, self.cols, len(self.cell_of_node),
+                                   len(self.up_out[1]), len(self.up_in[1]), self.fingerprint))
+            for values in (self.node_of_cell, self.cell_of_node, self.rank) + self.up_out + self.up_in:
+                values.tofile(file)
+
+    @classmethod
+    def load(cls, path, grid_model=None, mapped=False):
+        """Read a saved hierarchy; raises ValueError if it belongs to different terrain.
+
+        With mapped=True the tables stay memory-mapped instead of being read into arrays,
+        until the hierarchy is closed.
+        """
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError(f"{path} is not a contraction hierarchy")
+            magic, version, rows, cols, node_count, out_count, in_count, fingerprint = HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} contraction hierarchy")
+            if grid_model is not None and ((rows, cols) != (grid_model.rows, grid_model.cols)
+                                           or fingerprint != terrain_fingerprint(grid_model)):
+                raise ValueError(f"{path} was built for different terrain")
+            hierarchy = cls.__new__(cls)
+            hierarchy.rows, hierarchy.cols, hierarchy.fingerprint = rows, cols, fingerprint
+            hierarchy.version = None
+            hierarchy.mapped = artifact_cache.MappedFile(path) if mapped else None
+            offset = HEADER.size
+
+            def read(typecode, count):
+                nonlocal offset
+                if mapped:
+                    if offset + 4 * count > len(hierarchy.mapped):
+                        hierarchy.close()
+                        raise ValueError(f"{path} is truncated")
+                    offset += 4 * count
+                    return hierarchy.mapped.view(offset - 4 * count, offset, typecode)
+                values = array(typecode)
+                try:
+                    values.fromfile(file, count)
+                except EOFError:
+                    raise ValueError(f"{path} is truncated")
+                return values
+
+            hierarchy.node_of_cell = read('i', rows * cols)
+            hierarchy.cell_of_node = read('I', node_count)
+            hierarchy.rank = read('I', node_count)
+            hierarchy.up_out = (read('I', node_count + 1), read('I', out_count), read('I', out_count),
+                                read('i', out_count))
+            hierarchy.up_in = (read('I', node_count + 1), read('I', in_count), read('I', in_count),
+                               read('i', in_count))
+        return hierarchy
@@ -1,8 +1,19 @@
-from PyQt6 import QtCore
+import math
+from PyQt6 import QtCore, QtGui, QtWidgets
+import image_io
+from models import line_cells
 from pathfinder import Pathfinder
+import race
+from replay import ReplayEngine
+from search_trace import TraceReader
+from shared_grid import SharedGrid
+from undo import UndoStack
 
 
 class GameController:
+    # Hard per-plan budget so a huge or walled-off map can't stall the GUI
+    PLANNING_BUDGET_MS = 5
+
     def __init__(self, grid_model, player_model, dungeon_view, player_widget, path_overlay, main_window):
         self.grid_model = grid_model
         self.player_model = player_model
@@ -14,19 +25,41 @@ class GameController:
         # Handle cell clicks and dragging
         self.view.cellClickedSignal.connect(self.handle_cell_click)
         self.view.cellDraggedSignal.connect(self.handle_cell_drag)
+        self.view.strokeFinishedSignal.connect(self.finish_stroke)
+        # Tell the user about walled-off goals as soon as they paint them
+        self.grid_model.updateSignal.connect(self.update_reachability)
         
         # Track paint mode for dragging
         self.paint_color = None
+        self.last_paint_cell = None  # Previous drag sample, to paint lines between samples
+
+        # Algorithm comparison: worker processes are started on first use
+        self.race_executor = None
+        self.shared_grid = None  # Shared-memory copy of the map a race runs on
+        self.race_futures = []
+        self.race_timer = QtCore.QTimer()
+        self.race_timer.setInterval(15)
+        self.race_timer.timeout.connect(self.poll_race)
+
+        # Each click-and-drag stroke is one undo step
+        self.undo_stack = UndoStack(self.grid_model.model)
 
-        # Movement timer
-        self.timer = QtCore.QTimer()
-        self.timer.setInterval(300)
-        self.timer.timeout.connect(self.move_step)
+        # Search replay, decoupled from the search itself
+        self.replay = ReplayEngine(self.path_overlay)
+        self.replay.progressChanged.connect(self.show_replay_progress)
+        self.replay.finished.connect(self.finish_replay)
+        self.player_widget.movementFinished.connect(self.finish_movement)
         self.path = []
         self.final_path = []  # Store the optimal path
+        self.step_costs = []  # Cost of entering each cell of final_path, from the grid it was planned on
+        self.meeting_point = None  # Set by the bidirectional searches
         self.visited_cells = []  # Store cells visited during search
+        self.partial = False  # True when the last plan ran out of budget
+        self.auto_choice = None  # Engine Auto picked for the last plan, shown in the status line
 
     def handle_cell_click(self, row, col):
+        self.last_paint_cell = (row, col)
+        self.undo_stack.begin_stroke()
         # Prevent painting on start (0,0) or finish (bottom-right) positions
         if (row == 0 and col == 0) or (row == self.grid_model.rows - 1 and col == self.grid_model.cols - 1):
             return
@@ -48,33 +81,227 @@ class GameController:
             self.paint_color = "grey"
     
     def handle_cell_drag(self, row, col):
-        # Prevent painting on start (0,0) or finish (bottom-right) positions
-        if (row == 0 and col == 0) or (row == self.grid_model.rows - 1 and col == self.grid_model.cols - 1):
-            return
+        # Fast drags skip cells, so paint the whole line since the last sample
+        start = self.last_paint_cell or (row, col)
+        self.last_paint_cell = (row, col)
+        cells = [
+            cell for cell in line_cells(start[0], start[1], row, col)
+            # Prevent painting on start (0,0) or finish (bottom-right) positions
+            if cell != (0, 0) and cell != (self.grid_model.rows - 1, self.grid_model.cols - 1)
+        ]
         
         # Paint with the same color as the initial click
         if self.paint_color is not None:
-            self.grid_model.set_cell_color(row, col, self.paint_color)
+            self.grid_model.set_cells(cells, self.paint_color)
+
+    def finish_stroke(self):
+        self.undo_stack.end_stroke()
+
+    def undo(self):
+        self.undo_stack.undo()
+
+    def redo(self):
+        self.undo_stack.redo()
 
     def start_movement(self):
+        if not self.plan():
+            return
+        self.main_window.moveButton.setEnabled(False)
+        self.main_window.resetButton.setEnabled(False)
+        self.main_window.clearButton.setEnabled(False)
+        self.replay.start()
+
+    def plan(self):
+        """Run one budgeted search from the player's cell. Returns False if there is nothing to replay."""
         algorithm = self.main_window.searchComboBox.currentText()
-        result = Pathfinder.get_path(self.player_model.row, self.player_model.col, algorithm, self.grid_model)
+        # Search the core model directly rather than through the Qt adapter
+        result = Pathfinder.get_path(self.player_model.row, self.player_model.col, algorithm, self.grid_model.model,
+                                     time_budget_ms=self.PLANNING_BUDGET_MS)
         if not result:
             print("No path found.")
-            return
+            return False
         
         # Result contains both search history and final path
+        self._close_trace()
         self.path = result['search_history']
         self.final_path = result['final_path']
+        # Cost the walk now: the map may be painted while the search replays
+        self.step_costs = self._step_costs(self.final_path)
+        self.meeting_point = result.get('meeting_point')
+        self.auto_choice = result.get('algorithm')
+        self.update_reachability()
+        self.partial = result['partial']
         self.visited_cells = []
         
         if not self.path:
             print("No path found.")
-            return
+            return False
+        self.replay.load(self.path)
+        self.main_window.scrubSlider.setRange(0, len(self.path))
+        return True
+
+    def resume_planning(self):
+        """Plan again from the end of a partial path the player has just walked"""
+        if len(self.final_path) < 2:
+            # The budget ran out without getting any closer to the goal
+            print("Planning budget too small to make progress.")
+            return False
+        self.path_overlay.clear()
+        if not self.plan():
+            return False
+        self.replay.start()
+        return True
+
+    def import_image(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self.main_window, "Import Map Image", "",
+                                                        "Images (*.png *.bmp *.gif);;All files (*)")
+        if path:
+            self.load_map_image(path)
+
+    def load_map_image(self, path):
+        """Replace the map with an image of the same size, one pixel per cell (undoable)"""
+        rows, cols, codes = image_io.image_to_codes(QtGui.QImage(path))
+        if (rows, cols) != (self.grid_model.rows, self.grid_model.cols):
+            self.main_window.statusLabel.setText(f"Image is {cols}x{rows} pixels, the map is "
+                                                 f"{self.grid_model.cols}x{self.grid_model.rows}")
+            return False
+        self.grid_model.model.load_codes(codes)
+        return True
+
+    def export_image(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self.main_window, "Export Map Image", "dungeon.png",
+                                                        "PNG images (*.png)")
+        if path:
+            image_io.save_image(self.grid_model.model, path)
+
+    def open_trace(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self.main_window, "Replay Search Trace", "",
+                                                        "Search traces (*.trace);;All files (*)")
+        if path:
+            self.replay_trace(path)
+
+    def replay_trace(self, path):
+        """Replay a search trace from disk; it is memory-mapped, not loaded"""
+        trace = TraceReader(path)
+        if (trace.rows, trace.cols) != (self.grid_model.rows, self.grid_model.cols):
+            self.main_window.statusLabel.setText(f"Trace is for a {trace.rows}x{trace.cols} grid")
+            trace.close()
+            return False
+        self._close_trace()
+        self.path = trace
+        self.final_path = trace.final_path
+        # A trace does not record its terrain, so the walk is costed on the current map
+        # (and stops short of any cell that is a wall here)
+        self.step_costs = self._step_costs(self.final_path)
+        self.meeting_point = None
+        self.partial = False
+        if self.final_path:
+            # Walk the traced path from where the traced search started
+            start_row, start_col = self.final_path[0]
+            self.player_model.update_position(start_row, start_col)
+            self.player_widget.place_at(start_row, start_col)
+        self.path_overlay.clear()
+        self.replay.load(trace)
+        self.main_window.scrubSlider.setRange(0, len(trace))
         self.main_window.moveButton.setEnabled(False)
         self.main_window.resetButton.setEnabled(False)
         self.main_window.clearButton.setEnabled(False)
-        self.timer.start()
+        self.replay.start()
+        return True
+
+    def _close_trace(self):
+        """Unmap the trace being replayed, if any, before self.path is replaced"""
+        if isinstance(self.path, TraceReader):
+            self.path.close()
+            self.path = []
+
+    def set_replay_speed(self, slider_value):
+        """Map the speed slider (0-100) onto 1 to 100000 cells per second"""
+        self.replay.set_speed(10 ** (slider_value / 20))
+
+    def set_cells_per_frame(self, count):
+        self.replay.set_cells_per_frame(count)
+
+    def seek_replay(self, position):
+        self.replay.seek(position)
+
+    def skip_replay(self):
+        if self.replay.is_running():
+            self.replay.skip_to_result()
+
+    @staticmethod
+    def speed_to_slider(cells_per_second):
+        return round(20 * math.log10(cells_per_second))
+
+    def update_reachability(self):
+        goal = (self.grid_model.rows - 1, self.grid_model.cols - 1)
+        lines = []
+        if not self.grid_model.is_reachable((self.player_model.row, self.player_model.col), goal):
+            lines.append("Goal is unreachable")
+        if self.auto_choice is not None:
+            lines.append(f"Auto picked {self.auto_choice}")
+        self.main_window.statusLabel.setText("\n".join(lines))
+
+    def start_race(self):
+        """Run the algorithms checked in the race menu at once on worker processes, all on one snapshot"""
+        if self.race_futures:
+            return
+        start = (self.player_model.row, self.player_model.col)
+        goal = (self.grid_model.rows - 1, self.grid_model.cols - 1)
+        if not self.grid_model.is_reachable(start, goal):
+            self.main_window.statusLabel.setText("Goal is unreachable")
+            return
+        racers = self.main_window.raceMenu.actions()
+        algorithms = [action.text() for action in racers if action.isChecked()]
+        if not algorithms:
+            self.main_window.statusLabel.setText("Tick at least one algorithm under Racers")
+            return
+        if self.race_executor is None:
+            self.race_executor = race.make_executor(len(racers))
+        shared = self._shared_grid()
+        self.race_futures = race.start_race(self.race_executor, shared.handle, *start, algorithms)
+        self.main_window.compareButton.setEnabled(False)
+        self.main_window.statusLabel.setText("Comparing...")
+        self.race_timer.start()
+
+    def poll_race(self):
+        # Poll instead of blocking so the window stays responsive while workers run
+        if not all(future.done() for future in self.race_futures):
+            return
+        self.race_timer.stop()
+        results = [future.result() for future in self.race_futures]
+        self.race_futures = []
+        self.path_overlay.set_layers([(result['search_history'], result['final_path']) for result in results])
+        self.main_window.statusLabel.setText("\n".join(
+            f"{result['algorithm']}: {result['expansions']} expanded, "
+            f"{result['time_ms']:.1f} ms, cost {result['cost']}"
+            + (" (out of time)" if result['partial'] else "")
+            for result in results
+        ))
+        self.main_window.compareButton.setEnabled(True)
+
+    def _shared_grid(self):
+        """The grid as it is now, copied into the shared block race workers read.
+
+        The block is not kept in step with later edits, so every entry of a race
+        searches the same map even if it is painted while they run.
+        """
+        model = self.grid_model.model
+        if self.shared_grid is not None and (self.shared_grid.rows, self.shared_grid.cols) != (model.rows, model.cols):
+            self.shared_grid.close()
+            self.shared_grid = None
+        if self.shared_grid is None:
+            self.shared_grid = SharedGrid.create(model.rows, model.cols)
+        self.shared_grid.load_codes(b"".join(bytes(row) for row in model.grid))
+        return self.shared_grid
+
+    def shutdown(self):
+        self.replay.pause()
+        self._close_trace()
+        if self.race_executor is not None:
+            self.race_executor.shutdown(cancel_futures=True)
+        if self.shared_grid is not None:
+            self.shared_grid.close()
 
     def reset_obstacles(self):
         self.grid_model.reset_grid()
@@ -83,21 +310,36 @@ class GameController:
         self.player_model.reset_position()
         self.player_widget.place_at(0, 0)
         self.path_overlay.clear()  # Clear the overlay
+        self.update_reachability()
 
-    def move_step(self):
-        if not self.path:
-            self.timer.stop()
-            # Show the final optimal path on overlay
-            self.path_overlay.set_final_path(self.final_path)
-            self.main_window.moveButton.setEnabled(True)
-            self.main_window.resetButton.setEnabled(True)
-            self.main_window.clearButton.setEnabled(True)
-            return
+    def show_replay_progress(self, position):
+        """Keep the scrub bar in step with the replay"""
+        slider = self.main_window.scrubSlider
+        slider.blockSignals(True)
+        slider.setValue(position)
+        slider.blockSignals(False)
 
-        next_row, next_col = self.path.pop(0)
-        
-        # Add visited cell to overlay
-        self.path_overlay.add_visited_cell(next_row, next_col)
-        
-        self.player_model.update_position(next_row, next_col)
-        self.player_widget.animate_move(next_row, next_col)
+    def _step_costs(self, path):
+        grid = self.grid_model.model
+        return [grid.get_cell_cost(row, col) for row, col in path[1:]]
+
+    def finish_replay(self):
+        # Show the final optimal path on overlay, then walk it in one animation
+        self.path_overlay.set_final_path(self.final_path)
+        self.path_overlay.set_meeting_point(self.meeting_point)
+        path, costs = self.player_widget.walkable(self.final_path, self.step_costs)
+        if len(path) < len(self.final_path):
+            print(f"Path is blocked at {self.final_path[len(path)]}, stopping before it.")
+        if path:
+            end_row, end_col = path[-1]
+            self.player_model.update_position(end_row, end_col)
+        self.player_widget.follow_path(path, costs)
+
+    def finish_movement(self):
+        # Budget ran out: keep going from the best cell found so far
+        if self.partial and self.resume_planning():
+            return
+        self.main_window.moveButton.setEnabled(True)
+        self.main_window.resetButton.setEnabled(True)
+        self.main_window.clearButton.setEnabled(True)
+        self.update_reachability()
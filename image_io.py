@@ -0,0 +1,72 @@
+"""Maps as images: one pixel per cell, coloured like the cells in DungeonView.
+
+Images are handled as 8-bit indexed QImages whose colour table is the terrain
+palette, so a pixel's index is its terrain code. Reading and writing copy
+whole scanlines between QImage.bits() and the grid's code buffers; no pixel
+is ever looked at on its own from Python. Imports map any other colours to
+the nearest terrain colour (Qt does the matching).
+
+    save_image(grid_model, "dungeon.png")
+    grid_model = load_image("dungeon.png")
+"""
+from PyQt6 import QtCore, QtGui
+
+from models import TERRAIN_COLORS, GridModel
+from run_length import RunLengthGrid
+
+# Colour table index == terrain code, using the same named colours as the view
+PALETTE = [QtGui.QColor(color).rgb() for color in TERRAIN_COLORS]
+# Map every pixel to its nearest palette entry rather than dithering
+CONVERSION_FLAGS = QtCore.Qt.ImageConversionFlag.ThresholdDither | QtCore.Qt.ImageConversionFlag.AvoidDither
+
+
+def image_to_codes(image):
+    """(rows, cols, codes) from a QImage; codes is a flat row-major bytes of terrain codes"""
+    if image.isNull():
+        raise ValueError("image is empty or could not be read")
+    indexed = image.convertToFormat(QtGui.QImage.Format.Format_Indexed8, PALETTE, CONVERSION_FLAGS)
+    rows, cols, stride = indexed.height(), indexed.width(), indexed.bytesPerLine()
+    bits = indexed.constBits()
+    bits.setsize(indexed.sizeInBytes())
+    view = memoryview(bits)
+    if stride == cols:
+        return rows, cols, bytes(view)
+    # Scanlines are padded to 4 bytes: drop the padding a row at a time
+    return rows, cols, b"".join(view[row * stride:row * stride + cols] for row in range(rows))
+
+
+def codes_to_image(rows, cols, code_rows):
+    """Indexed QImage from an iterable of per-row code buffers"""
+    image = QtGui.QImage(cols, rows, QtGui.QImage.Format.Format_Indexed8)
+    image.setColorTable(PALETTE)
+    stride = image.bytesPerLine()
+    bits = image.bits()
+    bits.setsize(image.sizeInBytes())
+    view = memoryview(bits)
+    for row, codes in enumerate(code_rows):
+        view[row * stride:row * stride + cols] = codes
+    return image
+
+
+def grid_to_image(grid_model):
+    if isinstance(grid_model, RunLengthGrid):
+        codes = grid_model.to_codes()
+        cols = grid_model.cols
+        code_rows = (codes[row * cols:(row + 1) * cols] for row in range(grid_model.rows))
+    else:
+        code_rows = grid_model.grid  # GridModel / GridSnapshot rows are already code buffers
+    return codes_to_image(grid_model.rows, grid_model.cols, code_rows)
+
+
+def load_image(path, sparse=False):
+    """A GridModel (or RunLengthGrid with sparse=True) from an image file"""
+    rows, cols, codes = image_to_codes(QtGui.QImage(path))
+    if sparse:
+        return RunLengthGrid.from_codes(rows, cols, codes)
+    return GridModel(rows, cols, codes=codes)
+
+
+def save_image(grid_model, path):
+    """Write the grid as an image; the format follows the file suffix (e.g. .png)"""
+    if not grid_to_image(grid_model).save(path):
+        raise OSError(f"could not write image {path}")
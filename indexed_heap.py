@@ -0,0 +1,85 @@
+class IndexedHeap:
+    """Binary min-heap of keys with a position map, so a queued key's priority
+    can be lowered in place (decrease-key) instead of pushing a duplicate.
+
+    Each key is in the heap at most once, so its size is bounded by the open
+    set rather than by the number of relaxations, and the smallest queued
+    priority is always a live one. Keys are flat cell indices. Used by the
+    searches whose costs are often improved after a cell is first queued
+    (rectangle macro edges, the backward half of bidirectional search);
+    Dijkstra and A* rarely improve a queued cell and keep plain heapq.
+    """
+    def __init__(self):
+        # Parallel lists: priorities[i] belongs to keys[i]
+        self.priorities = []
+        self.keys = []
+        self.position = {}  # key -> index in the lists
+        self.pushes = 0
+        self.decrease_keys = 0
+        self.max_size = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.position
+
+    def push(self, key, priority):
+        """Queue key, or lower its priority if it is already queued with a worse one"""
+        index = self.position.get(key)
+        if index is not None:
+            if priority < self.priorities[index]:
+                self.decrease_keys += 1
+                self._sift_up(index, priority, key)
+            return
+        self.priorities.append(priority)
+        self.keys.append(key)
+        self.pushes += 1
+        size = len(self.keys)
+        if size > self.max_size:
+            self.max_size = size
+        self._sift_up(size - 1, priority, key)
+
+    def pop(self):
+        """Remove and return (priority, key) with the lowest priority"""
+        priorities, keys, position = self.priorities, self.keys, self.position
+        last_priority = priorities.pop()
+        last_key = keys.pop()
+        if not keys:
+            del position[last_key]
+            return last_priority, last_key
+        top_priority, top_key = priorities[0], keys[0]
+        del position[top_key]
+        # Walk the hole at the root down along the smaller children, then drop the last item into it
+        size = len(keys)
+        index, child = 0, 1
+        while child < size:
+            if child + 1 < size and not priorities[child] < priorities[child + 1]:
+                child += 1
+            priorities[index] = priorities[child]
+            keys[index] = keys[child]
+            position[keys[index]] = index
+            index, child = child, 2 * child + 1
+        self._sift_up(index, last_priority, last_key)
+        return top_priority, top_key
+
+    def stats(self):
+        return {
+            'max_size': self.max_size,
+            'pushes': self.pushes,
+            'decrease_keys': self.decrease_keys,
+        }
+
+    def _sift_up(self, index, priority, key):
+        priorities, keys, position = self.priorities, self.keys, self.position
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not priority < priorities[parent]:
+                break
+            priorities[index] = priorities[parent]
+            keys[index] = keys[parent]
+            position[keys[index]] = index
+            index = parent
+        priorities[index] = priority
+        keys[index] = key
+        position[key] = index
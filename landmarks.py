@@ -0,0 +1,174 @@
+from array import array
+import heapq
+import struct
+import weakref
+
+import artifact_cache
+
+UNREACHABLE = 0xFFFFFFFF
+MAGIC = b"DWLM"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHxxIIII")  # magic, version, rows, cols, landmarks asked for, landmarks found
+
+
+def dijkstra_distances(grid_model, source_row, source_col):
+    """Cost from the source to every cell (cost of entering each cell), UNREACHABLE where blocked"""
+    rows, cols = grid_model.rows, grid_model.cols
+    distances = array('I', [UNREACHABLE]) * (rows * cols)
+    source = source_row * cols + source_col
+    distances[source] = 0
+    pq = [(0, source)]
+    while pq:
+        distance, index = heapq.heappop(pq)
+        if distance > distances[index]:
+            continue  # Stale entry
+        row, col = divmod(index, cols)
+        for new_row, new_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= new_row < rows and 0 <= new_col < cols:
+                move_cost = grid_model.get_cell_cost(new_row, new_col)
+                if move_cost is not None:
+                    new_index = new_row * cols + new_col
+                    new_distance = distance + move_cost
+                    if new_distance < distances[new_index]:
+                        distances[new_index] = new_distance
+                        heapq.heappush(pq, (new_distance, new_index))
+    return distances
+
+
+class LandmarkIndex:
+    """Precomputed landmark distances for the ALT heuristic (A*, Landmarks, Triangle inequality).
+
+    Landmarks are picked by farthest-point selection and each one stores the
+    cost from it to every cell as a compact array('I'). Unlike Manhattan
+    distance, the resulting bound accounts for walls and difficult terrain.
+    """
+    _cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, grid_model, count=4):
+        self.grid_model = grid_model
+        self.count = count
+        self.version = getattr(grid_model, 'version', None)
+        self.landmarks = []  # (row, col) of each landmark
+        self.distances = []  # array('I') per landmark
+        self.mapped = None  # artifact_cache.MappedFile the distances are views into, if loaded
+        self._select_landmarks()
+
+    @classmethod
+    def for_grid(cls, grid_model, count=4):
+        """Shared index for a grid, rebuilt lazily once the grid has been edited (or read from the artifact cache)"""
+        index = cls._cache.get(grid_model)
+        if (index is None or index.closed or index.version != getattr(grid_model, 'version', None)
+                or index.count != count):
+            if index is not None:
+                index.close()
+            cache = artifact_cache.active()
+            if cache is None:
+                index = cls(grid_model, count)
+            else:
+                index = cache.get_or_build(grid_model, f"landmarks{count}", FORMAT_VERSION,
+                                           lambda path: cls.load(path, grid_model),
+                                           lambda: cls(grid_model, count), cls.save)
+            cls._cache[grid_model] = index
+        return index
+
+    def save(self, path):
+        rows, cols = self.grid_model.rows, self.grid_model.cols
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, rows, cols, self.count, len(self.landmarks)))
+            array('I', [value for landmark in self.landmarks for value in landmark]).tofile(file)
+            for distances in self.distances:
+                distances.tofile(file)
+
+    @classmethod
+    def load(cls, path, grid_model):
+        """Index for grid_model from a saved file; the distance tables stay memory-mapped until close()"""
+        mapped = artifact_cache.MappedFile(path)
+        try:
+            rows, cols = grid_model.rows, grid_model.cols
+            if len(mapped) < HEADER.size:
+                raise ValueError(f"{path} is not a landmark table")
+            magic, version, saved_rows, saved_cols, asked, count = mapped.unpack(HEADER)
+            if magic != MAGIC or version != FORMAT_VERSION or (saved_rows, saved_cols) != (rows, cols):
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} landmark table for a {rows}x{cols} grid")
+            tables = HEADER.size + 8 * count
+            if len(mapped) != tables + 4 * count * rows * cols:
+                raise ValueError(f"{path} is truncated")
+        except ValueError:
+            mapped.close()
+            raise
+        index = cls.__new__(cls)
+        index.grid_model = grid_model
+        index.count = asked
+        index.version = getattr(grid_model, 'version', None)
+        index.mapped = mapped
+        coordinates = mapped.view(HEADER.size, tables, 'I')
+        index.landmarks = [(coordinates[2 * number], coordinates[2 * number + 1]) for number in range(count)]
+        size = 4 * rows * cols
+        index.distances = [mapped.view(tables + number * size, tables + (number + 1) * size, 'I')
+                           for number in range(count)]
+        return index
+
+    @property
+    def closed(self):
+        return self.mapped is not None and self.mapped.closed
+
+    def close(self):
+        """Unmap the distance tables of a loaded index (built indexes hold nothing to release)"""
+        if self.mapped is not None:
+            self.mapped.close()
+
+    def _select_landmarks(self):
+        rows, cols = self.grid_model.rows, self.grid_model.cols
+        seed = next(((row, col) for row in range(rows) for col in range(cols)
+                     if self.grid_model.get_cell_cost(row, col) is not None), None)
+        if seed is None:
+            return
+        # The first landmark is the cell farthest from an arbitrary seed; each
+        # next one is the cell farthest from all landmarks chosen so far
+        nearest = dijkstra_distances(self.grid_model, *seed)
+        for _ in range(self.count):
+            best_index, best_distance = -1, 0
+            for index, distance in enumerate(nearest):
+                if distance != UNREACHABLE and distance > best_distance:
+                    best_index, best_distance = index, distance
+            if best_index < 0:
+                break  # Every reachable cell is already a landmark
+            landmark = divmod(best_index, cols)
+            distances = dijkstra_distances(self.grid_model, *landmark)
+            self.landmarks.append(landmark)
+            self.distances.append(distances)
+            if len(self.landmarks) == 1:
+                nearest = array('I', distances)
+            else:
+                for index, distance in enumerate(distances):
+                    if distance < nearest[index]:
+                        nearest[index] = distance
+
+    def heuristic_for(self, goal_row, goal_col):
+        """Admissible, consistent heuristic h(row, col) towards the given goal"""
+        cols = self.grid_model.cols
+        goal = goal_row * cols + goal_col
+        goal_cost = self.grid_model.get_cell_cost(goal_row, goal_col) or 0
+        # Only landmarks that can reach the goal give a bound
+        tables = [(distances, distances[goal]) for distances in self.distances if distances[goal] != UNREACHABLE]
+        get_cell_cost = self.grid_model.get_cell_cost
+
+        def heuristic(row, col):
+            best = abs(row - goal_row) + abs(col - goal_col)  # Every step costs at least 1
+            index = row * cols + col
+            cell_cost = get_cell_cost(row, col) or 0
+            for distances, to_goal in tables:
+                to_cell = distances[index]
+                if to_cell == UNREACHABLE:
+                    continue
+                # d(L, goal) <= d(L, n) + d(n, goal)
+                forward = to_goal - to_cell
+                # d(n, L) <= d(n, goal) + d(goal, L), where d(x, L) = d(L, x) + cost(L) - cost(x)
+                backward = to_cell - cell_cost - to_goal + goal_cost
+                if forward > best:
+                    best = forward
+                if backward > best:
+                    best = backward
+            return best
+
+        return heuristic
@@ -1,12 +1,16 @@
 from PyQt6 import QtWidgets, QtCore, QtGui
 import sys
+import artifact_cache
 from models import GridModel, PlayerModel
+from qt_models import QtGridModel
 from views import DungeonView, Player, PathOverlay
 from controller import GameController
+from pathfinder import Pathfinder
+import race
 
 
 class MainApp(QtWidgets.QMainWindow):
-    def __init__(self):
+    def __init__(self, rows=10, cols=10):
         super().__init__()
         self.resize(800, 800)
         self.setWindowTitle("Dungeon Walker")
@@ -32,23 +36,67 @@ class MainApp(QtWidgets.QMainWindow):
         
 
         self.searchComboBox = QtWidgets.QComboBox()
-        self.searchComboBox.addItems(["BFS", "DFS", "Dijkstra", "A*"])
+        # Auto picks an engine per query; the rest come straight from the registry
+        self.searchComboBox.addItems(["Auto"] + list(Pathfinder.ALGORITHMS))
         
         self.moveButton = QtWidgets.QPushButton("Move Player")
+
+        self.compareButton = QtWidgets.QPushButton("Compare")
+        # Which engines Compare races; the slow, unbudgeted ones start unchecked
+        self.raceMenu = QtWidgets.QMenu(self)
+        raced_by_default = race.raceable(Pathfinder.ALGORITHMS)
+        for name in Pathfinder.ALGORITHMS:
+            action = self.raceMenu.addAction(name)
+            action.setCheckable(True)
+            action.setChecked(name in raced_by_default)
+        self.raceButton = QtWidgets.QToolButton()
+        self.raceButton.setText("Racers")
+        self.raceButton.setMenu(self.raceMenu)
+        self.raceButton.setPopupMode(QtWidgets.QToolButton.ToolButtonPopupMode.InstantPopup)
  
         self.resetButton = QtWidgets.QPushButton("Reset Player")
 
         self.clearButton = QtWidgets.QPushButton("Clear Obstacles")
+
+        self.undoButton = QtWidgets.QPushButton("Undo")
+        self.redoButton = QtWidgets.QPushButton("Redo")
+        self.importButton = QtWidgets.QPushButton("Import Image...")
+        self.exportButton = QtWidgets.QPushButton("Export Image...")
   
 
         button_layout.addWidget(self.moveButton)
         button_layout.addWidget(self.resetButton)  
         button_layout.addWidget(self.clearButton)
+        button_layout.addWidget(self.undoButton)
+        button_layout.addWidget(self.redoButton)
+        button_layout.addWidget(self.importButton)
+        button_layout.addWidget(self.exportButton)
+
+        # Replay controls
+        replay_layout = QtWidgets.QHBoxLayout()
+        self.speedSlider = QtWidgets.QSlider(QtCore.Qt.Orientation.Horizontal)
+        self.speedSlider.setRange(0, 100)
+        self.cellsPerFrameSpinBox = QtWidgets.QSpinBox()
+        self.cellsPerFrameSpinBox.setRange(0, 100000)
+        self.cellsPerFrameSpinBox.setSpecialValueText("Auto")
+        self.skipButton = QtWidgets.QPushButton("Skip to Result")
+        self.traceButton = QtWidgets.QPushButton("Replay Trace...")
+        replay_layout.addWidget(QtWidgets.QLabel("Speed:"))
+        replay_layout.addWidget(self.speedSlider)
+        replay_layout.addWidget(QtWidgets.QLabel("Cells/frame:"))
+        replay_layout.addWidget(self.cellsPerFrameSpinBox)
+        replay_layout.addWidget(self.skipButton)
+        replay_layout.addWidget(self.traceButton)
+
+        self.scrubSlider = QtWidgets.QSlider(QtCore.Qt.Orientation.Horizontal)
+        self.scrubSlider.setRange(0, 0)
+
+        self.statusLabel = QtWidgets.QLabel("")
+        self.statusLabel.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
 
 
         # Grid
-        rows, cols = 10, 10
-        self.grid_model = GridModel(rows, cols)
+        self.grid_model = QtGridModel(GridModel(rows, cols))
         self.dungeonView = DungeonView(rows, cols, self.grid_model)
         
         self.dungeonView.setMaximumSize(QtCore.QSize(606, 606))
@@ -58,6 +106,8 @@ class MainApp(QtWidgets.QMainWindow):
         # Algorithm layout
         algo_layout.addWidget(self.algoLabel)
         algo_layout.addWidget(self.searchComboBox)
+        algo_layout.addWidget(self.compareButton)
+        algo_layout.addWidget(self.raceButton)
         algo_layout.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
     
 
@@ -179,6 +229,9 @@ class MainApp(QtWidgets.QMainWindow):
         left_layout.addWidget(self.dungeonView)
         left_layout.addLayout(button_layout)
         left_layout.addLayout(algo_layout)
+        left_layout.addLayout(replay_layout)
+        left_layout.addWidget(self.scrubSlider)
+        left_layout.addWidget(self.statusLabel)
         
         # Add to main horizontal layout
         main_layout.addLayout(left_layout)
@@ -204,7 +257,26 @@ class MainApp(QtWidgets.QMainWindow):
         self.moveButton.clicked.connect(self.controller.start_movement)
         self.clearButton.clicked.connect(self.controller.reset_obstacles)
         self.resetButton.clicked.connect(self.controller.reset_player)
+        self.compareButton.clicked.connect(self.controller.start_race)
+        self.undoButton.clicked.connect(self.controller.undo)
+        self.redoButton.clicked.connect(self.controller.redo)
+        self.importButton.clicked.connect(self.controller.import_image)
+        self.exportButton.clicked.connect(self.controller.export_image)
+        QtGui.QShortcut(QtGui.QKeySequence.StandardKey.Undo, self, self.controller.undo)
+        QtGui.QShortcut(QtGui.QKeySequence.StandardKey.Redo, self, self.controller.redo)
+
+        # Connect replay controls
+        self.speedSlider.setValue(GameController.speed_to_slider(self.controller.replay.speed))
+        self.speedSlider.valueChanged.connect(self.controller.set_replay_speed)
+        self.cellsPerFrameSpinBox.valueChanged.connect(self.controller.set_cells_per_frame)
+        self.scrubSlider.valueChanged.connect(self.controller.seek_replay)
+        self.skipButton.clicked.connect(self.controller.skip_replay)
+        self.traceButton.clicked.connect(self.controller.open_trace)
     
+    def closeEvent(self, event):
+        self.controller.shutdown()
+        super().closeEvent(event)
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         if hasattr(self, "player_widget"):
@@ -217,6 +289,8 @@ class MainApp(QtWidgets.QMainWindow):
 
 
 if __name__ == "__main__":
+    # Reuse landmark tables and hierarchies built in earlier sessions
+    artifact_cache.configure(artifact_cache.default_directory())
     app = QtWidgets.QApplication(sys.argv)
     window = MainApp()
     window.show()
@@ -1,59 +1,330 @@
-from PyQt6 import QtCore
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from connectivity import ComponentIndex
 
 
-class GridModel(QtCore.QObject):
-    updateSignal = QtCore.pyqtSignal()
+class Signal:
+    """Minimal observer list with the same connect/emit interface as a Qt signal.
+
+    Keeps the core models free of Qt; qt_models.QtGridModel bridges these
+    notifications onto real Qt signals for the GUI.
+    """
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def disconnect(self, slot):
+        self._slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
+
+
+# Terrain is stored as one byte per cell
+TERRAIN_COLORS = ("brown", "maroon", "grey", "gold")
+TERRAIN_CODES = {color: code for code, color in enumerate(TERRAIN_COLORS)}
+# Cost of entering each terrain: normal 1, difficult 3, obstacle impassable, goal normal
+TERRAIN_COSTS = (1, 3, None, 1)
+# bytes.translate table turning a row of terrain codes into 1 (passable) / 0 (blocked)
+PASSABLE = bytes([cost is not None for cost in TERRAIN_COSTS] + [0] * (256 - len(TERRAIN_COSTS)))
+GOLD = TERRAIN_CODES["gold"]
+VALID_CODES = bytes(range(len(TERRAIN_COLORS)))
+
+
+def line_cells(start_row, start_col, end_row, end_col):
+    """Cells on the Bresenham line between two cells, both ends included"""
+    cells = []
+    d_row, d_col = abs(end_row - start_row), abs(end_col - start_col)
+    step_row = 1 if end_row >= start_row else -1
+    step_col = 1 if end_col >= start_col else -1
+    error = d_col - d_row
+    row, col = start_row, start_col
+    while True:
+        cells.append((row, col))
+        if row == end_row and col == end_col:
+            return cells
+        doubled = 2 * error
+        if doubled > -d_row:
+            error -= d_row
+            col += step_col
+        if doubled < d_col:
+            error += d_col
+            row += step_row
+
+
+class GridDiff(Sequence):
+    """Cells changed by one edit, packed as flat indices with old and new terrain codes.
+
+    Reads like a list of (row, col) tuples, so views can simply iterate it.
+    """
+    def __init__(self, cols):
+        self.cols = cols
+        self.indices = array('I')
+        self.old = bytearray()
+        self.new = bytearray()
+
+    def append(self, index, old, new):
+        self.indices.append(index)
+        self.old.append(old)
+        self.new.append(new)
+
+    def extend(self, other):
+        self.indices.extend(other.indices)
+        self.old.extend(other.old)
+        self.new.extend(other.new)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [divmod(flat, self.cols) for flat in self.indices[index]]
+        return divmod(self.indices[index], self.cols)
+
+    def __iter__(self):
+        cols = self.cols
+        for flat in self.indices:
+            yield divmod(flat, cols)
+
+    @property
+    def nbytes(self):
+        return self.indices.itemsize * len(self.indices) + len(self.old) + len(self.new)
+
+
+class GridModel:
     """Holds the logical state of the dungeon grid."""
-    def __init__(self, rows, cols, default_color="brown"):
-        super().__init__()
+    # Above this share of the map, re-labelling everything beats per-cell updates
+    BULK_REBUILD_FRACTION = 0.125
+
+    def __init__(self, rows, cols, default_color="brown", codes=None):
+        # updateSignal fires once per edit; cellsChangedSignal carries a
+        # GridDiff of the touched cells, or None when the whole grid changed
+        self.updateSignal = Signal()
+        self.cellsChangedSignal = Signal()
         self.rows = rows
         self.cols = cols
-        self.grid = [[default_color for _ in range(cols)] for _ in range(rows)]
-        # Set the goal cell (bottom-right) to gold
-        self.grid[rows - 1][cols - 1] = "gold"
+        self.default_code = TERRAIN_CODES[default_color]
+        self.version = 0  # Bumped on every edit
+        # Snapshot from just before the latest whole-grid change (load, reset or restore), for undo
+        self.previous_grid = None
+        if codes is None:
+            self._fill_grid(self.default_code)
+        else:
+            # Start from a flat row-major buffer of terrain codes (see load_codes)
+            self._set_rows(self._rows_from_codes(codes))
+        # Reachability index, kept in sync with every edit
+        self.components = ComponentIndex(self)
 
     def toggle_cell(self, row, col):
         """Cycle through tile types: brown (normal) -> maroon (difficult) -> gold (goal) -> grey (obstacle)"""
-        current = self.grid[row][col]
+        current = self.get_cell_color(row, col)
         if current == "brown":
-            self.grid[row][col] = "maroon"
+            new_color = "maroon"
         elif current == "maroon":
-            self.grid[row][col] = "grey"
+            new_color = "grey"
         elif current == "gold":
-            self.grid[row][col] = "gold"
+            new_color = "gold"
         else:  # grey
-            self.grid[row][col] = "brown"
-        self.updateSignal.emit()
-        return self.grid[row][col]
+            new_color = "brown"
+        self.set_cells([(row, col)], new_color)
+        return new_color
     
     def set_cell_color(self, row, col, color):
-        self.grid[row][col] = color
+        self.set_cells([(row, col)], color)
+
+    def set_cells(self, cells, color):
+        """Paint many cells in one pass with a single change notification"""
+        code = TERRAIN_CODES[color]
+        cols = self.cols
+        self._write((row * cols + col, code) for row, col in cells)
+
+    def write_codes(self, indices, codes):
+        """Write raw terrain codes at flat cell indices (used by undo/redo and loaders)"""
+        self._write(zip(indices, codes))
+
+    def _write(self, updates):
+        """Apply (flat index, code) updates and notify once with the resulting diff"""
+        diff = GridDiff(self.cols)
+        cols = self.cols
+        for index, code in updates:
+            row, col = divmod(index, cols)
+            old = self.grid[row][col]
+            if old != code:
+                self._writable_row(row)[col] = code
+                diff.append(index, old, code)
+        if not diff:
+            return
+        self.version += 1
+        if len(diff) > self.BULK_REBUILD_FRACTION * self.rows * self.cols:
+            self.components.rebuild()
+        else:
+            for row, col in diff:
+                self.components.update_cell(row, col)
+        self.cellsChangedSignal.emit(diff)
         self.updateSignal.emit()
 
+    def _region(self, cells):
+        """Drop out-of-bounds cells and the goal, which always stays gold"""
+        goal = (self.rows - 1, self.cols - 1)
+        return [(row, col) for row, col in cells
+                if 0 <= row < self.rows and 0 <= col < self.cols and (row, col) != goal]
+
+    def fill_rect(self, top, left, bottom, right, color):
+        """Paint every cell of a rectangle (corners inclusive) that lies on the grid"""
+        top, bottom = sorted((top, bottom))
+        left, right = sorted((left, right))
+        top, bottom = max(0, top), min(self.rows - 1, bottom)
+        left, right = max(0, left), min(self.cols - 1, right)
+        if top > bottom or left > right:
+            return  # Entirely outside the grid
+        self.set_cells(self._region((row, col) for row in range(top, bottom + 1)
+                                    for col in range(left, right + 1)), color)
+
+    def paint_line(self, start_row, start_col, end_row, end_col, color):
+        """Paint a gap-free line between two cells, e.g. between mouse drag samples"""
+        self.set_cells(self._region(line_cells(start_row, start_col, end_row, end_col)), color)
+
+    def flood_fill(self, row, col, color):
+        """Repaint the 4-connected region of same-coloured cells around (row, col)"""
+        target = self.grid[row][col]
+        if target == TERRAIN_CODES[color] or target == GOLD:
+            return
+        region = [(row, col)]
+        seen = {(row, col)}
+        queue = deque(region)
+        while queue:
+            r, c = queue.popleft()
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < self.rows and 0 <= nc < self.cols and (nr, nc) not in seen \
+                        and self.grid[nr][nc] == target:
+                    seen.add((nr, nc))
+                    region.append((nr, nc))
+                    queue.append((nr, nc))
+        self.set_cells(region, color)
+
+    def apply_mask(self, mask, color):
+        """Paint every cell whose entry in mask is truthy.
+
+        mask is a flat row-major sequence of rows * cols values (a list,
+        bytes, array, ...), e.g. a scripted layout.
+        """
+        if len(mask) != self.rows * self.cols:
+            raise ValueError(f"mask has {len(mask)} entries, expected {self.rows * self.cols}")
+        cols = self.cols
+        self.set_cells(self._region(divmod(index, cols) for index, value in enumerate(mask) if value), color)
+
     def get_cell_color(self, row, col):
-        return self.grid[row][col]
+        return TERRAIN_COLORS[self.grid[row][col]]
     
     def get_cell_cost(self, row, col):
         """Get movement cost for a cell. Grey (obstacle) returns None."""
-        color = self.grid[row][col]
-        if color == "grey":
-            return None  # Impassable
-        elif color == "maroon":
-            return 3  # Difficult terrain
-        elif color == "gold":
-            return 1  # Goal has normal cost
-        else:  # brown
-            return 1  # Normal terrain
+        return TERRAIN_COSTS[self.grid[row][col]]
+
+    def snapshot(self):
+        """Immutable view of the current grid, taken in O(1).
+
+        The snapshot shares row buffers with the model; the model copies the
+        row table and any row it edits afterwards (copy-on-write), so later
+        edits never show through and untouched rows are never copied.
+        """
+        if self._snapshot is None or self._snapshot.version != self.version:
+            self._generation += 1
+            self._snapshot = GridSnapshot(self.grid, self.rows, self.cols, self.version)
+        return self._snapshot
+
+    def load_codes(self, codes):
+        """Replace the whole grid from a flat row-major buffer of terrain codes"""
+        rows = self._rows_from_codes(codes)
+        self.previous_grid = self.snapshot()
+        self._set_rows(rows)
+        self.version += 1
+        self.components.rebuild()
+        self.cellsChangedSignal.emit(None)
+        self.updateSignal.emit()
+
+    def restore(self, snapshot):
+        """Return the whole grid to an earlier snapshot (shares its rows copy-on-write)"""
+        self.previous_grid = self.snapshot()
+        self._generation += 1
+        self.grid = list(snapshot.grid)
+        self._grid_generation = self._generation
+        self._snapshot = None
+        self.version += 1
+        self.components.rebuild()
+        self.cellsChangedSignal.emit(None)
+        self.updateSignal.emit()
+
+    def _writable_row(self, row):
+        """Row buffer that is safe to modify, copying it if a snapshot still shares it"""
+        if self._grid_generation != self._generation:
+            self.grid = list(self.grid)
+            self._grid_generation = self._generation
+        if self._row_generation[row] != self._generation:
+            self.grid[row] = bytearray(self.grid[row])
+            self._row_generation[row] = self._generation
+        return self.grid[row]
+
+    def _fill_grid(self, code):
+        """Start from fresh rows of one terrain, with the goal cell gold"""
+        rows = [bytearray([code]) * self.cols for _ in range(self.rows)]
+        rows[self.rows - 1][self.cols - 1] = GOLD
+        self._set_rows(rows)
+
+    def _rows_from_codes(self, codes):
+        if len(codes) != self.rows * self.cols:
+            raise ValueError(f"expected {self.rows * self.cols} cells, got {len(codes)}")
+        if bytes(codes).translate(None, VALID_CODES):
+            raise ValueError(f"terrain codes must be below {len(TERRAIN_COLORS)}")
+        cols = self.cols
+        view = memoryview(codes)
+        return [bytearray(view[row * cols:(row + 1) * cols]) for row in range(self.rows)]
+
+    def _set_rows(self, rows):
+        """Install freshly built (unshared) row buffers"""
+        self.grid = rows
+        # Rows and the row table are private until the next snapshot bumps the generation
+        self._generation = 0
+        self._grid_generation = 0
+        self._row_generation = [0] * self.rows
+        self._snapshot = None
     
+    def passable_row(self, row):
+        """1 for every passable cell of a row, 0 for the blocked ones"""
+        return self.grid[row].translate(PASSABLE)
+
+    def is_reachable(self, start, goal):
+        """O(1) check whether goal can be reached from start"""
+        return self.components.connected(start, goal)
+
     def reset_grid(self):
-        for i in range(self.rows):
-            for j in range(self.cols):
-                self.grid[i][j] = "brown"
         # Keep the goal cell gold
-        self.grid[self.rows - 1][self.cols - 1] = "gold"
+        self.previous_grid = self.snapshot()
+        self._fill_grid(TERRAIN_CODES["brown"])
+        self.version += 1
+        self.components.rebuild()
+        self.cellsChangedSignal.emit(None)
         self.updateSignal.emit()
 
 
+class GridSnapshot:
+    """Read-only version of a GridModel, safe to search while the model is edited"""
+    def __init__(self, grid, rows, cols, version):
+        self.grid = grid
+        self.rows = rows
+        self.cols = cols
+        self.version = version
+
+    def get_cell_color(self, row, col):
+        return TERRAIN_COLORS[self.grid[row][col]]
+
+    def get_cell_cost(self, row, col):
+        return TERRAIN_COSTS[self.grid[row][col]]
+
+
 class PlayerModel:
     """Holds player's logical position."""
     def __init__(self, row=0, col=0):
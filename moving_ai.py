@@ -0,0 +1,179 @@
+"""Moving AI benchmark maps and scenarios (movingai.com/benchmarks).
+
+A .map file is a short header followed by one text line per row:
+
+    type octile
+    height 512
+    width 512
+    map
+    ....TT@@@...
+
+Passable ground ('.', 'G') becomes brown, swamp ('S') maroon, and trees,
+water and walls ('T', 'W', '@', 'O') grey. Rows are translated a line at a
+time straight into the flat code buffer GridModel.load_codes takes.
+
+A .scen file lists queries, one per line after "version 1":
+
+    bucket  map  width  height  start_x  start_y  goal_x  goal_y  optimal_length
+
+x is the column and y the row. The optimal lengths are for 8-connected
+movement with diagonals costing sqrt(2), while DungeonWalker moves in four
+directions and pays for the cells it enters. A 4-connected path can never be
+shorter, so run_scenarios checks every answer against the published length as
+a lower bound and, given a reference engine, checks that the engine under test
+matches the reference's cost exactly.
+
+Run with: python moving_ai.py arena.map arena.scen --algorithm "A*" --reference Dijkstra
+"""
+import argparse
+import sys
+import time
+
+import artifact_cache
+from models import TERRAIN_CODES, GridModel
+from pathfinder import Pathfinder
+from run_length import RunLengthGrid
+
+TERRAIN_FOR_CHAR = {
+    ".": "brown", "G": "brown",
+    "S": "maroon",
+    "T": "grey", "W": "grey", "@": "grey", "O": "grey",
+}
+UNKNOWN = 255
+# bytes.translate table from map characters to terrain codes
+TRANSLATION = bytearray([UNKNOWN]) * 256
+for _char, _color in TERRAIN_FOR_CHAR.items():
+    TRANSLATION[ord(_char)] = TERRAIN_CODES[_color]
+TRANSLATION = bytes(TRANSLATION)
+
+
+def read_map(path):
+    """(rows, cols, codes) from a .map file; codes is a flat row-major bytearray"""
+    with open(path, "rb") as file:
+        header = {}
+        for line in file:
+            line = line.strip()
+            if line == b"map":
+                break
+            key, _, value = line.partition(b" ")
+            header[key.decode()] = value.strip().decode()
+        else:
+            raise ValueError(f"{path} has no map section")
+        rows, cols = int(header["height"]), int(header["width"])
+        codes = bytearray(rows * cols)
+        for row in range(rows):
+            line = file.readline().rstrip(b"\r\n")
+            if len(line) != cols:
+                raise ValueError(f"{path}: row {row} has {len(line)} cells, expected {cols}")
+            translated = line.translate(TRANSLATION)
+            if UNKNOWN in translated:
+                raise ValueError(f"{path}: unknown terrain {chr(line[translated.index(UNKNOWN)])!r} in row {row}")
+            codes[row * cols:(row + 1) * cols] = translated
+    return rows, cols, codes
+
+
+def load_map(path, sparse=False):
+    """A GridModel (or RunLengthGrid with sparse=True) holding a .map file"""
+    rows, cols, codes = read_map(path)
+    if sparse:
+        return RunLengthGrid.from_codes(rows, cols, codes)
+    return GridModel(rows, cols, codes=codes)
+
+
+class Scenario:
+    """One benchmark query; start and goal are (row, col)"""
+    __slots__ = ("bucket", "map_name", "start", "goal", "optimal")
+
+    def __init__(self, bucket, map_name, start, goal, optimal):
+        self.bucket = bucket
+        self.map_name = map_name
+        self.start = start
+        self.goal = goal
+        self.optimal = optimal  # Octile length published with the benchmark
+
+    def __repr__(self):
+        return f"Scenario({self.start} -> {self.goal}, optimal {self.optimal})"
+
+
+def read_scenarios(path):
+    scenarios = []
+    with open(path) as file:
+        for line in file:
+            fields = line.split()
+            if not fields or fields[0] == "version":
+                continue
+            if len(fields) != 9:
+                raise ValueError(f"{path}: expected 9 fields, got {len(fields)}: {line.strip()!r}")
+            bucket, map_name = int(fields[0]), fields[1]
+            start_x, start_y, goal_x, goal_y = (int(field) for field in fields[4:8])
+            scenarios.append(Scenario(bucket, map_name, (start_y, start_x), (goal_y, goal_x), float(fields[8])))
+    return scenarios
+
+
+def run_scenarios(grid_model, scenarios, algorithm="A*", reference=None, limit=None):
+    """Answer every scenario through Pathfinder and check the results.
+
+    Returns a report with totals and a list of failures: a missing path, a
+    broken path, a cost below the published octile length, or (with a
+    reference engine) a cost that differs from the reference's.
+    """
+    report = {'algorithm': algorithm, 'queries': 0, 'solved': 0, 'expansions': 0, 'search_ms': 0.0,
+              'reference_ms': 0.0, 'failures': []}
+    for scenario in scenarios[:limit]:
+        report['queries'] += 1
+        began = time.perf_counter()
+        result = Pathfinder.get_path(*scenario.start, algorithm, grid_model, record_history=False,
+                                     goal=scenario.goal)
+        report['search_ms'] += (time.perf_counter() - began) * 1000
+        report['expansions'] += result['search_history'].expansions
+        path = result['final_path']
+        problem = None
+        cost = None
+        if not path:
+            problem = "no path"
+        elif path[0] != scenario.start or path[-1] != scenario.goal or any(
+                abs(a[0] - b[0]) + abs(a[1] - b[1]) != 1 or grid_model.get_cell_cost(*b) is None
+                for a, b in zip(path, path[1:])):
+            problem = "invalid path"
+        else:
+            cost = sum(grid_model.get_cell_cost(row, col) for row, col in path[1:])
+            if cost < scenario.optimal - 1e-6:
+                problem = "shorter than the octile optimum"
+        if problem is None and reference is not None:
+            began = time.perf_counter()
+            expected = Pathfinder.get_path(*scenario.start, reference, grid_model, record_history=False,
+                                           goal=scenario.goal)['final_path']
+            report['reference_ms'] += (time.perf_counter() - began) * 1000
+            expected_cost = sum(grid_model.get_cell_cost(row, col) for row, col in expected[1:])
+            if cost != expected_cost:
+                problem = f"cost {cost}, {reference} found {expected_cost}"
+        if problem is None:
+            report['solved'] += 1
+        else:
+            report['failures'].append((scenario, problem))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run Moving AI scenarios through Pathfinder")
+    parser.add_argument("map")
+    parser.add_argument("scen")
+    parser.add_argument("--algorithm", default="A*")
+    parser.add_argument("--reference", default=None, help="engine whose costs the algorithm must match")
+    parser.add_argument("--limit", type=int, default=None, help="only run the first N scenarios")
+    artifact_cache.add_arguments(parser)
+    args = parser.parse_args()
+    Pathfinder.verbose = False
+    artifact_cache.configure(artifact_cache.directory_from(args))
+
+    began = time.perf_counter()
+    grid = load_map(args.map)
+    scenarios = read_scenarios(args.scen)
+    print(f"Loaded {grid.rows}x{grid.cols} map and {len(scenarios)} scenarios "
+          f"in {(time.perf_counter() - began) * 1000:.0f} ms")
+    report = run_scenarios(grid, scenarios, args.algorithm, args.reference, args.limit)
+    print(f"{report['algorithm']}: {report['solved']}/{report['queries']} passed, "
+          f"{report['expansions']} expanded, {report['search_ms']:.0f} ms searching")
+    for scenario, problem in report['failures'][:20]:
+        print(f"  {scenario}: {problem}")
+    sys.exit(1 if report['failures'] else 0)
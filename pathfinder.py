@@ -1,55 +1,180 @@
 from collections import deque
 import heapq
+from itertools import count
+import time
+from indexed_heap import IndexedHeap
+from search_history import SearchHistory
+from landmarks import LandmarkIndex
+from symmetry import RectangleIndex
+from contraction import ContractionHierarchy
+from auto_select import AutoSelector
+
+# 'queue_stats' of a search that never ran (the goal was walled off)
+EMPTY_QUEUE_STATS = {'max_size': 0, 'pushes': 0, 'decrease_keys': 0, 'stale_pops': 0}
+
+class SearchBudget:
+    """Limits how much work a single search may do (expansions and/or wall time)."""
+    # Reading the clock on every expansion is wasteful, so only check it periodically
+    CLOCK_CHECK_INTERVAL = 64
+
+    def __init__(self, max_expansions=None, time_budget_ms=None):
+        self.max_expansions = max_expansions
+        self.time_budget_ms = time_budget_ms
+        self.expansions = 0
+        self.deadline = None
+        if time_budget_ms is not None:
+            self.deadline = time.perf_counter() + time_budget_ms / 1000.0
+
+    def exhausted(self):
+        """Count one expansion and report whether the budget has run out."""
+        self.expansions += 1
+        if self.max_expansions is not None and self.expansions > self.max_expansions:
+            return True
+        if self.deadline is not None and self.expansions % self.CLOCK_CHECK_INTERVAL == 0:
+            return time.perf_counter() >= self.deadline
+        return False
+
+
+class AlgorithmInfo:
+    """A registered search engine and what Auto needs to know about it"""
+    def __init__(self, name, search, optimal, weighted, preprocessing=None, index=None, memory_bounded=False,
+                 queue_stats=False, **options):
+        self.name = name
+        # search(start_row, start_col, grid_model, budget, record_history, **options) -> result dict
+        self.search = search
+        self.optimal = optimal  # Always returns a cheapest path
+        self.weighted = weighted  # Accounts for maroon costs (otherwise it counts steps)
+        self.preprocessing = preprocessing  # Name of the per-grid structure it builds, if any
+        self.index = index  # Class caching that structure per grid (for_grid)
+        self.memory_bounded = memory_bounded  # Takes get_path's memory_limit
+        self.queue_stats = queue_stats  # Reports 'queue_stats' (EMPTY_QUEUE_STATS when nothing was searched)
+        self.options = options
 
 
 class Pathfinder:
+    # Log each search to stdout (servers and batch workers turn this off)
+    verbose = True
+    # Node / transposition-table cap for the memory-bounded searches
+    DEFAULT_MEMORY_LIMIT = 100_000
+    # Search engines by name, filled in by register() below the class
+    ALGORITHMS = {}
+
     @staticmethod
-    def get_path(start_row, start_col, algorithm, grid_model):
-        print(f"Pathfinding using {algorithm} from ({start_row}, {start_col})")
-        match algorithm:
-            case "BFS":
-                return Pathfinder.bfs(start_row, start_col, grid_model)
-            case "DFS":
-                return Pathfinder.dfs(start_row, start_col, grid_model)
-            case "Dijkstra":
-                return Pathfinder.dijkstra(start_row, start_col, grid_model)
-            case "A*":
-                return Pathfinder.a_star(start_row, start_col, grid_model)
-            
+    def get_path(start_row, start_col, algorithm, grid_model, max_expansions=None, time_budget_ms=None,
+                 record_history=True, memory_limit=None, goal=None):
+        """Run an engine by name (or "Auto") to goal, bottom-right by default.
+
+        Returns 'search_history', 'final_path' and 'partial' (the budget ran out),
+        plus any extras the engine reports. Unknown names raise ValueError.
+        """
+        auto = algorithm == "Auto"
+        if auto:
+            algorithm = AutoSelector.choose(grid_model, Pathfinder.ALGORITHMS, Pathfinder.is_prepared)
+        info = Pathfinder.ALGORITHMS.get(algorithm)
+        if info is None:
+            raise ValueError(f"unknown algorithm {algorithm!r}")
+        if Pathfinder.verbose:
+            print(f"Pathfinding using {algorithm}{' (auto)' if auto else ''} from ({start_row}, {start_col})")
+        budget = None
+        if max_expansions is not None or time_budget_ms is not None:
+            budget = SearchBudget(max_expansions, time_budget_ms)
+        # Answer walled-off goals instantly instead of flooding the whole region
+        goal = (grid_model.rows - 1, grid_model.cols - 1) if goal is None else tuple(goal)
+        if hasattr(grid_model, 'is_reachable') and not grid_model.is_reachable((start_row, start_col), goal):
+            if Pathfinder.verbose:
+                print("Goal is unreachable.")
+            result = {'search_history': SearchHistory(grid_model.cols, record_history), 'final_path': [], 'partial': False}
+            if info.queue_stats:
+                result['queue_stats'] = dict(EMPTY_QUEUE_STATS)
+            return result
+        began = time.perf_counter()
+        options = dict(info.options, memory_limit=memory_limit) if info.memory_bounded else info.options
+        result = info.search(start_row, start_col, grid_model, budget, record_history, goal=goal, **options)
+        if not result['partial']:
+            # Feed Auto's choices on this grid (a budget cut-off says nothing about speed)
+            AutoSelector.record(grid_model, algorithm, (time.perf_counter() - began) * 1000)
+        if auto:
+            result['algorithm'] = algorithm  # The engine Auto picked
+        return result
+
+    @staticmethod
+    def register(info):
+        """Add a search engine to the registry get_path dispatches on"""
+        Pathfinder.ALGORITHMS[info.name] = info
+
     @staticmethod
-    def bfs(start_row, start_col, grid_model):
+    def is_prepared(info, grid_model):
+        """Whether an engine's preprocessing is already built (or saved) for the grid's current version"""
+        if info.index is None:
+            return True
+        built = info.index._cache.get(grid_model)
+        if built is not None and built.version == getattr(grid_model, 'version', None):
+            return True
+        # A copy in the artifact cache loads in milliseconds, so it counts as built
+        return hasattr(info.index, 'is_cached') and info.index.is_cached(grid_model)
+
+    @staticmethod
+    def _reconstruct_path(parent, start, end):
+        """Follow parent links back from end to start"""
+        final_path = []
+        current = end
+        while current in parent:
+            final_path.append(current)
+            current = parent[current]
+        final_path.append(start)
+        final_path.reverse()
+        return final_path
+
+    @staticmethod
+    def _partial_result(search_history, parent, start, goal):
+        """Build the result for an exhausted budget: path to the discovered cell closest to the goal"""
+        goal_row, goal_col = goal
+
+        def heuristic(cell):
+            return abs(cell[0] - goal_row) + abs(cell[1] - goal_col)
+
+        # Every discovered cell (frontier or expanded) has a parent chain back to the start
+        best = min(parent, key=heuristic, default=start)
+        if heuristic(start) <= heuristic(best):
+            best = start
+        return {
+            'search_history': search_history,
+            'final_path': Pathfinder._reconstruct_path(parent, start, best),
+            'partial': True
+        }
+
+    @staticmethod
+    def bfs(start_row, start_col, grid_model, budget=None, record_history=True, goal=None):
         """Breadth-First Search pathfinding - returns search history and final path"""
         rows, cols = grid_model.rows, grid_model.cols
-        goal_row, goal_col = rows - 1, cols - 1  # Bottom-right corner
+        goal_row, goal_col = (rows - 1, cols - 1) if goal is None else goal  # Bottom-right corner by default
         
         # BFS uses a queue
         queue = deque([(start_row, start_col)])
         visited = set()
         visited.add((start_row, start_col))
         parent = {}  # To reconstruct path
-        search_history = []  # Track every cell visited in order
+        search_history = SearchHistory(cols, record_history)  # Track every cell visited in order
         
         # Directions: up, down, left, right
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         
         while queue:
             row, col = queue.popleft()
+            # Stop early once the planning budget is spent
+            if budget is not None and budget.exhausted():
+                return Pathfinder._partial_result(search_history, parent, (start_row, start_col), (goal_row, goal_col))
             search_history.append((row, col))  # Add to search history
             
             # Check if we reached the goal
             if row == goal_row and col == goal_col:
                 # Reconstruct the optimal path
-                final_path = []
-                current = (goal_row, goal_col)
-                while current in parent:
-                    final_path.append(current)
-                    current = parent[current]
-                final_path.append((start_row, start_col))
-                final_path.reverse()
+                final_path = Pathfinder._reconstruct_path(parent, (start_row, start_col), (goal_row, goal_col))
                 
                 return {
                     'search_history': search_history,
-                    'final_path': final_path
+                    'final_path': final_path,
+                    'partial': False
                 }
             
             # Explore neighbors
@@ -65,18 +190,18 @@ class Pathfinder:
                         queue.append((new_row, new_col))
         
         # No path found
-        return {'search_history': search_history, 'final_path': []}
+        return {'search_history': search_history, 'final_path': [], 'partial': False}
     
     @staticmethod
-    def dfs(start_row, start_col, grid_model):
+    def dfs(start_row, start_col, grid_model, budget=None, record_history=True, goal=None):
         """Depth-First Search pathfinding - returns search history and final path"""
         stack = [(start_row, start_col)]
         visited = set()
-        search_history = []
+        search_history = SearchHistory(grid_model.cols, record_history)
         parent = {}  # Track parent for path reconstruction
         
         rows, cols = grid_model.rows, grid_model.cols
-        goal_row, goal_col = rows - 1, cols - 1  # Bottom-right corner
+        goal_row, goal_col = (rows - 1, cols - 1) if goal is None else goal  # Bottom-right corner by default
         
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
 
@@ -85,22 +210,20 @@ class Pathfinder:
             if (row, col) in visited:
                 continue
             visited.add((row, col))
+            # Stop early once the planning budget is spent
+            if budget is not None and budget.exhausted():
+                return Pathfinder._partial_result(search_history, parent, (start_row, start_col), (goal_row, goal_col))
             search_history.append((row, col))
 
             # Check if we reached the goal
             if row == goal_row and col == goal_col:
                 # Reconstruct path
-                final_path = []
-                current = (goal_row, goal_col)
-                while current in parent:
-                    final_path.append(current)
-                    current = parent[current]
-                final_path.append((start_row, start_col))
-                final_path.reverse()
+                final_path = Pathfinder._reconstruct_path(parent, (start_row, start_col), (goal_row, goal_col))
                 
                 return {
                     'search_history': search_history,
-                    'final_path': final_path
+                    'final_path': final_path,
+                    'partial': False
                 }
 
             # Explore neighbors
@@ -115,47 +238,55 @@ class Pathfinder:
                             parent[(new_row, new_col)] = (row, col)
                         stack.append((new_row, new_col))
         
-        return {'search_history': search_history, 'final_path': []}
+        return {'search_history': search_history, 'final_path': [], 'partial': False}
 
     
     @staticmethod
-    def dijkstra(start_row, start_col, grid_model):
-        """Dijkstra's algorithm - finds shortest path with weighted costs"""
+    def dijkstra(start_row, start_col, grid_model, budget=None, record_history=True, goal=None):
+        """Dijkstra's algorithm - finds shortest path with weighted costs, and reports 'queue_stats'"""
         rows, cols = grid_model.rows, grid_model.cols
-        goal_row, goal_col = rows - 1, cols - 1
+        goal_row, goal_col = (rows - 1, cols - 1) if goal is None else goal
         
-        # Priority queue: (cost, row, col)
+        # Priority queue: (cost, row, col). Costs are paid on entering a cell, so a cell
+        # is almost always first queued at its final cost and a plain heapq with
+        # skipped duplicates beats a decrease-key heap (queue_stats counts the rare re-pushes)
         pq = [(0, start_row, start_col)]
+        pushes, decrease_keys, stale_pops, max_size = 1, 0, 0, 1
         visited = set()
-        search_history = []
+        search_history = SearchHistory(cols, record_history)
         costs = {(start_row, start_col): 0}
         parent = {}  # Track parent for path reconstruction
         
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         
+        def queue_stats():
+            return {'max_size': max_size, 'pushes': pushes, 'decrease_keys': decrease_keys, 'stale_pops': stale_pops}
+
         while pq:
             current_cost, row, col = heapq.heappop(pq)
             
             if (row, col) in visited:
+                stale_pops += 1
                 continue
             
             visited.add((row, col))
+            # Stop early once the planning budget is spent
+            if budget is not None and budget.exhausted():
+                result = Pathfinder._partial_result(search_history, parent, (start_row, start_col), (goal_row, goal_col))
+                result['queue_stats'] = queue_stats()
+                return result
             search_history.append((row, col))
             
             # Check if goal reached
             if row == goal_row and col == goal_col:
                 # Reconstruct path
-                final_path = []
-                current = (goal_row, goal_col)
-                while current in parent:
-                    final_path.append(current)
-                    current = parent[current]
-                final_path.append((start_row, start_col))
-                final_path.reverse()
+                final_path = Pathfinder._reconstruct_path(parent, (start_row, start_col), (goal_row, goal_col))
                 
                 return {
                     'search_history': search_history,
-                    'final_path': final_path
+                    'final_path': final_path,
+                    'partial': False,
+                    'queue_stats': queue_stats()
                 }
             
             # Explore neighbors
@@ -168,56 +299,70 @@ class Pathfinder:
                         if move_cost is not None:
                             new_cost = current_cost + move_cost
                             
-                            if (new_row, new_col) not in costs or new_cost < costs[(new_row, new_col)]:
+                            known = costs.get((new_row, new_col))
+                            if known is None or new_cost < known:
+                                if known is not None:
+                                    decrease_keys += 1  # Lazily: the old entry is skipped when popped
                                 costs[(new_row, new_col)] = new_cost
                                 parent[(new_row, new_col)] = (row, col)
                                 heapq.heappush(pq, (new_cost, new_row, new_col))
+                                pushes += 1
+            if len(pq) > max_size:
+                max_size = len(pq)
         
-        return {'search_history': search_history, 'final_path': []}
+        return {'search_history': search_history, 'final_path': [], 'partial': False, 'queue_stats': queue_stats()}
     
     @staticmethod
-    def a_star(start_row, start_col, grid_model):
-        """A* algorithm - finds shortest path using heuristic (Manhattan distance)"""
+    def a_star(start_row, start_col, grid_model, budget=None, record_history=True, heuristic=None, goal=None):
+        """A* algorithm - finds shortest path using heuristic (Manhattan distance unless one is given).
+        Reports 'queue_stats' like dijkstra."""
         rows, cols = grid_model.rows, grid_model.cols
-        goal_row, goal_col = rows - 1, cols - 1
+        goal_row, goal_col = (rows - 1, cols - 1) if goal is None else goal
         
         # Heuristic function: Manhattan distance to goal
-        def heuristic(row, col):
-            return abs(row - goal_row) + abs(col - goal_col)
+        if heuristic is None:
+            def heuristic(row, col):
+                return abs(row - goal_row) + abs(col - goal_col)
         
-        # Priority queue: (f_score, g_score, row, col)
+        # Priority queue: (f_score, g_score, row, col), duplicates skipped when popped (as in dijkstra)
         start_h = heuristic(start_row, start_col)
         pq = [(start_h, 0, start_row, start_col)]
+        pushes, decrease_keys, stale_pops, max_size = 1, 0, 0, 1
         visited = set()
-        search_history = []
+        search_history = SearchHistory(cols, record_history)
         g_scores = {(start_row, start_col): 0}
         parent = {}  # Track parent for path reconstruction
         
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         
+        def queue_stats():
+            return {'max_size': max_size, 'pushes': pushes, 'decrease_keys': decrease_keys, 'stale_pops': stale_pops}
+
         while pq:
             f_score, g_score, row, col = heapq.heappop(pq)
             
             if (row, col) in visited:
+                stale_pops += 1
                 continue
             
             visited.add((row, col))
+            # Stop early once the planning budget is spent
+            if budget is not None and budget.exhausted():
+                result = Pathfinder._partial_result(search_history, parent, (start_row, start_col), (goal_row, goal_col))
+                result['queue_stats'] = queue_stats()
+                return result
             search_history.append((row, col))
             
             # Check if goal reached
             if row == goal_row and col == goal_col:
                 # Reconstruct path
-                final_path = []
-                current = (goal_row, goal_col)
-                while current in parent:
-                    final_path.append(current)
-                    current = parent[current]
-                final_path.append((start_row, start_col))
-                final_path.reverse()
+                final_path = Pathfinder._reconstruct_path(parent, (start_row, start_col), (goal_row, goal_col))
                 
                 return {
                     'search_history': search_history,
-                    'final_path': final_path
+                    'final_path': final_path,
+                    'partial': False,
+                    'queue_stats': queue_stats()
                 }
             
             # Explore neighbors
@@ -230,11 +375,463 @@ class Pathfinder:
                         if move_cost is not None:
                             new_g_score = g_score + move_cost
                             
-                            if (new_row, new_col) not in g_scores or new_g_score < g_scores[(new_row, new_col)]:
+                            known = g_scores.get((new_row, new_col))
+                            if known is None or new_g_score < known:
+                                if known is not None:
+                                    decrease_keys += 1  # Lazily: the old entry is skipped when popped
                                 g_scores[(new_row, new_col)] = new_g_score
                                 parent[(new_row, new_col)] = (row, col)
                                 h_score = heuristic(new_row, new_col)
                                 f_score = new_g_score + h_score
                                 heapq.heappush(pq, (f_score, new_g_score, new_row, new_col))
+                                pushes += 1
+            if len(pq) > max_size:
+                max_size = len(pq)
         
-        return {'search_history': search_history, 'final_path': []}
+        return {'search_history': search_history, 'final_path': [], 'partial': False, 'queue_stats': queue_stats()}
+
+    @staticmethod
+    def _join_paths(forward_parent, backward_parent, start, meeting):
+        """Path from start to the meeting cell, then on along the backward search's links to the goal"""
+        final_path = Pathfinder._reconstruct_path(forward_parent, start, meeting)
+        cell = meeting
+        while cell in backward_parent:
+            cell = backward_parent[cell]
+            final_path.append(cell)
+        return final_path
+
+    @staticmethod
+    def bidirectional_bfs(start_row, start_col, grid_model, budget=None, record_history=True, goal=None):
+        """Breadth-First Search from both ends, a whole layer at a time, until the frontiers touch.
+        Reports the 'meeting_point' where they did."""
+        rows, cols = grid_model.rows, grid_model.cols
+        start, goal = (start_row, start_col), ((rows - 1, cols - 1) if goal is None else tuple(goal))
+        search_history = SearchHistory(cols, record_history)
+        if start == goal:
+            return {'search_history': search_history, 'final_path': [start], 'partial': False, 'meeting_point': start}
+
+        # Per side: depth of every discovered cell, parent links towards that side's end, current layer
+        forward = [{start: 0}, {}, [start]]
+        backward = [{goal: 0}, {}, [goal]]
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+        while forward[2] and backward[2]:
+            # Grow the smaller frontier by one full layer
+            side, other = (forward, backward) if len(forward[2]) <= len(backward[2]) else (backward, forward)
+            depth, parent, layer = side
+            other_depth = other[0]
+            best, meeting = None, None
+            next_layer = []
+            for row, col in layer:
+                # Stop early once the planning budget is spent
+                if budget is not None and budget.exhausted():
+                    return Pathfinder._partial_result(search_history, forward[1], start, goal)
+                search_history.append((row, col))
+                for dr, dc in directions:
+                    new_row, new_col = row + dr, col + dc
+                    if 0 <= new_row < rows and 0 <= new_col < cols and (new_row, new_col) not in depth \
+                            and grid_model.get_cell_color(new_row, new_col) != "grey":
+                        depth[(new_row, new_col)] = depth[(row, col)] + 1
+                        parent[(new_row, new_col)] = (row, col)
+                        next_layer.append((new_row, new_col))
+                        if (new_row, new_col) in other_depth:
+                            length = depth[(new_row, new_col)] + other_depth[(new_row, new_col)]
+                            if best is None or length < best:
+                                best, meeting = length, (new_row, new_col)
+            # Finish the layer first: a later cell in it may meet the other side sooner
+            if meeting is not None:
+                return {
+                    'search_history': search_history,
+                    'final_path': Pathfinder._join_paths(forward[1], backward[1], start, meeting),
+                    'partial': False,
+                    'meeting_point': meeting
+                }
+            side[2] = next_layer
+
+        return {'search_history': search_history, 'final_path': [], 'partial': False}
+
+    @staticmethod
+    def bidirectional_a_star(start_row, start_col, grid_model, budget=None, record_history=True, use_heuristic=True,
+                             goal=None):
+        """Bidirectional A* (bidirectional Dijkstra with use_heuristic=False); reports 'meeting_point'.
+
+        Both searches share the average potential (h_goal - h_start) / 2, which is
+        consistent in both directions, so the usual bidirectional Dijkstra stopping
+        rule stays exact with maroon costs: stop once the two smallest keys add up
+        to the cheapest path seen where the searches met. Keys are doubled to stay
+        in integers.
+        """
+        rows, cols = grid_model.rows, grid_model.cols
+        goal_row, goal_col = (rows - 1, cols - 1) if goal is None else goal
+        start, goal = (start_row, start_col), (goal_row, goal_col)
+
+        def potential(row, col):
+            if not use_heuristic:
+                return 0
+            return abs(row - goal_row) + abs(col - goal_col) - abs(row - start_row) - abs(col - start_col)
+
+        # Per side: queue of (key, row, col), cost from that side's end, parent links, sign of the potential
+        forward = (IndexedHeap(), {start: 0}, {}, 1)
+        backward = (IndexedHeap(), {goal: 0}, {}, -1)
+        forward[0].push(start_row * cols + start_col, (potential(start_row, start_col), start_row, start_col))
+        backward[0].push(goal_row * cols + goal_col, (-potential(goal_row, goal_col), goal_row, goal_col))
+        search_history = SearchHistory(cols, record_history)
+        best, meeting = (0, start) if start == goal else (float('inf'), None)
+
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+        while forward[0] and backward[0]:
+            forward_key, backward_key = forward[0].priorities[0][0], backward[0].priorities[0][0]
+            if forward_key + backward_key >= 2 * best:
+                break
+            side, other = (forward, backward) if forward_key <= backward_key else (backward, forward)
+            pq, costs, parent, sign = side
+            other_costs = other[1]
+            (_, row, col), _ = pq.pop()
+            # Stop early once the planning budget is spent
+            if budget is not None and budget.exhausted():
+                return Pathfinder._partial_result(search_history, forward[2], start, goal)
+            search_history.append((row, col))
+
+            # Moves pay for the cell they enter, so stepping backwards costs the current cell
+            current_cost = costs[(row, col)]
+            here_cost = grid_model.get_cell_cost(row, col)
+            for dr, dc in directions:
+                new_row, new_col = row + dr, col + dc
+                if 0 <= new_row < rows and 0 <= new_col < cols:
+                    move_cost = grid_model.get_cell_cost(new_row, new_col)
+                    if move_cost is None:
+                        continue
+                    new_cost = current_cost + (move_cost if sign > 0 else here_cost)
+                    if new_cost < costs.get((new_row, new_col), new_cost + 1):
+                        costs[(new_row, new_col)] = new_cost
+                        parent[(new_row, new_col)] = (row, col)
+                        key = 2 * new_cost + sign * potential(new_row, new_col)
+                        pq.push(new_row * cols + new_col, (key, new_row, new_col))
+                        if (new_row, new_col) in other_costs and new_cost + other_costs[(new_row, new_col)] < best:
+                            best, meeting = new_cost + other_costs[(new_row, new_col)], (new_row, new_col)
+
+        if meeting is None:
+            return {'search_history': search_history, 'final_path': [], 'partial': False}
+        return {
+            'search_history': search_history,
+            'final_path': Pathfinder._join_paths(forward[2], backward[2], start, meeting),
+            'partial': False,
+            'meeting_point': meeting
+        }
+
+    @staticmethod
+    def rsr_a_star(start_row, start_col, grid_model, budget=None, record_history=True, goal=None):
+        """A* over a Rectangular Symmetry Reduction of the grid - only rectangle perimeters are expanded"""
+        rows, cols = grid_model.rows, grid_model.cols
+        goal_row, goal_col = (rows - 1, cols - 1) if goal is None else goal
+        goal = (goal_row, goal_col)
+        rectangles = RectangleIndex.for_grid(grid_model)
+
+        def heuristic(row, col):
+            return abs(row - goal_row) + abs(col - goal_col)
+
+        pq = IndexedHeap()
+        pq.push(start_row * cols + start_col, (heuristic(start_row, start_col), 0, start_row, start_col))
+        visited = set()
+        search_history = SearchHistory(cols, record_history)
+        g_scores = {(start_row, start_col): 0}
+        parent = {}  # Links may jump across a rectangle; expand_path fills in the cells
+
+        while pq:
+            (f_score, g_score, row, col), _ = pq.pop()
+            visited.add((row, col))
+            if budget is not None and budget.exhausted():
+                result = Pathfinder._partial_result(search_history, parent, (start_row, start_col), goal)
+                result['final_path'] = RectangleIndex.expand_path(result['final_path'])
+                return result
+            search_history.append((row, col))
+
+            if (row, col) == goal:
+                final_path = Pathfinder._reconstruct_path(parent, (start_row, start_col), goal)
+                return {
+                    'search_history': search_history,
+                    'final_path': RectangleIndex.expand_path(final_path),
+                    'partial': False
+                }
+
+            for cell, move_cost in rectangles.successors(row, col, goal):
+                if cell in visited:
+                    continue
+                new_g_score = g_score + move_cost
+                if cell not in g_scores or new_g_score < g_scores[cell]:
+                    g_scores[cell] = new_g_score
+                    parent[cell] = (row, col)
+                    new_row, new_col = cell
+                    pq.push(new_row * cols + new_col,
+                            (new_g_score + heuristic(new_row, new_col), new_g_score, new_row, new_col))
+
+        return {'search_history': search_history, 'final_path': [], 'partial': False}
+
+    @staticmethod
+    def ida_star(start_row, start_col, grid_model, budget=None, record_history=True, memory_limit=None, goal=None):
+        """Iterative-deepening A* - optimal path using memory proportional to the path length.
+
+        A transposition table of the best cost seen per cell prunes repeated
+        visits within an iteration; it stops growing at memory_limit entries
+        (the search stays correct, it just re-explores more).
+        """
+        rows, cols = grid_model.rows, grid_model.cols
+        goal_row, goal_col = (rows - 1, cols - 1) if goal is None else goal
+        table_limit = memory_limit or Pathfinder.DEFAULT_MEMORY_LIMIT
+        search_history = SearchHistory(cols, record_history)
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+        def heuristic(row, col):
+            return abs(row - goal_row) + abs(col - goal_col)
+
+        bound = heuristic(start_row, start_col)
+        while True:
+            # One depth-first pass limited by f = g + h <= bound; the stack holds the current path
+            table = {(start_row, start_col): 0}
+            stack = [(start_row, start_col, 0, iter(directions))]
+            on_path = {(start_row, start_col)}
+            search_history.append((start_row, start_col))
+            if (start_row, start_col) == (goal_row, goal_col):
+                return {'search_history': search_history, 'final_path': [(start_row, start_col)], 'partial': False}
+            next_bound = None
+
+            while stack:
+                row, col, g_score, moves = stack[-1]
+                move = next(moves, None)
+                if move is None:
+                    stack.pop()
+                    on_path.discard((row, col))
+                    continue
+                new_row, new_col = row + move[0], col + move[1]
+                if not (0 <= new_row < rows and 0 <= new_col < cols) or (new_row, new_col) in on_path:
+                    continue
+                move_cost = grid_model.get_cell_cost(new_row, new_col)
+                if move_cost is None:
+                    continue
+                new_g_score = g_score + move_cost
+                f_score = new_g_score + heuristic(new_row, new_col)
+                if f_score > bound:
+                    # Remember the smallest f beyond the bound for the next iteration
+                    if next_bound is None or f_score < next_bound:
+                        next_bound = f_score
+                    continue
+                if table.get((new_row, new_col), new_g_score + 1) <= new_g_score:
+                    continue  # Already reached at least as cheaply this iteration
+                if len(table) < table_limit:
+                    table[(new_row, new_col)] = new_g_score
+
+                if budget is not None and budget.exhausted():
+                    # Best effort: the part of the current path closest to the goal
+                    path = [(r, c) for r, c, _, _ in stack]
+                    best = min(range(len(path)), key=lambda i: heuristic(*path[i]))
+                    return {'search_history': search_history, 'final_path': path[:best + 1], 'partial': True}
+                search_history.append((new_row, new_col))
+
+                if new_row == goal_row and new_col == goal_col:
+                    final_path = [(r, c) for r, c, _, _ in stack]
+                    final_path.append((goal_row, goal_col))
+                    return {'search_history': search_history, 'final_path': final_path, 'partial': False}
+                stack.append((new_row, new_col, new_g_score, iter(directions)))
+                on_path.add((new_row, new_col))
+
+            if next_bound is None:
+                # Nothing was cut off by the bound, so the goal is unreachable
+                return {'search_history': search_history, 'final_path': [], 'partial': False}
+            bound = next_bound
+
+    @staticmethod
+    def sma_star(start_row, start_col, grid_model, budget=None, record_history=True, memory_limit=None, goal=None):
+        """Simplified Memory-bounded A* - keeps at most memory_limit search nodes.
+
+        When memory is full the shallowest, highest-f leaf is forgotten and its
+        f value is backed up into its parent, which regenerates it later if it
+        becomes promising again. The path is optimal as long as the limit is
+        larger than the number of cells on it.
+        """
+        rows, cols = grid_model.rows, grid_model.cols
+        goal_row, goal_col = (rows - 1, cols - 1) if goal is None else goal
+        max_nodes = max(2, memory_limit or Pathfinder.DEFAULT_MEMORY_LIMIT)
+        search_history = SearchHistory(cols, record_history)
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        infinity = float('inf')
+
+        def heuristic(row, col):
+            return abs(row - goal_row) + abs(col - goal_col)
+
+        root = _SMANode((start_row, start_col), 0, heuristic(start_row, start_col), 0, None)
+        # Cheapest cost seen per cell (capped like the node count) to skip dominated duplicates
+        best_g = {root.cell: 0}
+        open_nodes = {root}
+        node_count = 1
+        # Lazy heaps: best = least f then deepest, worst = highest f then shallowest
+        sequence = count()
+        best_heap = [(root.f, 0, next(sequence), root)]
+        worst_heap = [(-root.f, 0, next(sequence), root)]
+
+        def push(node):
+            heapq.heappush(best_heap, (node.f, -node.depth, next(sequence), node))
+            if not node.children:
+                heapq.heappush(worst_heap, (-node.f, node.depth, next(sequence), node))
+
+        def path_to(node):
+            path = []
+            while node is not None:
+                path.append(node.cell)
+                node = node.parent
+            path.reverse()
+            return path
+
+        def backup(node):
+            # A fully generated node is worth its best successor, forgotten ones included
+            while node is not None and node.next_move >= len(directions):
+                new_f = min([child.f for child in node.children] + list(node.forgotten.values()),
+                            default=infinity)
+                if new_f <= node.f:
+                    break
+                node.f = new_f
+                if node in open_nodes:
+                    push(node)
+                node = node.parent
+
+        while open_nodes:
+            # Drop stale heap entries left behind by f updates and removals
+            while best_heap and (best_heap[0][3] not in open_nodes or best_heap[0][0] != best_heap[0][3].f):
+                heapq.heappop(best_heap)
+            if not best_heap:
+                break
+            best = best_heap[0][3]
+            if best.f == infinity:
+                break  # Every remaining route needs more memory than allowed
+
+            if budget is not None and budget.exhausted():
+                closest = min(open_nodes, key=lambda node: heuristic(*node.cell))
+                return {'search_history': search_history, 'final_path': path_to(closest), 'partial': True}
+            search_history.append(best.cell)
+            if best.cell == (goal_row, goal_col):
+                return {'search_history': search_history, 'final_path': path_to(best), 'partial': False}
+
+            # Generate one successor: the next new one, or once those run out the best forgotten one
+            successor = None
+            depth = best.depth + 1
+            parent_cell = best.parent.cell if best.parent is not None else None
+            while successor is None and best.next_move < len(directions):
+                dr, dc = directions[best.next_move]
+                best.next_move += 1
+                new_row, new_col = best.cell[0] + dr, best.cell[1] + dc
+                if not (0 <= new_row < rows and 0 <= new_col < cols) or (new_row, new_col) == parent_cell:
+                    continue
+                move_cost = grid_model.get_cell_cost(new_row, new_col)
+                if move_cost is None:
+                    continue
+                g_score = best.g + move_cost
+                if best_g.get((new_row, new_col), g_score) < g_score:
+                    continue  # Another branch reaches this cell more cheaply
+                if len(best_g) < max_nodes or (new_row, new_col) in best_g:
+                    best_g[(new_row, new_col)] = g_score
+                f_score = max(best.f, g_score + heuristic(new_row, new_col))  # Pathmax
+                successor = _SMANode((new_row, new_col), g_score, f_score, depth, best)
+            if successor is None and best.forgotten:
+                cell = min(best.forgotten, key=best.forgotten.get)
+                remembered_f = best.forgotten.pop(cell)
+                g_score = best.g + grid_model.get_cell_cost(*cell)
+                successor = _SMANode(cell, g_score, max(best.f, remembered_f), depth, best)
+            if successor is not None:
+                if successor.cell != (goal_row, goal_col) and depth >= max_nodes - 1:
+                    successor.f = infinity  # The path can't be extended within the memory limit
+                best.children.append(successor)
+                open_nodes.add(successor)
+                node_count += 1
+                push(successor)
+
+            if best.next_move >= len(directions) and not best.forgotten:
+                # Every successor is in memory, so best leaves the frontier
+                open_nodes.discard(best)
+                if not best.children:
+                    # Dead end: drop it for good and let its parent take its place if needed
+                    node_count -= 1
+                    parent = best.parent
+                    if parent is None:
+                        break
+                    parent.children.remove(best)
+                    if parent not in open_nodes and not parent.children:
+                        open_nodes.add(parent)
+                        push(parent)
+                    backup(parent)
+                else:
+                    backup(best)
+
+            # Over the limit: forget the shallowest highest-f leaf, remembering its f in the parent
+            while node_count > max_nodes:
+                entry = heapq.heappop(worst_heap)
+                bad = entry[3]
+                if bad not in open_nodes or bad.children or -entry[0] != bad.f or bad is root:
+                    continue
+                parent = bad.parent
+                open_nodes.discard(bad)
+                parent.children.remove(bad)
+                if bad.f != infinity:
+                    parent.forgotten[bad.cell] = bad.f  # Hopeless leaves are not worth regenerating
+                node_count -= 1
+                if parent not in open_nodes:
+                    open_nodes.add(parent)
+                push(parent)
+                backup(parent)
+
+            # Keep the lazy heaps proportional to the memory limit
+            if len(best_heap) > 4 * node_count + 16:
+                best_heap = [(node.f, -node.depth, next(sequence), node) for node in open_nodes]
+                heapq.heapify(best_heap)
+            if len(worst_heap) > 4 * node_count + 16:
+                worst_heap = [(-node.f, node.depth, next(sequence), node) for node in open_nodes if not node.children]
+                heapq.heapify(worst_heap)
+
+        return {'search_history': search_history, 'final_path': [], 'partial': False}
+
+
+class _SMANode:
+    """Search-tree node for SMA*; many may share a cell since duplicates aren't merged"""
+    __slots__ = ('cell', 'g', 'f', 'depth', 'parent', 'children', 'next_move', 'forgotten')
+
+    def __init__(self, cell, g, f, depth, parent):
+        self.cell = cell
+        self.g = g
+        self.f = f
+        self.depth = depth
+        self.parent = parent
+        self.children = []
+        self.next_move = 0  # Index of the next direction to generate
+        self.forgotten = {}  # cell -> backed-up f of successors dropped to save memory (at most 3)
+
+
+
+def _alt_search(start_row, start_col, grid_model, budget=None, record_history=True, goal=None):
+    goal = (grid_model.rows - 1, grid_model.cols - 1) if goal is None else goal
+    heuristic = LandmarkIndex.for_grid(grid_model).heuristic_for(*goal)
+    return Pathfinder.a_star(start_row, start_col, grid_model, budget, record_history, heuristic, goal)
+
+
+def _ch_search(start_row, start_col, grid_model, budget=None, record_history=True, goal=None):
+    goal = (grid_model.rows - 1, grid_model.cols - 1) if goal is None else goal
+    hierarchy = ContractionHierarchy.for_grid(grid_model)  # Budgets do not apply to hierarchy queries
+    return hierarchy.find_path(start_row, start_col, *goal, record_history)
+
+
+for _info in (
+    AlgorithmInfo("BFS", Pathfinder.bfs, optimal=True, weighted=False),
+    AlgorithmInfo("DFS", Pathfinder.dfs, optimal=False, weighted=False),
+    AlgorithmInfo("Dijkstra", Pathfinder.dijkstra, optimal=True, weighted=True, queue_stats=True),
+    AlgorithmInfo("A*", Pathfinder.a_star, optimal=True, weighted=True, queue_stats=True),
+    AlgorithmInfo("A* (ALT)", _alt_search, optimal=True, weighted=True, preprocessing="landmarks", index=LandmarkIndex,
+                  queue_stats=True),
+    AlgorithmInfo("A* (RSR)", Pathfinder.rsr_a_star, optimal=True, weighted=True, preprocessing="rectangles",
+                  index=RectangleIndex),
+    AlgorithmInfo("IDA*", Pathfinder.ida_star, optimal=True, weighted=True, memory_bounded=True),
+    AlgorithmInfo("SMA*", Pathfinder.sma_star, optimal=True, weighted=True, memory_bounded=True),
+    AlgorithmInfo("CH", _ch_search, optimal=True, weighted=True, preprocessing="hierarchy", index=ContractionHierarchy),
+    AlgorithmInfo("Bidirectional BFS", Pathfinder.bidirectional_bfs, optimal=True, weighted=False),
+    AlgorithmInfo("Bidirectional Dijkstra", Pathfinder.bidirectional_a_star, optimal=True, weighted=True,
+                  use_heuristic=False),
+    AlgorithmInfo("Bidirectional A*", Pathfinder.bidirectional_a_star, optimal=True, weighted=True),
+):
+    Pathfinder.register(_info)
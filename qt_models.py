@@ -0,0 +1,24 @@
+from PyQt6 import QtCore
+
+
+class QtGridModel(QtCore.QObject):
+    """Qt adapter on top of the pure-Python models.GridModel.
+
+    Re-emits the core model's notifications as Qt signals, so they go through
+    the Qt event loop (and are queued when the receiver lives on another
+    thread), and forwards every other attribute to the wrapped model.
+    """
+    updateSignal = QtCore.pyqtSignal()
+    cellsChangedSignal = QtCore.pyqtSignal(object)  # GridDiff of the changed cells, or None for everything
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        model.updateSignal.connect(self.updateSignal.emit)
+        model.cellsChangedSignal.connect(self.cellsChangedSignal.emit)
+
+    def __getattr__(self, name):
+        # Only called for attributes the adapter itself doesn't have
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
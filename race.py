@@ -0,0 +1,83 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import artifact_cache
+from pathfinder import Pathfinder
+import shared_grid
+
+ALGORITHMS = ["BFS", "DFS", "Dijkstra", "A*"]
+# Left out of a race unless asked for: CH builds its hierarchy first, which no
+# budget can interrupt, and IDA*/SMA* can re-expand for minutes on open maps
+SLOW_ALGORITHMS = ("IDA*", "SMA*", "CH")
+# Per-entry cap on a race; an entry that runs out comes back marked 'partial'
+TIME_BUDGET_MS = 5000
+
+
+def raceable(algorithms):
+    """algorithms without the ones a race skips by default"""
+    return [algorithm for algorithm in algorithms if algorithm not in SLOW_ALGORITHMS]
+
+
+def init_worker(cache_directory=None):
+    """Process pool initializer for search workers (races and the service): quiet, sharing the parent's cache"""
+    Pathfinder.verbose = False
+    if cache_directory is not None:
+        artifact_cache.configure(cache_directory)
+
+
+def make_executor(max_workers=None):
+    """Process pool for races: searches are CPU bound, so threads would just take turns on the GIL.
+    More workers than cores would only time-slice, so max_workers is capped at the core count.
+    """
+    if max_workers is not None:
+        max_workers = max(1, min(max_workers, os.cpu_count() or 1))
+    cache = artifact_cache.active()  # Workers share the parent's artifact cache, if any
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                               initargs=(cache.directory if cache else None,))
+
+
+def run_entry(snapshot, start_row, start_col, algorithm, stamp=None, time_budget_ms=TIME_BUDGET_MS):
+    """Worker entry point: one algorithm's run plus the numbers used to compare it.
+
+    snapshot may be a shared_grid handle, with stamp read when the race began;
+    the result is then marked stale if the grid was edited during the run.
+    """
+    grid = shared_grid.resolve(snapshot)
+    began = time.perf_counter()
+    result = Pathfinder.get_path(start_row, start_col, algorithm, grid, time_budget_ms=time_budget_ms)
+    elapsed_ms = (time.perf_counter() - began) * 1000
+    final_path = result['final_path']
+    cost = sum(grid.get_cell_cost(row, col) for row, col in final_path[1:]) if final_path else None
+    return {
+        'algorithm': algorithm,
+        'search_history': result['search_history'],
+        'final_path': final_path,
+        'expansions': result['search_history'].expansions,
+        'time_ms': elapsed_ms,
+        'cost': cost,
+        'partial': result.get('partial', False),  # Ran out of time_budget_ms
+        'queue_stats': result.get('queue_stats'),  # Only for the priority-queue searches
+        'stale': stamp is not None and not grid.unchanged_since(stamp),
+    }
+
+
+def start_race(executor, snapshot, start_row, start_col, algorithms=ALGORITHMS, stamp=None,
+               time_budget_ms=TIME_BUDGET_MS):
+    """Submit every algorithm at once against the same snapshot; returns one future per algorithm"""
+    return [executor.submit(run_entry, snapshot, start_row, start_col, algorithm, stamp, time_budget_ms)
+            for algorithm in algorithms]
+
+
+def race(snapshot, start_row, start_col, algorithms=ALGORITHMS, executor=None):
+    """Blocking convenience wrapper: results in the order of algorithms"""
+    own_executor = executor is None
+    if own_executor:
+        executor = make_executor(len(algorithms))
+    try:
+        futures = start_race(executor, snapshot, start_row, start_col, algorithms)
+        wait(futures)
+        return [future.result() for future in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
@@ -0,0 +1,102 @@
+from PyQt6 import QtCore, QtGui
+
+
+class ReplayEngine(QtCore.QObject):
+    """Plays a search history back onto a PathOverlay.
+
+    The engine ticks once per display frame and pushes however many cells are
+    due since the last frame in a single overlay update, so the repaint rate
+    stays at the display refresh rate no matter how long the history is.
+    """
+    progressChanged = QtCore.pyqtSignal(int)  # Number of cells shown so far
+    finished = QtCore.pyqtSignal()
+
+    DEFAULT_SPEED = 1000 / 300  # Cells per second, matches the old fixed 300 ms step
+
+    def __init__(self, path_overlay, parent=None):
+        super().__init__(parent)
+        self.path_overlay = path_overlay
+        self.history = []
+        self.position = 0
+        self.speed = self.DEFAULT_SPEED
+        self.cells_per_frame = 0  # 0 means "derive from speed"
+        self._carry = 0.0  # Fractional cells owed from previous frames
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(self.frame_interval())
+        self.timer.timeout.connect(self._tick)
+        self.clock = QtCore.QElapsedTimer()
+
+    @staticmethod
+    def frame_interval():
+        """Milliseconds per display frame (falls back to 60 Hz)"""
+        screen = QtGui.QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 0
+        if rate <= 0:
+            rate = 60
+        return max(1, round(1000 / rate))
+
+    def load(self, history):
+        """Prepare a new search history for playback"""
+        self.timer.stop()
+        self.history = history
+        self.position = 0
+        self._carry = 0.0
+        self.path_overlay.set_visited_cells([])
+
+    def start(self):
+        if self.position >= len(self.history):
+            self.finished.emit()
+            return
+        self.clock.start()
+        self.timer.start()
+
+    def pause(self):
+        self.timer.stop()
+
+    def is_running(self):
+        return self.timer.isActive()
+
+    def set_speed(self, cells_per_second):
+        self.speed = max(0.1, cells_per_second)
+
+    def set_cells_per_frame(self, count):
+        """Push a fixed number of cells every frame (0 to go back to timed speed)"""
+        self.cells_per_frame = max(0, count)
+
+    def seek(self, position):
+        """Jump to any point of the history, redrawing the overlay once"""
+        self._carry = 0.0
+        self._advance_to(position)
+
+    def skip_to_result(self):
+        self.seek(len(self.history))
+        self._finish()
+
+    def _tick(self):
+        if self.cells_per_frame:
+            due = self.cells_per_frame
+        else:
+            # Advance by real elapsed time so slow frames don't slow the replay down
+            self._carry += self.speed * self.clock.restart() / 1000.0
+            due = int(self._carry)
+            self._carry -= due
+        if due:
+            self._advance_to(self.position + due)
+        if self.position >= len(self.history):
+            self._finish()
+
+    def _advance_to(self, position):
+        position = max(0, min(position, len(self.history)))
+        if position >= self.position:
+            # Only the new cells are drawn, in one batch
+            self.path_overlay.add_visited_cells(self.history[self.position:position])
+        else:
+            self.path_overlay.set_visited_cells(self.history[:position])
+        self.position = position
+        self.progressChanged.emit(position)
+
+    def _finish(self):
+        self.timer.stop()
+        self.finished.emit()
@@ -0,0 +1,140 @@
+from array import array
+from bisect import bisect_right
+from models import GOLD, TERRAIN_CODES, TERRAIN_COLORS, TERRAIN_COSTS, GridModel
+
+
+class RunLengthGrid:
+    """Sparse grid for large, mostly uniform maps.
+
+    Each row is stored as runs of equal terrain: the start column of every run
+    plus its code. Lookups bisect the run starts (O(log runs)), and filling a
+    rectangle only rewrites the runs it touches. Rows are immutable once built
+    and identical rows share one object, so a map costs memory per distinct
+    row and terrain change rather than per cell.
+
+    Provides the read interface the searches use (rows, cols, version,
+    get_cell_cost, get_cell_color), so Pathfinder can search it directly.
+    Convert with from_grid / to_grid_model (or from_codes / to_codes).
+    """
+    def __init__(self, rows, cols, default_color="brown"):
+        self.rows = rows
+        self.cols = cols
+        self.version = 0  # Bumped on every edit
+        plain = self._make_row([0], [TERRAIN_CODES[default_color]])
+        self.grid = [plain] * rows
+        self.grid[rows - 1] = self._fill_runs(plain, cols - 1, cols - 1, GOLD)
+
+    @classmethod
+    def from_codes(cls, rows, cols, codes):
+        """Build from a flat row-major buffer of terrain codes (one byte per cell)"""
+        if len(codes) != rows * cols:
+            raise ValueError(f"expected {rows * cols} cells, got {len(codes)}")
+        grid = cls.__new__(cls)
+        grid.rows, grid.cols, grid.version = rows, cols, 0
+        view = memoryview(codes)
+        shared = {}  # Row bytes -> runs, so repeated rows are stored once
+        grid.grid = []
+        for row in range(rows):
+            cells = bytes(view[row * cols:(row + 1) * cols])
+            runs = shared.get(cells)
+            if runs is None:
+                starts, run_codes = [0], [cells[0]]
+                for col in range(1, cols):
+                    if cells[col] != run_codes[-1]:
+                        starts.append(col)
+                        run_codes.append(cells[col])
+                runs = shared[cells] = cls._make_row(starts, run_codes)
+            grid.grid.append(runs)
+        return grid
+
+    @classmethod
+    def from_grid(cls, grid_model):
+        """Sparse copy of a GridModel (or GridSnapshot)"""
+        return cls.from_codes(grid_model.rows, grid_model.cols, b"".join(bytes(row) for row in grid_model.grid))
+
+    def to_codes(self):
+        """Dense flat row-major terrain codes"""
+        codes = bytearray()
+        for starts, run_codes in self.grid:
+            ends = list(starts[1:]) + [self.cols]
+            for start, end, code in zip(starts, ends, run_codes):
+                codes += bytes([code]) * (end - start)
+        return codes
+
+    def to_grid_model(self):
+        grid_model = GridModel(self.rows, self.cols)
+        grid_model.load_codes(self.to_codes())
+        return grid_model
+
+    def get_code(self, row, col):
+        starts, codes = self.grid[row]
+        return codes[bisect_right(starts, col) - 1]
+
+    def get_cell_color(self, row, col):
+        return TERRAIN_COLORS[self.get_code(row, col)]
+
+    def get_cell_cost(self, row, col):
+        return TERRAIN_COSTS[self.get_code(row, col)]
+
+    def set_cell_color(self, row, col, color):
+        self.fill_rect(row, col, row, col, color)
+
+    def fill_rect(self, top, left, bottom, right, color):
+        """Paint a rectangle (corners inclusive) clipped to the grid; the goal cell stays gold"""
+        top, bottom = sorted((top, bottom))
+        left, right = sorted((left, right))
+        top, bottom = max(0, top), min(self.rows - 1, bottom)
+        left, right = max(0, left), min(self.cols - 1, right)
+        if top > bottom or left > right:
+            return  # Entirely outside the grid
+        code = TERRAIN_CODES[color]
+        filled = {}  # Rows that were shared before stay shared after
+        for row in range(top, bottom + 1):
+            runs = self.grid[row]
+            result = filled.get(id(runs))
+            if result is None:
+                result = filled[id(runs)] = self._fill_runs(runs, left, right, code)
+            self.grid[row] = result
+        last = self.rows - 1
+        if top <= last <= bottom and right == self.cols - 1:
+            self.grid[last] = self._fill_runs(self.grid[last], self.cols - 1, self.cols - 1, GOLD)
+        self.version += 1
+
+    @property
+    def runs(self):
+        """Total number of runs, i.e. terrain changes along rows"""
+        return sum(len(codes) for _, codes in self.grid)
+
+    @property
+    def nbytes(self):
+        """Bytes used by distinct run buffers plus the row table"""
+        distinct = {id(runs): runs for runs in self.grid}.values()
+        return 8 * self.rows + sum(starts.itemsize * len(starts) + len(codes) for starts, codes in distinct)
+
+    @staticmethod
+    def _make_row(starts, codes):
+        return array('I', starts), bytes(codes)
+
+    def _fill_runs(self, runs, left, right, code):
+        """New runs for a row with columns left..right set to code"""
+        starts, codes = runs
+        first = bisect_right(starts, left) - 1  # Run containing left
+        new_starts, new_codes = list(starts[:first]), list(codes[:first])
+        if starts[first] < left:
+            new_starts.append(starts[first])
+            new_codes.append(codes[first])
+        new_starts.append(left)
+        new_codes.append(code)
+        if right + 1 < self.cols:
+            after = bisect_right(starts, right + 1) - 1  # Run containing right + 1
+            new_starts.append(right + 1)
+            new_codes.append(codes[after])
+            new_starts.extend(starts[after + 1:])
+            new_codes.extend(codes[after + 1:])
+        # Merge neighbouring runs that ended up with the same terrain
+        merged_starts, merged_codes = [], []
+        for start, run_code in zip(new_starts, new_codes):
+            if not merged_codes or merged_codes[-1] != run_code:
+                merged_starts.append(start)
+                merged_codes.append(run_code)
+        return self._make_row(merged_starts, merged_codes)
@@ -0,0 +1,47 @@
+from array import array
+from collections.abc import Sequence
+
+
+class SearchHistory(Sequence):
+    """Expansion order of a search, stored compactly as flat cell indices.
+
+    Behaves like a read-only list of (row, col) tuples, but each entry costs
+    4 bytes instead of a tuple. With record=False only the number of
+    expansions is counted, for callers that just need the final path.
+    record may also be a search_trace.TraceWriter, which receives every
+    expansion so the order is streamed to disk instead of kept here.
+    """
+    def __init__(self, cols, record=True):
+        self.cols = cols
+        self.sink = record if hasattr(record, 'append_index') else None
+        self.record = record is True
+        self.cells = array('I')
+        self.expansions = 0
+
+    def append(self, cell):
+        self.expansions += 1
+        if self.record:
+            self.cells.append(cell[0] * self.cols + cell[1])
+        elif self.sink is not None:
+            self.sink.append_index(cell[0] * self.cols + cell[1])
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [divmod(flat, self.cols) for flat in self.cells[index]]
+        return divmod(self.cells[index], self.cols)
+
+    def __iter__(self):
+        cols = self.cols
+        for flat in self.cells:
+            yield divmod(flat, cols)
+
+    def __repr__(self):
+        return f"SearchHistory({len(self)} cells, {self.expansions} expansions)"
+
+    @property
+    def nbytes(self):
+        """Memory used by the stored indices"""
+        return self.cells.itemsize * len(self.cells)
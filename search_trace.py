@@ -0,0 +1,170 @@
+"""Search traces on disk.
+
+A trace is the expansion order of one search, streamed to a file while the
+search runs so long runs never hold their history in memory:
+
+    header   magic b"DWTR", format version, rows, cols, step count, path length
+    steps    one little-endian uint32 flat cell index (row * cols + col) per expansion
+    path     the final path as flat indices, written when the writer is closed
+
+Records are fixed width, so a reader can memory-map the file and jump to any
+step in O(1). TraceReader behaves like a read-only list of (row, col) tuples,
+which is what ReplayEngine and PathOverlay expect, so traces can be replayed in
+the GUI or fed to external tools without loading them.
+
+    with TraceWriter("run.trace", grid.rows, grid.cols) as trace:
+        result = Pathfinder.get_path(0, 0, "A*", grid, record_history=trace)
+        trace.final_path = result['final_path']
+
+Inspect one with: python search_trace.py run.trace
+"""
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+MAGIC = b"DWTR"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxIIII")  # magic, version, rows, cols, steps, path length
+UNFINISHED = 0xFFFFFFFF  # Step count of a trace whose writer was never closed
+# Traces are little-endian; big-endian hosts swap bytes on the way in and out
+SWAP = sys.byteorder != "little"
+
+
+class TraceWriter:
+    """Streams expansions to a trace file in fixed-size chunks.
+
+    Pass it as record_history to Pathfinder.get_path (or any search); the
+    resulting SearchHistory then only counts expansions while the order goes
+    to disk.
+    """
+    def __init__(self, path, rows, cols, chunk_size=64 * 1024):
+        self.path = path
+        self.rows = rows
+        self.cols = cols
+        self.chunk_size = chunk_size
+        self.steps = 0
+        self.final_path = []  # Set before closing to store the search's result with it
+        self._buffer = array('I')
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, rows, cols, UNFINISHED, 0))
+
+    def append_index(self, index):
+        self._buffer.append(index)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def append(self, cell):
+        self.append_index(cell[0] * self.cols + cell[1])
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if SWAP:
+            self._buffer.byteswap()
+        self._file.write(self._buffer.tobytes())
+        self.steps += len(self._buffer)
+        self._buffer = array('I')
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        path = array('I', (row * self.cols + col for row, col in self.final_path))
+        if SWAP:
+            path.byteswap()
+        self._file.write(path.tobytes())
+        # Patch the header now that the counts are known
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.rows, self.cols, self.steps, len(path)))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TraceReader(Sequence):
+    """Memory-mapped trace: a read-only list of (row, col) per expansion step"""
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.cols, steps, path_length = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} search trace")
+        if steps == UNFINISHED:
+            # The search died before closing the writer: keep every complete record
+            steps = (len(self._map) - HEADER.size) // 4
+            path_length = 0
+        self._cells = memoryview(self._map)[HEADER.size:HEADER.size + 4 * (steps + path_length)]
+        self.steps = steps
+        self.path_length = path_length
+
+    def index(self, step):
+        """Flat cell index expanded at step (negative steps count from the end)"""
+        if step < 0:
+            step += self.steps
+        if not 0 <= step < self.steps:
+            raise IndexError("trace step out of range")
+        return self._read(step, step + 1)[0]
+
+    def indices(self, start=0, stop=None):
+        """array('I') of flat indices for steps start..stop"""
+        start, stop, _ = slice(start, stop).indices(self.steps)
+        return self._read(start, max(start, stop))
+
+    @property
+    def final_path(self):
+        return [divmod(index, self.cols) for index in self._read(self.steps, self.steps + self.path_length)]
+
+    def _read(self, start, stop):
+        values = array('I')
+        values.frombytes(self._cells[4 * start:4 * stop])
+        if SWAP:
+            values.byteswap()
+        return values
+
+    def __len__(self):
+        return self.steps
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.steps)
+            values = self._read(start, max(start, stop))[::step] if step > 0 else \
+                [self.index(i) for i in range(start, stop, step)]
+            return [divmod(flat, self.cols) for flat in values]
+        return divmod(self.index(index), self.cols)
+
+    def __iter__(self):
+        cols = self.cols
+        chunk = 64 * 1024
+        for start in range(0, self.steps, chunk):
+            for flat in self._read(start, min(start + chunk, self.steps)):
+                yield divmod(flat, cols)
+
+    def __repr__(self):
+        return f"TraceReader({self.rows}x{self.cols}, {self.steps} steps)"
+
+    def close(self):
+        cells = getattr(self, "_cells", None)
+        if cells is not None:
+            cells.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    with TraceReader(sys.argv[1]) as trace:
+        print(f"{trace.rows}x{trace.cols} grid, {trace.steps} expansions, final path of {trace.path_length} cells")
+        if trace.steps:
+            print(f"first expansion {trace[0]}, last expansion {trace[-1]}")
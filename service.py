@@ -0,0 +1,341 @@
+"""Local pathfinding service: length-prefixed JSON over TCP, path queries batched per map version.
+
+Run with: python service.py --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import struct
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import artifact_cache
+from models import GridModel, TERRAIN_COLORS
+from pathfinder import Pathfinder
+import race
+import shared_grid
+from shared_grid import SharedGrid
+
+HEADER = struct.Struct(">I")
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+# Wire digits '0'-'3' -> terrain codes 0-3
+DIGITS = b"".join(str(code).encode() for code in range(len(TERRAIN_COLORS)))
+DIGITS_TO_CODES = bytes.maketrans(DIGITS, bytes(range(len(TERRAIN_COLORS))))
+CODES_TO_DIGITS = bytes.maketrans(bytes(range(len(TERRAIN_COLORS))), DIGITS)
+
+
+async def read_message(reader):
+    """Read one length-prefixed JSON message, or None at end of stream"""
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_MESSAGE_BYTES:
+        raise ValueError(f"message of {length} bytes is too large")
+    return json.loads(await reader.readexactly(length))
+
+
+def encode_message(message):
+    body = json.dumps(message, separators=(",", ":")).encode()
+    return HEADER.pack(len(body)) + body
+
+
+def run_batch(snapshot, queries, stamp=None):
+    """Worker entry point: answer every (start_row, start_col, algorithm) query on one snapshot.
+
+    snapshot may be a shared_grid handle; stamp is then the shared grid's stamp
+    when the batch was formed, and answers computed after a later edit are
+    marked "stale".
+    """
+    grid = shared_grid.resolve(snapshot)
+    results = []
+    for start_row, start_col, algorithm in queries:
+        began = time.perf_counter()
+        try:
+            result = Pathfinder.get_path(start_row, start_col, algorithm, grid, record_history=False)
+        except ValueError as error:
+            results.append({"error": str(error)})
+            continue
+        results.append({
+            "final_path": result["final_path"],
+            "partial": result["partial"],
+            "expansions": result["search_history"].expansions,
+            "search_ms": (time.perf_counter() - began) * 1000,
+        })
+        if stamp is not None and not grid.unchanged_since(stamp):
+            results[-1]["stale"] = True
+    return results
+
+
+class ServiceMetrics:
+    """Counters plus a window of recent latencies for percentile reporting"""
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.queries = 0
+        self.batches = 0
+        self.clients = 0
+
+    def query_queued(self):
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def query_done(self, latency_ms):
+        self.queue_depth -= 1
+        self.queries += 1
+        self.latencies.append(latency_ms)
+
+    def snapshot(self):
+        ordered = sorted(self.latencies)
+
+        def percentile(p):
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+        return {
+            "queries": self.queries,
+            "batches": self.batches,
+            "mean_batch_size": self.queries / self.batches if self.batches else 0.0,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "clients": self.clients,
+            "latency_ms": {"p50": percentile(50), "p95": percentile(95), "p99": percentile(99),
+                           "max": ordered[-1] if ordered else 0.0},
+        }
+
+
+class PathfindingService:
+    """Holds loaded maps and batches path queries onto a worker pool"""
+    def __init__(self, executor=None, batch_window_ms=2, max_batch=64, chunk_size=8, shared_memory=False):
+        self.executor = executor
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+        self.chunk_size = chunk_size  # Queries per worker task, so one batch spreads over the pool
+        self.maps = {}
+        # Map name -> SharedGrid mirroring it, when workers read maps from shared memory
+        self.shared = {} if shared_memory else None
+        self.pending = {}  # (map name, version) -> [(query, future)]
+        self.metrics = ServiceMetrics()
+
+    # --- Map management ---
+
+    def load_map(self, name, rows, cols, cells):
+        codes = cells.encode()
+        if len(codes) != rows * cols or codes.translate(None, DIGITS):
+            raise ValueError(f"cells must be {rows * cols} digits from {DIGITS.decode()}")
+        model = self.maps.get(name)
+        if model is None or (model.rows, model.cols) != (rows, cols):
+            model = GridModel(rows, cols)
+            self.maps[name] = model
+        model.load_codes(codes.translate(DIGITS_TO_CODES))
+        if self.shared is not None:
+            shared = self.shared.get(name)
+            if shared is None or (shared.rows, shared.cols) != (rows, cols):
+                if shared is not None:
+                    shared.close()
+                shared = self.shared[name] = SharedGrid.from_grid(model)
+                shared.mirror(model)
+        return model.version
+
+    def close(self):
+        """Free the shared memory blocks (workers keep theirs mapped until they exit)"""
+        for shared in (self.shared or {}).values():
+            shared.close()
+        if self.shared is not None:
+            self.shared.clear()
+
+    # --- Queries ---
+
+    async def find_path(self, name, start_row, start_col, algorithm):
+        model = self.maps.get(name)
+        if model is None:
+            raise KeyError(f"unknown map {name!r}")
+        if not (0 <= start_row < model.rows and 0 <= start_col < model.cols):
+            raise ValueError("start is outside the map")
+        goal = (model.rows - 1, model.cols - 1)
+        began = time.perf_counter()
+        self.metrics.query_queued()
+        try:
+            # Unreachable goals are answered from the component index without a worker
+            if not model.is_reachable((start_row, start_col), goal):
+                return {"final_path": [], "partial": False, "expansions": 0, "search_ms": 0.0}
+            return await self._enqueue(name, model, (start_row, start_col, algorithm))
+        finally:
+            self.metrics.query_done((time.perf_counter() - began) * 1000)
+
+    def _enqueue(self, name, model, query):
+        key = (name, model.version)
+        future = asyncio.get_running_loop().create_future()
+        batch = self.pending.get(key)
+        if batch is None:
+            batch = self.pending[key] = []
+            asyncio.get_running_loop().call_later(self.batch_window, self._flush, key, self._grid_for(name, model))
+        batch.append((query, future))
+        if len(batch) >= self.max_batch:
+            self._flush(key, self._grid_for(name, model))
+        return future
+
+    def _grid_for(self, name, model):
+        """What to send workers: (snapshot, None), or (shared handle, stamp) with shared memory"""
+        if self.shared is None:
+            return model.snapshot(), None
+        shared = self.shared[name]
+        return shared.handle, shared.stamp
+
+    def _flush(self, key, grid):
+        snapshot, stamp = grid
+        batch = self.pending.pop(key, None)
+        if not batch:
+            return
+        self.metrics.batches += 1
+        loop = asyncio.get_running_loop()
+        for first in range(0, len(batch), self.chunk_size):
+            chunk = batch[first:first + self.chunk_size]
+            queries = [query for query, _ in chunk]
+            task = loop.run_in_executor(self.executor, run_batch, snapshot, queries, stamp)
+            task.add_done_callback(lambda done, chunk=chunk: self._deliver(chunk, done))
+
+    @staticmethod
+    def _deliver(chunk, done):
+        error = done.exception()
+        for index, (_, future) in enumerate(chunk):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[index])
+
+    # --- Networking ---
+
+    async def handle_client(self, reader, writer):
+        self.metrics.clients += 1
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except (ValueError, ConnectionError):
+                    break
+                if message is None:
+                    break
+                # Each request runs on its own so responses stream back as they complete
+                task = asyncio.create_task(self._respond(message, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.metrics.clients -= 1
+            writer.close()
+
+    async def _respond(self, message, writer, write_lock):
+        response = {"id": message.get("id")}
+        try:
+            response.update(await self.dispatch(message))
+        except Exception as error:  # Report bad requests to the client instead of dropping them
+            response["error"] = str(error)
+        async with write_lock:
+            writer.write(encode_message(response))
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def dispatch(self, message):
+        match message.get("op"):
+            case "load_map":
+                version = self.load_map(message["map"], message["rows"], message["cols"], message["cells"])
+                return {"ok": True, "version": version}
+            case "path":
+                start_row, start_col = message["start"]
+                return await self.find_path(message["map"], start_row, start_col, message.get("algorithm", "A*"))
+            case "metrics":
+                return self.metrics.snapshot()
+            case op:
+                raise ValueError(f"unknown op {op!r}")
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_MESSAGE_BYTES)
+
+
+class PathfindingClient:
+    """Async client that can keep many requests in flight on one connection"""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.waiting = {}
+        self.listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765):
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_MESSAGE_BYTES)
+        return cls(reader, writer)
+
+    async def request(self, **message):
+        self.next_id += 1
+        message["id"] = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        self.writer.write(encode_message(message))
+        await self.writer.drain()
+        return await future
+
+    async def load_map(self, name, grid_model):
+        cells = b"".join(bytes(row) for row in grid_model.grid).translate(CODES_TO_DIGITS).decode()
+        return await self.request(op="load_map", map=name, rows=grid_model.rows, cols=grid_model.cols, cells=cells)
+
+    async def find_path(self, name, start_row, start_col, algorithm="A*"):
+        return await self.request(op="path", map=name, start=[start_row, start_col], algorithm=algorithm)
+
+    async def metrics(self):
+        return await self.request(op="metrics")
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+
+    async def _listen(self):
+        while True:
+            message = await read_message(self.reader)
+            if message is None:
+                break
+            future = self.waiting.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+        for future in self.waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionError("service closed the connection"))
+
+
+async def main(host, port, workers, shared_memory=False, cache_directory=None):
+    Pathfinder.verbose = False
+    if cache_directory is not None:
+        artifact_cache.configure(cache_directory)
+    with ProcessPoolExecutor(max_workers=workers, initializer=race.init_worker, initargs=(cache_directory,)) as executor:
+        service = PathfindingService(executor, shared_memory=shared_memory)
+        server = await service.serve(host, port)
+        print(f"Pathfinding service listening on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local pathfinding service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shared-memory", action="store_true",
+                        help="workers read maps from shared memory instead of a copy per batch")
+    artifact_cache.add_arguments(parser, "across restarts")
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.workers, args.shared_memory, artifact_cache.directory_from(args)))
@@ -0,0 +1,169 @@
+"""Grid in shared memory, so worker processes read the parent's terrain in place.
+
+Block layout: uint64 stamp (odd while being written), uint32 rows, uint32 cols, row-major codes.
+"""
+import struct
+from multiprocessing import shared_memory
+
+from models import TERRAIN_COLORS, TERRAIN_COSTS
+
+HEADER = struct.Struct("<QII")  # stamp, rows, cols
+
+
+class SharedGridHandle:
+    """What a worker needs to attach: the block's name and the grid size"""
+    __slots__ = ("name", "rows", "cols")
+
+    def __init__(self, name, rows, cols):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+
+    def __getstate__(self):
+        return self.name, self.rows, self.cols
+
+    def __setstate__(self, state):
+        self.name, self.rows, self.cols = state
+
+    def __repr__(self):
+        return f"SharedGridHandle({self.name!r}, {self.rows}x{self.cols})"
+
+
+class SharedGrid:
+    """Terrain codes in a shared memory block, with the read interface the searches use"""
+    def __init__(self, memory, owner):
+        self._memory = memory
+        self._owner = owner  # Only the creator writes and finally unlinks the block
+        _, self.rows, self.cols = HEADER.unpack_from(memory.buf)
+        size = self.rows * self.cols
+        self.cells = memory.buf[HEADER.size:HEADER.size + size]
+        # Zero-copy row views, so code that walks grid rows (images, run-length) works too
+        self.grid = [self.cells[row * self.cols:(row + 1) * self.cols] for row in range(self.rows)]
+        self._mirrored = None
+
+    @classmethod
+    def create(cls, rows, cols, codes=None):
+        memory = shared_memory.SharedMemory(create=True, size=HEADER.size + rows * cols)
+        HEADER.pack_into(memory.buf, 0, 0, rows, cols)
+        grid = cls(memory, owner=True)
+        if codes is not None:
+            grid.load_codes(codes)
+        return grid
+
+    @classmethod
+    def from_grid(cls, grid_model):
+        """Shared copy of a GridModel, snapshot or RunLengthGrid"""
+        if hasattr(grid_model, 'to_codes'):
+            codes = grid_model.to_codes()
+        else:
+            codes = b"".join(bytes(row) for row in grid_model.grid)
+        return cls.create(grid_model.rows, grid_model.cols, codes)
+
+    @classmethod
+    def attach(cls, handle):
+        memory = shared_memory.SharedMemory(name=handle.name)
+        grid = cls(memory, owner=False)
+        if (grid.rows, grid.cols) != (handle.rows, handle.cols):
+            grid.close()
+            raise ValueError(f"shared grid {handle.name!r} is not {handle.rows}x{handle.cols}")
+        return grid
+
+    @property
+    def handle(self):
+        return SharedGridHandle(self._memory.name, self.rows, self.cols)
+
+    @property
+    def stamp(self):
+        return HEADER.unpack_from(self._memory.buf)[0]
+
+    @property
+    def version(self):
+        # Per-grid caches (landmarks, rectangles, ...) rebuild when this changes
+        return self.stamp
+
+    def unchanged_since(self, stamp):
+        """True if the grid was stable when stamp was read and has not been written since"""
+        return stamp % 2 == 0 and self.stamp == stamp
+
+    def get_code(self, row, col):
+        return self.cells[row * self.cols + col]
+
+    def get_cell_color(self, row, col):
+        return TERRAIN_COLORS[self.cells[row * self.cols + col]]
+
+    def get_cell_cost(self, row, col):
+        return TERRAIN_COSTS[self.cells[row * self.cols + col]]
+
+    # --- Writing (parent side) ---
+
+    def write_codes(self, indices, codes):
+        """Write terrain codes at flat cell indices as one edit"""
+        self._begin_write()
+        cells = self.cells
+        for index, code in zip(indices, codes):
+            cells[index] = code
+        self._end_write()
+
+    def load_codes(self, codes):
+        """Replace every cell from a flat row-major buffer of terrain codes"""
+        if len(codes) != self.rows * self.cols:
+            raise ValueError(f"expected {self.rows * self.cols} cells, got {len(codes)}")
+        self._begin_write()
+        self.cells[:] = codes
+        self._end_write()
+
+    def mirror(self, grid_model):
+        """Copy every later edit of grid_model into shared memory"""
+        def update(diff):
+            if diff is None:
+                self.load_codes(b"".join(bytes(row) for row in grid_model.grid))
+            else:
+                self.write_codes(diff.indices, diff.new)
+
+        grid_model.cellsChangedSignal.connect(update)
+        self._mirrored = (grid_model, update)
+
+    def _begin_write(self):
+        if not self._owner:
+            raise PermissionError("only the process that created a shared grid may write to it")
+        HEADER.pack_into(self._memory.buf, 0, self.stamp + 1, self.rows, self.cols)
+
+    def _end_write(self):
+        HEADER.pack_into(self._memory.buf, 0, self.stamp + 1, self.rows, self.cols)
+
+    def close(self):
+        """Detach; the creator also frees the block"""
+        if self._memory is None:
+            return
+        if self._mirrored is not None:
+            grid_model, update = self._mirrored
+            grid_model.cellsChangedSignal.disconnect(update)
+            self._mirrored = None
+        # Views into the block must go before it can be closed
+        for row in self.grid:
+            row.release()
+        self.cells.release()
+        self.grid = []
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+        self._memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_attached = {}  # Worker-side: block name -> SharedGrid, attached once per process
+
+
+def resolve(grid):
+    """The grid to search: attaches (once) if given a handle, otherwise returns grid itself"""
+    if not isinstance(grid, SharedGridHandle):
+        return grid
+    shared = _attached.get(grid.name)
+    if shared is None:
+        shared = _attached[grid.name] = SharedGrid.attach(grid)
+    return shared
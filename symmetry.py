@@ -0,0 +1,171 @@
+from array import array
+import struct
+import weakref
+
+import artifact_cache
+
+MAGIC = b"DWRS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHxxIII")  # magic, version, rows, cols, rectangles
+
+
+class RectangleIndex:
+    """Rectangular Symmetry Reduction (RSR) preprocessing for a grid.
+
+    Splits the passable cells into maximal rectangles of equal terrain cost.
+    Inside such a rectangle every route between two cells that never turns
+    back costs the same, so a search only has to visit rectangle perimeters:
+    from a perimeter cell it may step to its neighbours on the perimeter or
+    in other rectangles, or jump straight across the rectangle to the
+    opposite side ("macro" edges). Interior cells are never expanded, which
+    removes most of the work in large open rooms without losing optimality.
+    """
+    _cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, grid_model):
+        self.grid_model = grid_model
+        self.version = getattr(grid_model, 'version', None)
+        self.rects = []  # (top, left, bottom, right, cost), corners inclusive
+        self.rect_of = array('i', [-1]) * (grid_model.rows * grid_model.cols)  # -1 for blocked cells
+        self.mapped = None  # artifact_cache.MappedFile rect_of is a view into, if loaded
+        self._decompose()
+
+    @classmethod
+    def for_grid(cls, grid_model):
+        """Shared index for a grid, rebuilt lazily once the grid has been edited (or read from the artifact cache)"""
+        index = cls._cache.get(grid_model)
+        if index is None or index.closed or index.version != getattr(grid_model, 'version', None):
+            if index is not None:
+                index.close()
+            cache = artifact_cache.active()
+            if cache is None:
+                index = cls(grid_model)
+            else:
+                index = cache.get_or_build(grid_model, "rectangles", FORMAT_VERSION,
+                                           lambda path: cls.load(path, grid_model), lambda: cls(grid_model), cls.save)
+            cls._cache[grid_model] = index
+        return index
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.grid_model.rows, self.grid_model.cols, len(self.rects)))
+            array('I', [value for rect in self.rects for value in rect]).tofile(file)
+            self.rect_of.tofile(file)
+
+    @classmethod
+    def load(cls, path, grid_model):
+        """Index for grid_model from a saved file; the cell -> rectangle table stays memory-mapped until close()"""
+        mapped = artifact_cache.MappedFile(path)
+        try:
+            rows, cols = grid_model.rows, grid_model.cols
+            if len(mapped) < HEADER.size:
+                raise ValueError(f"{path} is not a rectangle decomposition")
+            magic, version, saved_rows, saved_cols, count = mapped.unpack(HEADER)
+            if magic != MAGIC or version != FORMAT_VERSION or (saved_rows, saved_cols) != (rows, cols):
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} rectangle decomposition for a {rows}x{cols} grid")
+            table = HEADER.size + 20 * count
+            if len(mapped) != table + 4 * rows * cols:
+                raise ValueError(f"{path} is truncated")
+        except ValueError:
+            mapped.close()
+            raise
+        index = cls.__new__(cls)
+        index.grid_model = grid_model
+        index.version = getattr(grid_model, 'version', None)
+        index.mapped = mapped
+        flat = mapped.view(HEADER.size, table, 'I')
+        index.rects = [tuple(flat[number * 5:number * 5 + 5]) for number in range(count)]
+        index.rect_of = mapped.view(table, len(mapped), 'i')
+        return index
+
+    @property
+    def closed(self):
+        return self.mapped is not None and self.mapped.closed
+
+    def close(self):
+        """Unmap the rectangle table of a loaded index (built indexes hold nothing to release)"""
+        if self.mapped is not None:
+            self.mapped.close()
+
+    def _decompose(self):
+        # Greedy: grow each rectangle right as far as possible, then down while the whole span fits
+        rows, cols = self.grid_model.rows, self.grid_model.cols
+        get_cell_cost = self.grid_model.get_cell_cost
+        rect_of = self.rect_of
+        for top in range(rows):
+            for left in range(cols):
+                if rect_of[top * cols + left] != -1:
+                    continue
+                cost = get_cell_cost(top, left)
+                if cost is None:
+                    continue
+                right = left
+                while right + 1 < cols and rect_of[top * cols + right + 1] == -1 \
+                        and get_cell_cost(top, right + 1) == cost:
+                    right += 1
+                bottom = top
+                while bottom + 1 < rows and all(
+                        rect_of[(bottom + 1) * cols + col] == -1 and get_cell_cost(bottom + 1, col) == cost
+                        for col in range(left, right + 1)):
+                    bottom += 1
+                number = len(self.rects)
+                self.rects.append((top, left, bottom, right, cost))
+                for row in range(top, bottom + 1):
+                    rect_of[row * cols + left:row * cols + right + 1] = array('i', [number]) * (right - left + 1)
+
+    def successors(self, row, col, goal):
+        """(cell, cost) pairs reachable from a perimeter cell (or the start) in the reduced graph"""
+        cols = self.grid_model.cols
+        number = self.rect_of[row * cols + col]
+        top, left, bottom, right, cost = self.rects[number]
+        goal_row, goal_col = goal
+        result = []
+        if self.rect_of[goal_row * cols + goal_col] == number and (row, col) != goal:
+            # Any non-backtracking route to a goal in the same rectangle is optimal
+            result.append((goal, (abs(goal_row - row) + abs(goal_col - col)) * cost))
+        if top < row < bottom and left < col < right:
+            # An interior start: project onto the four sides
+            result.append(((top, col), (row - top) * cost))
+            result.append(((bottom, col), (bottom - row) * cost))
+            result.append(((row, left), (col - left) * cost))
+            result.append(((row, right), (right - col) * cost))
+            return result
+
+        rows = self.grid_model.rows
+        for new_row, new_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if not (0 <= new_row < rows and 0 <= new_col < cols):
+                continue
+            other = self.rect_of[new_row * cols + new_col]
+            if other == -1:
+                continue
+            if other == number and top < new_row < bottom and left < new_col < right:
+                continue  # Interior cells are replaced by the macro edges below
+            result.append(((new_row, new_col), self.rects[other][4]))
+        # Macro edges straight across the rectangle
+        if bottom - top >= 2:
+            if row == top:
+                result.append(((bottom, col), (bottom - top) * cost))
+            if row == bottom:
+                result.append(((top, col), (bottom - top) * cost))
+        if right - left >= 2:
+            if col == left:
+                result.append(((row, right), (right - left) * cost))
+            if col == right:
+                result.append(((row, left), (right - left) * cost))
+        return result
+
+    @staticmethod
+    def expand_path(path):
+        """Per-cell path from a reduced path (macro edges become straight or L-shaped runs)"""
+        if not path:
+            return []
+        cells = [path[0]]
+        for end_row, end_col in path[1:]:
+            row, col = cells[-1]
+            while row != end_row:
+                row += 1 if end_row > row else -1
+                cells.append((row, col))
+            while col != end_col:
+                col += 1 if end_col > col else -1
+                cells.append((row, col))
+        return cells
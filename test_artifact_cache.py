@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+import artifact_cache
+from contraction import ContractionHierarchy
+from landmarks import LandmarkIndex
+from models import GridModel
+from pathfinder import Pathfinder
+from symmetry import RectangleIndex
+from test_pathfinder import make_rooms
+
+
+def test_artifact_cache_reuses_preprocessing_across_sessions():
+    grid = make_rooms(30)
+    codes = b"".join(bytes(row) for row in grid.grid)
+    engines = ["A* (ALT)", "A* (RSR)", "CH"]
+    with tempfile.TemporaryDirectory() as directory:
+        cache = artifact_cache.configure(directory)
+        try:
+            built = {name: Pathfinder.get_path(0, 0, name, grid)['final_path'] for name in engines}
+            assert len(os.listdir(directory)) == 3
+            # Same terrain in a fresh model: every structure is mapped back in, not rebuilt
+            reopened = GridModel(30, 30, codes=codes)
+            assert Pathfinder.is_prepared(Pathfinder.ALGORITHMS["CH"], reopened)
+            for name in engines:
+                assert Pathfinder.get_path(0, 0, name, reopened)['final_path'] == built[name]
+            assert isinstance(ContractionHierarchy.for_grid(reopened).rank, memoryview)
+            # An edit changes the map hash, so nothing stale is picked up
+            reopened.set_cell_color(0, 1, "grey")
+            assert not Pathfinder.is_prepared(Pathfinder.ALGORITHMS["CH"], reopened)
+            # Least recently used files go first once the directory is over budget
+            cache.max_bytes = cache.size() - 1
+            cache.evict()
+            assert 0 < len(os.listdir(directory)) < 3 and cache.size() <= cache.max_bytes
+        finally:
+            artifact_cache.configure(None)
+
+
+def test_loaded_artifacts_are_unmapped_when_replaced_or_evicted():
+    grid = make_rooms(30)
+    codes = b"".join(bytes(row) for row in grid.grid)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = artifact_cache.configure(directory)
+        try:
+            for index in (LandmarkIndex, RectangleIndex, ContractionHierarchy):
+                index.for_grid(grid)
+            reopened = GridModel(30, 30, codes=codes)
+            loaded = [index.for_grid(reopened) for index in (LandmarkIndex, RectangleIndex, ContractionHierarchy)]
+            assert all(artifact.mapped is not None and not artifact.closed for artifact in loaded)
+            # An edit replaces each index, and the replaced one lets go of its file
+            reopened.set_cell_color(0, 1, "maroon")
+            assert LandmarkIndex.for_grid(reopened) is not loaded[0] and loaded[0].closed
+            assert RectangleIndex.for_grid(reopened) is not loaded[1] and loaded[1].closed
+            assert ContractionHierarchy.for_grid(reopened) is not loaded[2] and loaded[2].closed
+
+            # Evicting a file unmaps whatever was loaded from it; the next use loads or builds afresh
+            again = GridModel(30, 30, codes=codes)
+            hierarchy = ContractionHierarchy.for_grid(again)
+            expected = Pathfinder.get_path(0, 0, "CH", again)['final_path']
+            cache.max_bytes = 0
+            cache.evict()
+            assert hierarchy.closed and not os.listdir(directory)
+            assert Pathfinder.get_path(0, 0, "CH", again)['final_path'] == expected
+        finally:
+            artifact_cache.configure(None)
+
+
+def main():
+    test_artifact_cache_reuses_preprocessing_across_sessions()
+    test_loaded_artifacts_are_unmapped_when_replaced_or_evicted()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
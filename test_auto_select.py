@@ -0,0 +1,69 @@
+import tempfile
+
+import artifact_cache
+from auto_select import AutoSelector
+from models import GridModel
+from pathfinder import Pathfinder
+from test_pathfinder import make_rooms, make_trap
+
+
+def test_auto_mode_picks_an_exact_engine():
+    try:
+        Pathfinder.get_path(0, 0, "Telepathy", GridModel(5, 5))
+        assert False, "unknown algorithm was accepted"
+    except ValueError:
+        pass
+    assert not Pathfinder.ALGORITHMS["DFS"].optimal and not Pathfinder.ALGORITHMS["BFS"].weighted
+
+    # Maroon cells rule out the step-counting engines
+    trap = make_trap(30)
+    result = Pathfinder.get_path(0, 0, "Auto", trap)
+    assert Pathfinder.ALGORITHMS[result['algorithm']].weighted
+    expected = Pathfinder.get_path(0, 0, "Dijkstra", trap)['final_path']
+    assert sum(trap.get_cell_cost(*cell) for cell in result['final_path'][1:]) == \
+        sum(trap.get_cell_cost(*cell) for cell in expected[1:])
+
+    # A read-only snapshot of open rooms never changes, so symmetry reduction is worth building
+    rooms = make_rooms(60).snapshot()
+    assert Pathfinder.get_path(0, 0, "Auto", rooms)['algorithm'] == "A* (RSR)"
+    # ...until past timings on this map say otherwise
+    for _ in range(AutoSelector.MIN_RUNS):
+        AutoSelector.record(rooms, "A* (RSR)", 50.0)
+        AutoSelector.record(rooms, "Bidirectional A*", 5.0)
+    assert Pathfinder.get_path(0, 0, "Auto", rooms)['algorithm'] == "Bidirectional A*"
+
+
+def test_auto_hashes_the_map_once_per_version():
+    hashed = []
+    hash_codes = artifact_cache._hash_codes
+
+    def counting(grid_model):
+        hashed.append(grid_model)
+        return hash_codes(grid_model)
+
+    artifact_cache._hash_codes = counting
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            artifact_cache.configure(directory)
+            grid = make_trap(60)  # Past SMALL_MAP, so Auto checks what is prepared
+            for _ in range(5):
+                assert Pathfinder.get_path(0, 0, "Auto", grid)['final_path'][-1] == (59, 59)
+            assert len(hashed) == 1
+            # An edit is a new map, hashed again on the next query
+            grid.set_cell_color(0, 1, "maroon")
+            first = artifact_cache.map_hash(grid)
+            Pathfinder.get_path(0, 0, "Auto", grid)
+            assert len(hashed) == 2 and artifact_cache.map_hash(grid) == first
+            assert first == hash_codes(grid)
+    finally:
+        artifact_cache._hash_codes = hash_codes
+        artifact_cache.configure(None)
+
+
+def main():
+    test_auto_mode_picks_an_exact_engine()
+    test_auto_hashes_the_map_once_per_version()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
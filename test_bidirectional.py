@@ -0,0 +1,65 @@
+import random
+
+from models import GridModel
+from pathfinder import Pathfinder
+from test_pathfinder import make_trap
+
+PAIRS = (("BFS", "Bidirectional BFS"), ("Dijkstra", "Bidirectional Dijkstra"), ("Dijkstra", "Bidirectional A*"))
+
+
+def path_cost(grid, path):
+    return sum(grid.get_cell_cost(row, col) for row, col in path[1:])
+
+
+def test_bidirectional_searches_meet_on_an_optimal_path():
+    grid = make_trap(30)
+    for forward, bidirectional in (("BFS", "Bidirectional BFS"), ("Dijkstra", "Bidirectional Dijkstra"),
+                                   ("Dijkstra", "Bidirectional A*")):
+        expected = Pathfinder.get_path(0, 0, forward, grid)
+        result = Pathfinder.get_path(0, 0, bidirectional, grid)
+        path = result['final_path']
+        assert path[0] == (0, 0) and path[-1] == (29, 29)
+        assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+        assert result['meeting_point'] in path
+        if forward == "BFS":
+            assert len(path) == len(expected['final_path'])
+        else:
+            # Maroon cells along the way must not fool the stopping rule
+            cost = sum(grid.get_cell_cost(row, col) for row, col in path[1:])
+            assert cost == sum(grid.get_cell_cost(row, col) for row, col in expected['final_path'][1:])
+        assert len(result['search_history']) < len(expected['search_history'])
+    bfs = Pathfinder.get_path(0, 0, "BFS", grid)
+    assert len(Pathfinder.get_path(0, 0, "Bidirectional BFS", grid)['search_history']) < len(bfs['search_history']) / 2
+
+
+def test_bidirectional_searches_are_optimal_on_random_maps():
+    rng = random.Random(11)
+    for _ in range(25):
+        grid = GridModel(14, 14)
+        for _ in range(12):
+            top, left = rng.randrange(14), rng.randrange(14)
+            grid.fill_rect(top, left, top + rng.randrange(4), left + rng.randrange(4), rng.choice(["grey", "maroon"]))
+        start = (rng.randrange(14), rng.randrange(14))
+        for forward, bidirectional in PAIRS:
+            expected = Pathfinder.get_path(*start, forward, grid)['final_path']
+            result = Pathfinder.get_path(*start, bidirectional, grid)
+            path = result['final_path']
+            if not expected:
+                assert not path
+                continue
+            assert path[0] == start and path[-1] == (13, 13)
+            assert all(grid.get_cell_cost(row, col) is not None for row, col in path)
+            assert result['meeting_point'] in path
+            if forward == "BFS":
+                assert len(path) == len(expected)
+            else:
+                assert path_cost(grid, path) == path_cost(grid, expected)
+
+
+def main():
+    test_bidirectional_searches_meet_on_an_optimal_path()
+    test_bidirectional_searches_are_optimal_on_random_maps()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
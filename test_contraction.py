@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+from contraction import ContractionHierarchy
+from pathfinder import Pathfinder
+from test_pathfinder import make_rooms
+
+
+def test_contraction_hierarchy_matches_dijkstra():
+    grid = make_rooms(40)
+    grid.fill_rect(5, 5, 12, 30, "maroon")
+    expected = Pathfinder.get_path(0, 0, "Dijkstra", grid)
+    result = Pathfinder.get_path(0, 0, "CH", grid)
+
+    def cost(path):
+        return sum(grid.get_cell_cost(row, col) for row, col in path[1:])
+
+    path = result['final_path']
+    assert path[0] == (0, 0) and path[-1] == (39, 39)
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+    assert cost(path) == cost(expected['final_path'])
+    assert len(result['search_history']) < len(expected['search_history']) / 4
+
+    with tempfile.TemporaryDirectory() as directory:
+        saved = os.path.join(directory, "rooms.ch")
+        ContractionHierarchy.for_grid(grid).save(saved)
+        loaded = ContractionHierarchy.load(saved, grid)
+        assert loaded.find_path(0, 0, 39, 39)['final_path'] == path
+        # A hierarchy only answers for the terrain it was built on
+        grid.set_cell_color(0, 1, "grey")
+        try:
+            ContractionHierarchy.load(saved, grid)
+            assert False, "stale hierarchy was accepted"
+        except ValueError:
+            pass
+
+
+def main():
+    test_contraction_hierarchy_matches_dijkstra()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
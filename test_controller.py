@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+import os
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtWidgets
+
+from main import MainApp
+from pathfinder import Pathfinder
+from search_trace import TraceWriter
+import shared_grid
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])  # Kept alive for every test here
+
+
+def make_window(rows, cols):
+    # main.py loads style.qss relative to the working directory
+    previous = os.getcwd()
+    os.chdir(HERE)
+    try:
+        return MainApp(rows, cols)
+    finally:
+        os.chdir(previous)
+
+
+def test_walk_uses_costs_from_planning_time():
+    window = make_window(6, 6)
+    controller = window.controller
+    window.searchComboBox.setCurrentText("Dijkstra")
+    assert controller.plan()
+    path = controller.final_path
+    # Painting a wall on the path while the search replays must not break the walk
+    controller.grid_model.set_cell_color(*path[2], "grey")
+    controller.replay.pause()
+    controller.finish_replay()
+    assert (window.player_model.row, window.player_model.col) == path[-1]
+    assert window.player_widget.path_animation.duration() == (len(path) - 1) * window.player_widget.ms_per_step
+    window.player_widget.path_animation.stop()
+    window.close()
+
+
+def test_trace_walk_stops_before_walls_on_the_current_map():
+    window = make_window(6, 6)
+    controller = window.controller
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.trace")
+        with TraceWriter(path, 6, 6) as trace:
+            result = Pathfinder.get_path(0, 0, "BFS", window.grid_model.model, record_history=trace)
+            trace.final_path = result['final_path']
+        blocked = result['final_path'][3]
+        controller.grid_model.set_cell_color(*blocked, "grey")
+        assert controller.replay_trace(path)
+        controller.replay.pause()
+        controller.finish_replay()
+        assert (window.player_model.row, window.player_model.col) == result['final_path'][2]
+        window.player_widget.path_animation.stop()
+        # Planning again lets go of the trace's mapping and file
+        trace = controller.path
+        assert controller.plan()
+        assert controller.path is not trace and trace._map.closed and trace._file.closed
+        controller.replay.pause()
+    window.close()
+
+
+def test_auto_choice_stays_visible_after_the_move():
+    window = make_window(6, 6)
+    controller = window.controller
+    window.searchComboBox.setCurrentText("Auto")
+    assert controller.plan()
+    controller.replay.pause()
+    controller.finish_replay()
+    window.player_widget.path_animation.stop()
+    controller.finish_movement()
+    chosen = controller.auto_choice
+    assert chosen in Pathfinder.ALGORITHMS
+    assert f"Auto picked {chosen}" in window.statusLabel.text()
+    # A named engine clears it again
+    window.searchComboBox.setCurrentText("BFS")
+    controller.player_model.update_position(0, 0)
+    assert controller.plan()
+    controller.replay.pause()
+    assert "Auto picked" not in window.statusLabel.text()
+    window.close()
+
+
+def test_race_runs_the_ticked_algorithms_on_the_map_as_it_was():
+    window = make_window(8, 8)
+    controller = window.controller
+    controller.grid_model.model.fill_rect(0, 4, 5, 4, "grey")
+    expected = Pathfinder.get_path(0, 0, "Dijkstra", controller.grid_model.model)['final_path']
+    ticked = {"BFS", "Dijkstra", "A*"}
+    for action in window.raceMenu.actions():
+        action.setChecked(action.text() in ticked)
+    controller.race_executor = ThreadPoolExecutor(max_workers=1)
+    controller.start_race()
+    # Walling the goal off mid-race must not reach the racers
+    controller.grid_model.model.fill_rect(6, 6, 6, 7, "grey")
+    controller.grid_model.model.fill_rect(7, 6, 7, 6, "grey")
+    wait(controller.race_futures)
+    results = [future.result() for future in controller.race_futures]
+    controller.poll_race()
+    assert {result['algorithm'] for result in results} == ticked
+    assert all(result['final_path'][-1] == (7, 7) for result in results)
+    assert [result['final_path'] for result in results if result['algorithm'] == "Dijkstra"] == [expected]
+    # The racer thread attached to the block in this process; detach before it is freed
+    shared_grid.resolve(controller.shared_grid.handle).close()
+    shared_grid._attached.clear()
+    controller.shutdown()
+    window.close()
+
+
+def main():
+    test_walk_uses_costs_from_planning_time()
+    test_race_runs_the_ticked_algorithms_on_the_map_as_it_was()
+    test_auto_choice_stays_visible_after_the_move()
+    test_trace_walk_stops_before_walls_on_the_current_map()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
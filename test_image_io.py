@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+from PyQt6 import QtGui
+
+from models import GridModel
+import image_io
+
+
+def test_image_round_trip_keeps_terrain():
+    grid = GridModel(7, 13)  # Odd width: scanlines are padded
+    grid.set_cell_color(3, 5, "maroon")
+    grid.set_cell_color(6, 0, "grey")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "map.png")
+        image_io.save_image(grid, path)
+        loaded = image_io.load_image(path)
+        sparse = image_io.load_image(path, sparse=True)
+    assert loaded.grid == grid.grid
+    assert sparse.to_codes() == b"".join(grid.grid)
+    assert not loaded.is_reachable((0, 0), (6, 0))
+
+    # Colours from other tools snap to the nearest terrain
+    image = QtGui.QImage(4, 2, QtGui.QImage.Format.Format_RGB32)
+    image.fill(QtGui.QColor(120, 5, 0))
+    image.setPixelColor(3, 1, QtGui.QColor(140, 140, 140))
+    rows, cols, codes = image_io.image_to_codes(image)
+    assert (rows, cols) == (2, 4)
+    assert [GridModel(rows, cols, codes=codes).get_cell_color(1, col) for col in range(4)] == \
+        ["maroon", "maroon", "maroon", "grey"]
+
+
+def main():
+    test_image_round_trip_keeps_terrain()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from indexed_heap import IndexedHeap
+
+
+def test_indexed_heap_decrease_key():
+    heap = IndexedHeap()
+    for key, priority in ((1, 5), (2, 3), (3, 8), (2, 4), (3, 1)):
+        heap.push(key, priority)
+    assert len(heap) == 3
+    assert 3 in heap and 4 not in heap
+    assert [heap.pop() for _ in range(3)] == [(1, 3), (3, 2), (5, 1)]
+    assert heap.stats() == {'max_size': 3, 'pushes': 3, 'decrease_keys': 1}
+
+
+def main():
+    test_indexed_heap_decrease_key()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,13 @@
 
-from main import GridModel, PlayerModel
+import os
+import random
+import subprocess
+import sys
+
+from models import GridModel, PlayerModel
+from connectivity import ComponentIndex
+
+HERE = os.path.dirname(os.path.abspath(__file__))
 
 def test_grid_model_set_and_get():
     grid = GridModel(10, 10)
@@ -17,10 +25,93 @@ def test_player_model_move():
     player.update_position(3, 4)
     assert (player.row, player.col) == (3, 4)
 
+def test_reachability_tracks_walls():
+    grid = GridModel(5, 5)
+    assert grid.is_reachable((0, 0), (4, 4))
+    # Wall off the goal with a full column of obstacles
+    for row in range(5):
+        grid.set_cell_color(row, 2, "grey")
+    assert not grid.is_reachable((0, 0), (4, 4))
+    grid.set_cell_color(3, 2, "maroon")
+    assert grid.is_reachable((0, 0), (4, 4))
+
+
+def test_incremental_components_match_rebuild():
+    rng = random.Random(7)
+    grid = GridModel(12, 12)
+    for _ in range(400):
+        grid.set_cell_color(rng.randrange(12), rng.randrange(12), rng.choice(["brown", "maroon", "grey"]))
+    fresh = ComponentIndex(grid)
+    cells = [(r, c) for r in range(12) for c in range(12)]
+    for _ in range(300):
+        a, b = rng.choice(cells), rng.choice(cells)
+        assert grid.components.connected(a, b) == fresh.connected(a, b)
+
+
+def test_core_import_does_not_load_qt():
+    code = "import sys, models, pathfinder, service, shared_grid; print('PyQt6' in sys.modules)"
+    # Run from the repository so the modules are found whatever the test runner's working directory
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=HERE).stdout
+    assert output.strip() == "False"
+
+
+def test_update_signal_notifies_observers():
+    grid = GridModel(3, 3)
+    calls = []
+    grid.updateSignal.connect(lambda: calls.append(True))
+    grid.set_cell_color(1, 1, "maroon")
+    assert calls == [True]
+
+
+def test_bulk_edits_emit_one_notification():
+    grid = GridModel(20, 20)
+    batches = []
+    grid.cellsChangedSignal.connect(batches.append)
+    grid.fill_rect(2, 2, 5, 6, "grey")
+    assert len(batches) == 1 and len(batches[0]) == 20
+    grid.paint_line(0, 0, 7, 19, "maroon")
+    # The line is unbroken: every step moves to an adjacent cell
+    line = batches[-1]
+    assert all(abs(a[0] - b[0]) <= 1 and abs(a[1] - b[1]) <= 1 for a, b in zip(line, line[1:]))
+    grid.flood_fill(2, 2, "brown")
+    assert grid.get_cell_color(5, 6) == "brown"
+    grid.apply_mask([1] * 400, "grey")
+    assert grid.get_cell_color(19, 19) == "gold"
+    assert not grid.is_reachable((0, 0), (19, 19))
+    assert len(batches) == 4
+    # Rectangles are clipped to the grid first, so huge or off-grid ones cost only what they cover
+    grid.fill_rect(-10 ** 9, 3, 10 ** 9, -10 ** 9, "brown")
+    assert len(batches[-1]) == 20 * 4 and grid.get_cell_color(19, 3) == "brown"
+    grid.fill_rect(25, 0, 30, 19, "brown")
+    assert len(batches) == 5
+
+
+def test_snapshot_is_isolated_from_later_edits():
+    grid = GridModel(10, 10)
+    grid.set_cell_color(1, 1, "maroon")
+    snap = grid.snapshot()
+    assert grid.snapshot() is snap  # No edits, same version
+    grid.set_cell_color(1, 1, "grey")
+    grid.fill_rect(5, 0, 5, 9, "grey")
+    assert snap.get_cell_color(1, 1) == "maroon"
+    assert snap.get_cell_cost(5, 3) == 1
+    assert grid.get_cell_cost(5, 3) is None
+    # Untouched rows are still shared with the snapshot
+    assert grid.grid[2] is snap.grid[2]
+    assert grid.grid[1] is not snap.grid[1]
+
+
 def main():
     test_grid_model_set_and_get()
     test_player_model_initial_position()
     test_player_model_move()
+    test_reachability_tracks_walls()
+    test_incremental_components_match_rebuild()
+    test_core_import_does_not_load_qt()
+    test_update_signal_notifies_observers()
+    test_bulk_edits_emit_one_notification()
+    test_snapshot_is_isolated_from_later_edits()
     print("All tests passed.")
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+import moving_ai
+
+
+def test_moving_ai_scenarios_run_through_pathfinder():
+    with tempfile.TemporaryDirectory() as directory:
+        map_path = os.path.join(directory, "tiny.map")
+        with open(map_path, "w") as file:
+            file.write("type octile\nheight 4\nwidth 6\nmap\n"
+                       "......\n"
+                       ".TT@S.\n"
+                       "...@..\n"
+                       "G..W..\n")
+        scen_path = os.path.join(directory, "tiny.scen")
+        with open(scen_path, "w") as file:
+            # x is the column, y the row; the last query claims an impossible octile optimum
+            file.write("version 1\n"
+                       "0\ttiny.map\t6\t4\t0\t3\t5\t3\t6.41421356\n"
+                       "0\ttiny.map\t6\t4\t2\t2\t4\t1\t4.82842712\n"
+                       "0\ttiny.map\t6\t4\t0\t0\t5\t0\t9.00000000\n")
+        grid = moving_ai.load_map(map_path)
+        scenarios = moving_ai.read_scenarios(scen_path)
+
+    assert (grid.rows, grid.cols) == (4, 6)
+    assert [grid.get_cell_color(1, col) for col in range(6)] == ["brown", "grey", "grey", "grey", "maroon", "brown"]
+    assert grid.get_cell_color(3, 3) == "grey" and grid.get_cell_color(3, 0) == "brown"
+    assert scenarios[0].start == (3, 0) and scenarios[0].goal == (3, 5)
+
+    report = moving_ai.run_scenarios(grid, scenarios, "A*", reference="Dijkstra")
+    assert report['queries'] == 3 and report['solved'] == 2
+    [(failed, problem)] = report['failures']
+    assert failed is scenarios[2] and "octile" in problem
+
+
+def main():
+    test_moving_ai_scenarios_run_through_pathfinder()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
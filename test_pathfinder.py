@@ -0,0 +1,117 @@
+from models import GridModel
+from pathfinder import Pathfinder
+
+
+def test_astar_finds_goal():
+    grid = GridModel(10, 10)
+    result = Pathfinder.get_path(0, 0, "A*", grid)
+    assert result['final_path'][0] == (0, 0)
+    assert result['final_path'][-1] == (9, 9)
+    assert result['partial'] is False
+
+
+def test_expansion_budget_returns_partial_path():
+    grid = GridModel(10, 10)
+    result = Pathfinder.get_path(0, 0, "BFS", grid, max_expansions=5)
+    assert result['partial'] is True
+    assert len(result['search_history']) == 5
+    # The partial path starts at the player and moves towards the goal
+    assert result['final_path'][0] == (0, 0)
+    assert len(result['final_path']) > 1
+
+
+def test_history_is_compact_and_optional():
+    grid = GridModel(10, 10)
+    result = Pathfinder.get_path(0, 0, "Dijkstra", grid)
+    history = result['search_history']
+    assert history[0] == (0, 0)
+    assert list(history)[-1] == (9, 9)
+    assert history.nbytes == 4 * len(history)
+
+    # Batch callers can skip history capture and still get the path
+    result = Pathfinder.get_path(0, 0, "Dijkstra", grid, record_history=False)
+    assert len(result['search_history']) == 0
+    assert result['search_history'].expansions == len(history)
+    assert result['final_path'][-1] == (9, 9)
+
+
+def make_trap(size):
+    """A shelf above the goal that is only open on the far left, so Manhattan distance misleads"""
+    grid = GridModel(size, size)
+    grid.fill_rect(size - 4, 3, size - 4, size - 1, "grey")
+    grid.fill_rect(0, size - 4, size - 5, size - 4, "grey")
+    grid.fill_rect(size - 3, 0, size - 1, 1, "maroon")
+    return grid
+
+
+def make_rooms(size, room=20):
+    """Open rooms separated by walls with a three-cell door into each neighbour"""
+    grid = GridModel(size, size)
+    walls = list(range(room // 2, size, room))
+    for wall in walls:
+        grid.fill_rect(wall, 0, wall, size - 1, "grey")
+        grid.fill_rect(0, wall, size - 1, wall, "grey")
+    for wall in walls:
+        for start in [0] + [other + 1 for other in walls]:
+            grid.fill_rect(wall, start + 3, wall, start + 5, "brown")
+            grid.fill_rect(start + 3, wall, start + 5, wall, "brown")
+    return grid
+
+
+def test_alt_heuristic_cuts_expansions_on_mazes():
+    grid = make_trap(30)
+    plain = Pathfinder.get_path(0, 0, "A*", grid)
+    alt = Pathfinder.get_path(0, 0, "A* (ALT)", grid)
+    dijkstra = Pathfinder.get_path(0, 0, "Dijkstra", grid)
+
+    def cost(path):
+        return sum(grid.get_cell_cost(row, col) for row, col in path[1:])
+
+    assert cost(alt['final_path']) == cost(dijkstra['final_path'])
+    assert len(alt['search_history']) < len(plain['search_history']) / 2
+
+
+def test_memory_bounded_searches_stay_optimal():
+    grid = make_trap(16)
+    grid.fill_rect(2, 2, 6, 6, "maroon")
+    expected = Pathfinder.get_path(0, 0, "Dijkstra", grid)
+
+    def cost(path):
+        return sum(grid.get_cell_cost(row, col) for row, col in path[1:])
+
+    for algorithm, memory_limit in (("IDA*", None), ("IDA*", 8), ("SMA*", None), ("SMA*", 64)):
+        result = Pathfinder.get_path(0, 0, algorithm, grid, memory_limit=memory_limit)
+        assert result['final_path'][-1] == (15, 15)
+        assert cost(result['final_path']) == cost(expected['final_path'])
+
+
+def test_queue_stats_account_for_every_pop():
+    grid = make_trap(20)
+    grid.fill_rect(5, 0, 12, 12, "maroon")
+    for algorithm in ("Dijkstra", "A*"):
+        result = Pathfinder.get_path(0, 0, algorithm, grid, record_history=False)
+        stats = result['queue_stats']
+        # Every pop is an expansion or a skipped duplicate, and nothing is popped that was not pushed
+        assert result['search_history'].expansions + stats['stale_pops'] <= stats['pushes']
+        assert stats['max_size'] <= stats['pushes'] <= 2 * 20 * 20
+        # Duplicates only come from lowering a queued cell's cost
+        assert stats['stale_pops'] <= stats['decrease_keys'] < stats['pushes']
+    # A walled-off goal is answered without searching, with the same keys
+    grid.fill_rect(18, 19, 19, 18, "grey")
+    for algorithm in ("Dijkstra", "A*", "A* (ALT)"):
+        result = Pathfinder.get_path(0, 0, algorithm, grid)
+        assert result['final_path'] == []
+        assert result['queue_stats'] == {'max_size': 0, 'pushes': 0, 'decrease_keys': 0, 'stale_pops': 0}
+
+
+def main():
+    test_astar_finds_goal()
+    test_expansion_budget_returns_partial_path()
+    test_history_is_compact_and_optional()
+    test_alt_heuristic_cuts_expansions_on_mazes()
+    test_memory_bounded_searches_stay_optimal()
+    test_queue_stats_account_for_every_pop()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+from models import GridModel
+from pathfinder import Pathfinder
+import race
+
+
+def test_race_compares_all_algorithms_on_one_snapshot():
+    grid = GridModel(10, 10)
+    grid.fill_rect(0, 4, 7, 4, "grey")
+    grid.fill_rect(8, 0, 8, 3, "maroon")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = race.race(grid.snapshot(), 0, 0, executor=executor)
+    assert [result['algorithm'] for result in results] == race.ALGORITHMS
+    costs = {result['algorithm']: result['cost'] for result in results}
+    assert costs["Dijkstra"] == costs["A*"]
+    assert costs["BFS"] >= costs["Dijkstra"]
+    assert all(result['expansions'] > 0 for result in results)
+
+
+def test_race_skips_unbudgeted_engines_and_caps_its_pool():
+    raced = race.raceable(list(Pathfinder.ALGORITHMS))
+    assert not set(raced) & set(race.SLOW_ALGORITHMS)
+    assert "Bidirectional A*" in raced
+    executor = race.make_executor(len(raced) * 8)
+    try:
+        assert executor._max_workers <= (os.cpu_count() or 1)
+    finally:
+        executor.shutdown()
+
+
+def test_race_entries_stop_at_the_time_budget():
+    grid = GridModel(300, 300)
+    result = race.run_entry(grid.snapshot(), 0, 0, "Dijkstra", time_budget_ms=0)
+    assert result['partial'] and result['expansions'] < 300 * 300
+    assert not race.run_entry(grid.snapshot(), 0, 0, "BFS")['partial']
+
+
+def main():
+    test_race_compares_all_algorithms_on_one_snapshot()
+    test_race_skips_unbudgeted_engines_and_caps_its_pool()
+    test_race_entries_stop_at_the_time_budget()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtWidgets
+
+from replay import ReplayEngine
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])  # Kept alive for every test here
+
+
+class RecordingOverlay:
+    """Stands in for PathOverlay and counts repaints"""
+    def __init__(self):
+        self.cells = []
+        self.updates = 0
+
+    def add_visited_cells(self, cells):
+        self.cells.extend(cells)
+        self.updates += 1
+
+    def set_visited_cells(self, cells):
+        self.cells = list(cells)
+        self.updates += 1
+
+
+class FixedClock:
+    """QElapsedTimer stand-in where every frame takes the same time"""
+    def __init__(self, frame_ms):
+        self.frame_ms = frame_ms
+
+    def restart(self):
+        return self.frame_ms
+
+
+def make_engine(count=100):
+    overlay = RecordingOverlay()
+    engine = ReplayEngine(overlay)
+    engine.load([(0, col) for col in range(count)])
+    return engine, overlay
+
+
+def test_seek_draws_once_in_either_direction():
+    engine, overlay = make_engine()
+    progress = []
+    engine.progressChanged.connect(progress.append)
+    engine.seek(60)
+    assert overlay.cells == engine.history[:60] and overlay.updates == 2  # load + one batch
+    engine.seek(25)
+    assert overlay.cells == engine.history[:25] and overlay.updates == 3
+    engine.seek(1000)  # Clamped to the end
+    assert engine.position == 100 and overlay.cells == engine.history
+    assert progress == [60, 25, 100]
+
+
+def test_skip_to_result_finishes_the_replay():
+    engine, overlay = make_engine()
+    finished = []
+    engine.finished.connect(lambda: finished.append(True))
+    engine.start()
+    assert engine.is_running()
+    engine.skip_to_result()
+    assert not engine.is_running() and finished == [True]
+    assert overlay.cells == engine.history
+
+
+def test_frames_push_cells_in_batches():
+    engine, overlay = make_engine()
+    engine.set_cells_per_frame(30)
+    for _ in range(3):
+        engine._tick()
+    assert engine.position == 90 and overlay.updates == 4  # load + one update per frame
+    engine._tick()
+    assert engine.position == 100
+
+    # Timed speed: fractions of a cell carry over to later frames
+    engine, overlay = make_engine()
+    engine.set_speed(100)  # Cells per second
+    engine.clock = FixedClock(15)  # 1.5 cells per frame
+    for _ in range(4):
+        engine._tick()
+    assert engine.position == 6
+
+
+def main():
+    test_seek_draws_once_in_either_direction()
+    test_skip_to_result_finishes_the_replay()
+    test_frames_push_cells_in_batches()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
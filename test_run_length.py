@@ -0,0 +1,58 @@
+import random
+
+from models import GridModel
+from run_length import RunLengthGrid
+
+
+def test_run_length_grid_matches_dense():
+    rng = random.Random(3)
+    dense = GridModel(9, 13)
+    sparse = RunLengthGrid(9, 13)
+    for _ in range(40):
+        top, left, bottom, right = rng.randrange(9), rng.randrange(13), rng.randrange(9), rng.randrange(13)
+        color = rng.choice(["brown", "maroon", "grey"])
+        dense.fill_rect(top, left, bottom, right, color)
+        sparse.fill_rect(top, left, bottom, right, color)
+        assert sparse.to_codes() == b"".join(bytes(row) for row in dense.grid)
+    assert RunLengthGrid.from_grid(dense).to_codes() == sparse.to_codes()
+    assert sparse.to_grid_model().grid == dense.grid
+
+    # Memory follows terrain changes, not area
+    huge = RunLengthGrid(20000, 20000)
+    huge.fill_rect(500, 0, 500, 18000, "grey")
+    huge.fill_rect(1000, 1000, 15000, 1200, "maroon")
+    assert huge.get_cell_cost(500, 100) is None and huge.get_cell_cost(9000, 1100) == 3
+    assert huge.nbytes < 20000 * 8 + 1000
+
+
+def test_fill_rect_is_clipped_to_the_grid():
+    rng = random.Random(5)
+    dense = GridModel(6, 6)
+    sparse = RunLengthGrid(6, 6)
+    rectangles = [
+        (0, 8, 0, 10),  # Entirely right of the grid
+        (7, 0, 9, 5),  # Entirely below
+        (-4, -4, -1, -1),  # Entirely above and to the left
+        (-2, 3, 2, 9),  # Overlaps the top right corner
+        (4, -3, 10, 1),  # Overlaps the bottom left corner
+        (5, 5, 8, 8),  # Only the goal inside: it stays gold
+    ]
+    rectangles += [tuple(rng.randrange(-8, 14) for _ in range(4)) for _ in range(40)]
+    for top, left, bottom, right in rectangles:
+        color = rng.choice(["maroon", "grey"])
+        version = sparse.version
+        dense.fill_rect(top, left, bottom, right, color)
+        sparse.fill_rect(top, left, bottom, right, color)
+        assert sparse.to_codes() == b"".join(bytes(row) for row in dense.grid), (top, left, bottom, right)
+        if max(top, bottom) < 0 or min(top, bottom) > 5 or max(left, right) < 0 or min(left, right) > 5:
+            assert sparse.version == version  # Nothing to paint, nothing changed
+    assert sparse.get_cell_color(5, 5) == "gold"
+
+
+def main():
+    test_run_length_grid_matches_dense()
+    test_fill_rect_is_clipped_to_the_grid()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
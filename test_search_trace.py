@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+from pathfinder import Pathfinder
+from search_trace import TraceReader, TraceWriter
+from test_pathfinder import make_trap
+
+
+def test_trace_streams_history_to_disk():
+    grid = make_trap(20)
+    expected = Pathfinder.get_path(0, 0, "Dijkstra", grid)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.trace")
+        with TraceWriter(path, grid.rows, grid.cols, chunk_size=16) as trace:
+            result = Pathfinder.get_path(0, 0, "Dijkstra", grid, record_history=trace)
+            trace.final_path = result['final_path']
+        # Nothing is kept in memory, only counted
+        assert len(result['search_history']) == 0
+        assert result['search_history'].expansions == len(expected['search_history'])
+
+        with TraceReader(path) as trace:
+            assert len(trace) == len(expected['search_history'])
+            assert list(trace) == list(expected['search_history'])
+            assert trace[100] == expected['search_history'][100]
+            assert trace[-1] == (19, 19)
+            assert trace[10:20] == expected['search_history'][10:20]
+            assert trace.final_path == expected['final_path']
+
+
+def main():
+    test_trace_streams_history_to_disk()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
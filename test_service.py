@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from models import GridModel
+from pathfinder import Pathfinder
+from service import PathfindingClient, PathfindingService
+
+
+async def run_queries():
+    Pathfinder.verbose = False
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        service = PathfindingService(executor, batch_window_ms=5)
+        server = await service.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            grid = GridModel(12, 12)
+            grid.fill_rect(0, 6, 10, 6, "grey")
+            client = await PathfindingClient.connect(port=port)
+            loaded = await client.load_map("arena", grid)
+            answers = await asyncio.gather(*(client.find_path("arena", row, 0) for row in range(12)))
+            blocked = await client.find_path("missing", 0, 0)
+            metrics = await client.metrics()
+            await client.close()
+    Pathfinder.verbose = True
+    return loaded, answers, blocked, metrics
+
+
+def test_service_batches_concurrent_queries():
+    loaded, answers, blocked, metrics = asyncio.run(run_queries())
+    assert loaded["ok"] and loaded["version"] == 1
+    for row, answer in enumerate(answers):
+        assert answer["final_path"][0] == [row, 0]
+        assert answer["final_path"][-1] == [11, 11]
+    assert "error" in blocked
+    assert metrics["queries"] == 12
+    # Concurrent queries on the same map version share batches
+    assert metrics["batches"] < 12
+    assert metrics["latency_ms"]["p99"] >= metrics["latency_ms"]["p50"]
+
+
+def test_malformed_maps_are_rejected_on_load():
+    service = PathfindingService()
+    for cells in ("0x0000003", "000\x01000003", "00000003", "0000000003", "00000\u00e903"):
+        try:
+            service.load_map("arena", 3, 3, cells)
+            assert False, f"{cells!r} was accepted"
+        except ValueError:
+            pass
+    assert "arena" not in service.maps
+    assert service.load_map("arena", 3, 3, "000020003") == 1
+    # The same guard applies to every loader, not just the service
+    try:
+        service.maps["arena"].load_codes(bytes([0, 0, 0, 0, 7, 0, 0, 0, 3]))
+        assert False, "code 7 was accepted"
+    except ValueError:
+        pass
+    assert service.maps["arena"].get_cell_color(1, 1) == "grey"
+
+
+def main():
+    test_service_batches_concurrent_queries()
+    test_malformed_maps_are_rejected_on_load()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from models import GridModel
+from pathfinder import Pathfinder
+import race
+from shared_grid import SharedGrid
+
+
+def test_workers_search_the_shared_grid_in_place():
+    grid = GridModel(10, 10)
+    grid.fill_rect(0, 4, 7, 4, "grey")
+    with SharedGrid.from_grid(grid) as shared, ProcessPoolExecutor(max_workers=1) as executor:
+        shared.mirror(grid)
+        first = race.start_race(executor, shared.handle, 0, 0, ["Dijkstra"], shared.stamp)[0].result()
+        assert first['final_path'] == Pathfinder.get_path(0, 0, "Dijkstra", grid)['final_path']
+        assert not first['stale']
+        # Edits reach the worker without resending the grid
+        stamp = shared.stamp
+        grid.fill_rect(8, 4, 9, 4, "maroon")
+        assert not shared.unchanged_since(stamp)
+        second = race.start_race(executor, shared.handle, 0, 0, ["Dijkstra"], shared.stamp)[0].result()
+        assert second['final_path'] == Pathfinder.get_path(0, 0, "Dijkstra", grid)['final_path']
+        assert second['cost'] > first['cost']
+
+
+def main():
+    test_workers_search_the_shared_grid_in_place()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
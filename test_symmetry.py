@@ -0,0 +1,25 @@
+from pathfinder import Pathfinder
+from test_pathfinder import make_rooms
+
+
+def test_symmetry_reduction_skips_room_interiors():
+    grid = make_rooms(60)
+    grid.fill_rect(14, 14, 20, 25, "maroon")
+    plain = Pathfinder.get_path(0, 0, "A*", grid)
+    reduced = Pathfinder.get_path(0, 0, "A* (RSR)", grid)
+
+    def cost(path):
+        return sum(grid.get_cell_cost(row, col) for row, col in path[1:])
+
+    path = reduced['final_path']
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+    assert cost(path) == cost(plain['final_path'])
+    assert len(reduced['search_history']) < len(plain['search_history']) / 2
+
+
+def main():
+    test_symmetry_reduction_skips_room_interiors()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import random
+
+from models import GridModel
+from undo import UndoStack
+
+
+def test_undo_redo_strokes_and_reset():
+    grid = GridModel(8, 8)
+    history = UndoStack(grid)
+    batches = []
+    grid.cellsChangedSignal.connect(batches.append)
+
+    history.begin_stroke()
+    grid.paint_line(1, 0, 1, 5, "grey")
+    grid.paint_line(1, 5, 4, 5, "grey")
+    history.end_stroke()
+    grid.reset_grid()
+    assert grid.get_cell_color(1, 2) == "brown"
+
+    history.undo()  # Undo the reset
+    assert grid.get_cell_color(1, 2) == "grey"
+    history.undo()  # Undo the whole stroke, touching only its cells
+    assert grid.get_cell_color(1, 2) == "brown" and grid.get_cell_color(3, 5) == "brown"
+    assert len(batches[-1]) == 9
+    history.redo()
+    assert grid.get_cell_color(3, 5) == "grey"
+    assert history.can_redo()  # The reset can still be redone
+
+
+def test_long_history_with_bulk_loads_undoes_exactly():
+    grid = GridModel(40, 40)
+    history = UndoStack(grid)
+    rng = random.Random(7)
+    states = [b"".join(grid.grid)]
+    for step in range(60):
+        if step % 15 == 14:
+            codes = bytearray(rng.choice((0, 0, 1, 2)) for _ in range(40 * 40))
+            codes[-1] = 3  # Goal stays gold
+            grid.load_codes(codes)
+        else:
+            history.begin_stroke()
+            row = rng.randrange(40)
+            table = grid.grid
+            grid.paint_line(row, rng.randrange(40), rng.randrange(40), rng.randrange(39), rng.choice(("grey", "maroon")))
+            history.end_stroke()
+            # Strokes don't snapshot, so the row table is only copied after a bulk change
+            if step % 15 not in (0, 14):
+                assert grid.grid is table
+        states.append(b"".join(grid.grid))
+    for expected in reversed(states[:-1]):
+        assert history.undo()
+        assert b"".join(grid.grid) == expected
+    assert not history.undo()
+    for expected in states[1:]:
+        assert history.redo()
+        assert b"".join(grid.grid) == expected
+
+
+def main():
+    test_undo_redo_strokes_and_reset()
+    test_long_history_with_bulk_loads_undoes_exactly()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
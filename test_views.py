@@ -0,0 +1,32 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtWidgets
+
+from views import PathOverlay
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])  # Kept alive for every test here
+
+
+def test_every_compared_run_gets_its_own_slot_and_colour():
+    parent = QtWidgets.QWidget()
+    overlay = PathOverlay(parent, QtWidgets.QTableWidget(3, 3, parent))
+    for count in (4, 9, 12, 16):
+        overlay.set_layers([([(1, 1)], [(1, 1)])] * count)
+        cell = (overlay.cell_size + 11, overlay.cell_size + 11, overlay.cell_size * 2 - 9)
+        slots = [overlay._layer_quadrant(index, 1, 1, 0) for index in range(count)]
+        for index, slot in enumerate(slots):
+            assert slot.width() > 0 and cell[0] <= slot.left() and slot.right() < cell[2]
+            assert cell[1] <= slot.top() and slot.bottom() < cell[2]
+            assert not any(slot.intersects(other) for other in slots[index + 1:])
+        colors = {overlay._layer_color(index, 255).rgb() for index in range(count)}
+        assert len(colors) == count
+
+
+def main():
+    test_every_compared_run_gets_its_own_slot_and_colour()
+    print("All tests passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from collections import deque
+from models import GridDiff
+
+
+class SnapshotEntry:
+    """Undo entry for whole-grid changes (e.g. reset), stored as two copy-on-write snapshots"""
+    def __init__(self, before, after):
+        self.before = before
+        self.after = after
+
+    @property
+    def nbytes(self):
+        # Worst case: every row has diverged from the live grid
+        return self.before.rows * self.before.cols
+
+
+class UndoStack:
+    """Undo/redo history for a GridModel.
+
+    Paint strokes are stored as packed GridDiffs (flat indices plus old/new
+    terrain codes), so undoing a stroke costs O(stroke size) and goes through
+    the model's normal batched change notification. Snapshots are only taken
+    around whole-grid changes (load, reset), which keep the grid from before
+    and after instead; strokes never snapshot, so painting stays O(stroke
+    size) on huge maps. The oldest entries are dropped once the history grows
+    past max_bytes.
+    """
+    def __init__(self, grid_model, max_bytes=16 * 1024 * 1024):
+        self.grid_model = grid_model
+        self.max_bytes = max_bytes
+        self.undo_entries = deque()
+        self.redo_entries = []
+        self.nbytes = 0
+        self._stroke = None  # Diff being accumulated while a stroke is in progress
+        self._applying = False  # Ignore the model's notifications for our own undo/redo writes
+        grid_model.cellsChangedSignal.connect(self._record)
+
+    def begin_stroke(self):
+        """Group every edit until end_stroke() into one undo step"""
+        self.end_stroke()
+        self._stroke = GridDiff(self.grid_model.cols)
+
+    def end_stroke(self):
+        stroke, self._stroke = self._stroke, None
+        if stroke:
+            self._push(stroke)
+
+    def can_undo(self):
+        return bool(self.undo_entries) or bool(self._stroke)
+
+    def can_redo(self):
+        return bool(self.redo_entries)
+
+    def undo(self):
+        self.end_stroke()
+        if not self.undo_entries:
+            return False
+        entry = self.undo_entries.pop()
+        self.nbytes -= entry.nbytes
+        self._apply(entry, undo=True)
+        self.redo_entries.append(entry)
+        return True
+
+    def redo(self):
+        if not self.redo_entries:
+            return False
+        entry = self.redo_entries.pop()
+        self._apply(entry, undo=False)
+        self._push(entry, clear_redo=False)
+        return True
+
+    def clear(self):
+        self.undo_entries.clear()
+        self.redo_entries.clear()
+        self.nbytes = 0
+        self._stroke = None
+
+    def _apply(self, entry, undo):
+        self._applying = True
+        try:
+            if isinstance(entry, SnapshotEntry):
+                self.grid_model.restore(entry.before if undo else entry.after)
+            elif undo:
+                # Walk the diff backwards so cells written twice end at their first old value
+                self.grid_model.write_codes(reversed(entry.indices), reversed(entry.old))
+            else:
+                self.grid_model.write_codes(entry.indices, entry.new)
+        finally:
+            self._applying = False
+
+    def _record(self, diff):
+        if self._applying:
+            return
+        if diff is None:
+            self.end_stroke()
+            # The model snapshots itself just before a whole-grid change
+            self._push(SnapshotEntry(self.grid_model.previous_grid, self.grid_model.snapshot()))
+        elif self._stroke is not None:
+            self._stroke.extend(diff)
+            self.redo_entries.clear()
+        else:
+            self._push(diff)
+
+    def _push(self, entry, clear_redo=True):
+        if clear_redo:
+            self.redo_entries.clear()
+        self.undo_entries.append(entry)
+        self.nbytes += entry.nbytes
+        # Memory cap: forget the oldest steps first, but always keep the newest
+        while self.nbytes > self.max_bytes and len(self.undo_entries) > 1:
+            self.nbytes -= self.undo_entries.popleft().nbytes
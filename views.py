@@ -1,15 +1,18 @@
+import math
+
 from PyQt6 import QtWidgets, QtCore, QtGui
 
 
 class DungeonView(QtWidgets.QTableWidget):
     cellClickedSignal = QtCore.pyqtSignal(int, int)
     cellDraggedSignal = QtCore.pyqtSignal(int, int)
+    strokeFinishedSignal = QtCore.pyqtSignal()
 
     def __init__(self, rows, cols, grid_model):
         super().__init__(rows, cols)
         self.configure_table()
         self.grid_model = grid_model
-        grid_model.updateSignal.connect(self.draw_grid)
+        grid_model.cellsChangedSignal.connect(self.draw_cells)
         
         # Track mouse dragging
         self.is_dragging = False
@@ -67,26 +70,42 @@ class DungeonView(QtWidgets.QTableWidget):
         if event.button() == QtCore.Qt.MouseButton.LeftButton:
             self.is_dragging = False
             self.last_cell = None
+            self.strokeFinishedSignal.emit()
         super().mouseReleaseEvent(event)
 
     def update_cell_color(self, row, col, color):
         self.item(row, col).setBackground(QtGui.QColor(color))
 
     def draw_grid(self):
+        self.setUpdatesEnabled(False)
         for i in range(self.grid_model.rows):
             for j in range(self.grid_model.cols):
                 color = self.grid_model.get_cell_color(i, j)
                 self.update_cell_color(i, j, color)
+        self.setUpdatesEnabled(True)
+
+    def draw_cells(self, cells):
+        """Repaint only the cells touched by one model edit (None means all)"""
+        if cells is None:
+            self.draw_grid()
+            return
+        self.setUpdatesEnabled(False)
+        for row, col in cells:
+            self.update_cell_color(row, col, self.grid_model.get_cell_color(row, col))
+        self.setUpdatesEnabled(True)
 
 
 
 class Player(QtWidgets.QWidget):
     """Visual representation of the player."""
+    movementFinished = QtCore.pyqtSignal()
+
     def __init__(self, parent, table_widget, model, size=45):
         super().__init__(parent)
         self.table = table_widget
         self.model = model
         self.cell_size = size
+        self.ms_per_step = 150  # Time to cross one cell of cost 1
 
         # Appearance
         self.setFixedSize(size, size)
@@ -98,41 +117,102 @@ class Player(QtWidgets.QWidget):
         self.animation.setDuration(250)
         self.animation.setEasingCurve(QtCore.QEasingCurve.Type.InOutQuad)
 
+        # One timeline for a whole path, keyed at every turn or terrain change
+        self.path_animation = QtCore.QPropertyAnimation(self, b"pos")
+        self.path_animation.finished.connect(self.movementFinished.emit)
+
         QtCore.QTimer.singleShot(0, lambda: self.place_at(0, 0))
 
         self.show()
         self.raise_()
 
+    def cell_position(self, row, col, table_pos=None):
+        """Top-left widget position for a cell"""
+        if table_pos is None:
+            table_pos = self.table.mapTo(self.parent(), QtCore.QPoint(0, 0))
+        return QtCore.QPoint(
+            table_pos.x() + col * self.table.columnWidth(0) + 10,
+            table_pos.y() + row * self.table.rowHeight(0) + 10
+        )
+
     # Place player at specific cell without animation
     def place_at(self, row, col):
-        table_pos = self.table.mapTo(self.parent(), QtCore.QPoint(0, 0))
-        print(self.table.columnWidth(0), self.table.rowHeight(0))
-        x = table_pos.x() + col * self.table.columnWidth(0) + 10
-        y = table_pos.y() + row * self.table.rowHeight(0) + 10
-        self.move(x, y)
+        self.move(self.cell_position(row, col))
 
     # Animate movement to new cell
     def animate_move(self, row, col):
-        table_pos = self.table.mapTo(self.parent(), QtCore.QPoint(0, 0))
-        end_pos = QtCore.QPoint(
-            table_pos.x() + col * self.table.columnWidth(0) + 10,
-            table_pos.y() + row * self.table.rowHeight(0) + 10
-        )
+        end_pos = self.cell_position(row, col)
         self.animation.stop()
         self.animation.setStartValue(self.pos())
         self.animation.setEndValue(end_pos)
         self.animation.start()
         self.raise_()
 
+    @staticmethod
+    def walkable(path, costs):
+        """path and costs up to the first blocked step (a None cost)"""
+        for i, cost in enumerate(costs):
+            if cost is None:
+                return path[:i + 1], costs[:i]
+        return path, costs
+
+    def follow_path(self, path, costs):
+        """Move along a whole path in one animation.
+
+        costs[i] is the cost of entering path[i + 1]; time spent on each step
+        is proportional to it so difficult terrain is crossed more slowly. A
+        None cost (a wall) ends the walk on the cell before it.
+        """
+        self.animation.stop()
+        self.path_animation.stop()
+        path, costs = self.walkable(path, costs)
+        if len(path) < 2:
+            self.movementFinished.emit()
+            return
+
+        # Only keep the corners of the polyline: the start, every turn and
+        # every change of terrain cost, plus the end
+        table_pos = self.table.mapTo(self.parent(), QtCore.QPoint(0, 0))
+        keyframes = [(0, path[0])]
+        elapsed = 0
+        for i in range(1, len(path)):
+            elapsed += costs[i - 1]
+            is_last = i == len(path) - 1
+            if not is_last:
+                turn = (path[i][0] - path[i - 1][0], path[i][1] - path[i - 1][1]) != \
+                       (path[i + 1][0] - path[i][0], path[i + 1][1] - path[i][1])
+                if not turn and costs[i] == costs[i - 1]:
+                    continue
+            keyframes.append((elapsed, path[i]))
+
+        self.path_animation.setDuration(max(1, elapsed * self.ms_per_step))
+        self.path_animation.setKeyValues([
+            (t / elapsed, self.cell_position(row, col, table_pos)) for t, (row, col) in keyframes
+        ])
+        self.path_animation.start()
+        self.raise_()
+
 
 class PathOverlay(QtWidgets.QWidget):
     """Overlay widget to display visited cells and final path"""
+    # One colour per algorithm when comparing several runs
+    LAYER_COLORS = [(30, 144, 255), (255, 140, 0), (218, 112, 214), (50, 205, 50),
+                    (255, 255, 0), (0, 206, 209), (255, 99, 71), (240, 240, 240), (138, 43, 226)]
+
     def __init__(self, parent, table_widget):
         super().__init__(parent)
         self.table = table_widget
         self.visited_cells = []
+        self.visited_set = set()
         self.final_path = []
+        self.meeting_point = None  # Where a bidirectional search's two halves joined
+        # Comparison layers: (visited cells, final path) per algorithm, each drawn
+        # in its own slot of the cell so the runs sit side by side
+        self.layers = []
         self.cell_size = 60
+        # Visited cells are accumulated into an image so each repaint only
+        # blits it instead of redrawing every cell seen so far
+        self.visited_layer = None
         
         # Make background transparent
         self.setAttribute(QtCore.Qt.WidgetAttribute.WA_TranslucentBackground)
@@ -151,34 +231,110 @@ class PathOverlay(QtWidgets.QWidget):
     
     def add_visited_cell(self, row, col):
         """Add a cell to the visited list"""
-        if (row, col) not in self.visited_cells:
-            self.visited_cells.append((row, col))
-            self.update()
+        self.add_visited_cells([(row, col)])
+
+    def add_visited_cells(self, cells):
+        """Add a batch of cells to the visited list with a single repaint"""
+        new_cells = []
+        for cell in cells:
+            if cell not in self.visited_set:
+                self.visited_set.add(cell)
+                new_cells.append(cell)
+        if not new_cells:
+            return
+        self.visited_cells.extend(new_cells)
+        if self.visited_layer is not None:
+            self._paint_visited(self.visited_layer, new_cells)
+        self.update()
+
+    def set_visited_cells(self, cells):
+        """Replace the visited list (used when seeking backwards)"""
+        self.visited_cells = []
+        self.visited_set = set()
+        self.visited_layer = None
+        self.add_visited_cells(cells)
+        self.update()
     
     def set_final_path(self, path):
         """Set the final path to display"""
         self.final_path = path
         self.update()
     
+    def set_meeting_point(self, cell):
+        """Mark the cell where a bidirectional search met (None to hide it)"""
+        self.meeting_point = cell
+        self.update()
+
+    def set_layers(self, layers):
+        """Show several runs at once; layers is a list of (visited cells, final path)"""
+        self.clear()
+        self.layers = layers
+        self.update()
+
     def clear(self):
         """Clear all overlays"""
         self.visited_cells = []
+        self.visited_set = set()
+        self.visited_layer = None
         self.final_path = []
+        self.meeting_point = None
+        self.layers = []
         self.update()
+
+    def _layer_quadrant(self, index, row, col, inset):
+        """Rectangle for layer index inside a cell (split into an n x n grid of slots, one per layer)"""
+        slots = max(2, math.ceil(math.sqrt(len(self.layers))))
+        size = (self.cell_size - 20) // slots
+        inset = inset * 2 // slots
+        x = col * self.cell_size + 11 + (index % slots) * size + inset
+        y = row * self.cell_size + 11 + (index // slots) * size + inset
+        return QtCore.QRect(x, y, size - 2 * inset, size - 2 * inset)
+
+    def _layer_color(self, index, alpha):
+        """The palette first, then evenly spread hues so no two layers share a colour"""
+        if index < len(self.LAYER_COLORS):
+            return QtGui.QColor(*self.LAYER_COLORS[index], alpha)
+        extra = max(1, len(self.layers) - len(self.LAYER_COLORS))
+        return QtGui.QColor.fromHsv((index - len(self.LAYER_COLORS)) * 360 // extra + 15, 200, 255, alpha)
+
+    def _paint_layers(self, image):
+        painter = QtGui.QPainter(image)
+        painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        for index, (visited, _) in enumerate(self.layers):
+            painter.setBrush(self._layer_color(index, 90))
+            for row, col in visited:
+                painter.drawRect(self._layer_quadrant(index, row, col, 0))
+        painter.end()
+
+    def _paint_visited(self, image, cells):
+        """Draw visited cells in semi-transparent light blue onto the cached layer"""
+        painter = QtGui.QPainter(image)
+        painter.setBrush(QtGui.QColor(173, 216, 230, 100))  # lightblue with alpha
+        painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        for row, col in cells:
+            x = col * self.cell_size + 11
+            y = row * self.cell_size + 11
+            painter.drawRect(x, y, self.cell_size - 20, self.cell_size - 20)
+        painter.end()
     
     def paintEvent(self, event):
         """Draw the visited cells and final path"""
+        if self.visited_layer is None or self.visited_layer.size() != self.size():
+            self.visited_layer = QtGui.QImage(self.size(), QtGui.QImage.Format.Format_ARGB32_Premultiplied)
+            self.visited_layer.fill(QtCore.Qt.GlobalColor.transparent)
+            self._paint_visited(self.visited_layer, self.visited_cells)
+            self._paint_layers(self.visited_layer)
+
         painter = QtGui.QPainter(self)
+        painter.drawImage(0, 0, self.visited_layer)
         painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
-        
-        # Draw visited cells in semi-transparent light blue
-        painter.setBrush(QtGui.QColor(173, 216, 230, 100))  # lightblue with alpha
         painter.setPen(QtCore.Qt.PenStyle.NoPen)
-        
-        for row, col in self.visited_cells:
-            x = col * self.cell_size + 11
-            y = row * self.cell_size + 11
-            painter.drawRect(x, y, self.cell_size - 20, self.cell_size - 20)
+
+        # Each compared run's path as a solid dot in its own quadrant
+        for index, (_, path) in enumerate(self.layers):
+            painter.setBrush(self._layer_color(index, 220))
+            for row, col in path:
+                painter.drawEllipse(self._layer_quadrant(index, row, col, 5))
         
         # Draw final path in semi-transparent cyan
         painter.setBrush(QtGui.QColor(0, 255, 255, 150))  # cyan with alpha
@@ -187,3 +343,11 @@ class PathOverlay(QtWidgets.QWidget):
             x = col * self.cell_size + 16
             y = row * self.cell_size + 16
             painter.drawRect(x, y, self.cell_size - 30, self.cell_size - 30)
+
+        # Ring the meeting point of a bidirectional search in orange
+        if self.meeting_point is not None:
+            row, col = self.meeting_point
+            painter.setBrush(QtCore.Qt.BrushStyle.NoBrush)
+            painter.setPen(QtGui.QPen(QtGui.QColor(255, 140, 0, 230), 4))
+            painter.drawEllipse(col * self.cell_size + 12, row * self.cell_size + 12,
+                                self.cell_size - 24, self.cell_size - 24)